@@ -0,0 +1,137 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Circuits used by the benchmarks.
+"""
+import numpy as np
+import cirq
+import projectq
+from projectq import ops
+from projectq.cengines import DummyEngine
+from cirqprojectq import xmon_gates
+
+def random_xmon_program(qureg, gates, seed=1):
+    r"""Random ExpW, ExpZ and Exp11 gates."""
+    rng = np.random.RandomState(seed)
+    for _ in range(gates):
+        r = rng.rand()
+        if r < 0.3 and len(qureg) > 1:
+            q0, q1 = rng.choice(len(qureg), 2, replace=False)
+            xmon_gates.Exp11Gate(rng.rand()) | (qureg[q0], qureg[q1])
+        elif r < 0.65:
+            xmon_gates.ExpWGate(rng.rand(), rng.rand()) | qureg[rng.randint(len(qureg))]
+        else:
+            xmon_gates.ExpZGate(rng.rand()) | qureg[rng.randint(len(qureg))]
+
+def qft_program(qureg):
+    r"""Quantum Fourier transform."""
+    ops.QFT | qureg
+
+def _hopping(amplitude, q0, q1):
+    amplitude /= np.pi
+    xmon_gates.ExpWGate(.5, 0) | q0
+    xmon_gates.ExpWGate(-.5, .5) | q1
+    xmon_gates.ExpZGate(1) | q1
+    xmon_gates.Exp11Gate(1.0) | (q0, q1)
+    xmon_gates.ExpWGate(amplitude, 0) | q0
+    xmon_gates.ExpWGate(-amplitude, .5) | q1
+    xmon_gates.Exp11Gate(1.0) | (q0, q1)
+    xmon_gates.ExpWGate(-.5, 0) | q0
+    xmon_gates.ExpWGate(-.5, .5) | q1
+    xmon_gates.ExpZGate(1) | q1
+
+def siam_trotter_program(qureg, steps=10, t=-0.3 * np.pi, U=0.6 * np.pi, order=2):
+    r"""
+    Trotterized time evolution of the single impurity Anderson model with
+    xmon gates, see examples/siam_cirq.py. The first half of qureg holds the
+    spin up orbitals and the second half the spin down orbitals.
+
+    U can be a :class:`cirq.Symbol` for the half turns of the interaction
+    gate of each step.
+    """
+    sites = len(qureg) // 2
+    impsite = len(qureg) // 4
+    t = t / steps
+    if isinstance(U, cirq.Symbol):
+        interaction = U
+    else:
+        interaction = -U / steps / np.pi
+    for _ in range(steps):
+        for i in range(sites - 1):
+            _hopping(t / order, qureg[i], qureg[i + 1])
+            _hopping(t / order, qureg[i + sites], qureg[i + 1 + sites])
+        xmon_gates.Exp11Gate(interaction) | (qureg[impsite], qureg[impsite + sites])
+        if order == 2:
+            for i in reversed(range(sites - 1)):
+                _hopping(t / 2, qureg[i + sites], qureg[i + 1 + sites])
+                _hopping(t / 2, qureg[i], qureg[i + 1])
+
+def siam_trotter_step(qubits, t=-0.03 * np.pi, U=0.06 * np.pi, order=2):
+    r"""
+    Operations of a single step of :func:`siam_trotter_program` on cirq
+    qubits, with the equivalent cirq gates of the xmon gates.
+    """
+    sites = len(qubits) // 2
+    impsite = len(qubits) // 4
+
+    def hopping(amplitude, q0, q1):
+        amplitude /= np.pi
+        return [cirq.X(q0)**.5, cirq.Y(q1)**-.5, cirq.Z(q1), cirq.CZ(q0, q1),
+                cirq.X(q0)**amplitude, cirq.Y(q1)**-amplitude, cirq.CZ(q0, q1),
+                cirq.X(q0)**-.5, cirq.Y(q1)**-.5, cirq.Z(q1)]
+    step = []
+    for i in range(sites - 1):
+        step += hopping(t / order, qubits[i], qubits[i + 1])
+        step += hopping(t / order, qubits[i + sites], qubits[i + 1 + sites])
+    step.append(cirq.CZ(qubits[impsite], qubits[impsite + sites])**(-U / np.pi))
+    if order == 2:
+        for i in reversed(range(sites - 1)):
+            step += hopping(t / 2, qubits[i + sites], qubits[i + 1 + sites])
+            step += hopping(t / 2, qubits[i], qubits[i + 1])
+    return step
+
+def ising_trotter_program(qureg, steps=10, J=0.3, h=0.2):
+    r"""
+    Trotterized time evolution of a transverse field Ising chain: layers of
+    ExpZ and nearest neighbor Exp11 gates followed by a layer of ExpW gates.
+    """
+    for _ in range(steps):
+        for qb in qureg:
+            xmon_gates.ExpZGate(-J) | qb
+        for i in range(len(qureg) - 1):
+            xmon_gates.Exp11Gate(2 * J) | (qureg[i], qureg[i + 1])
+        for qb in qureg:
+            xmon_gates.ExpWGate(h) | qb
+
+def record(program, n, *args, **kwargs):
+    r"""
+    Commands of a program as received by a backend.
+
+    Args:
+        program (callable): called with a qureg of n qubits and args.
+        n (int): number of qubits.
+        engine_list (list): compiler engines, defaults to none.
+
+    Returns:
+        list of :class:`projectq.ops.Command`: including the allocations and
+        the final flush.
+    """
+    backend = DummyEngine(save_commands=True)
+    eng = projectq.MainEngine(backend=backend,
+                              engine_list=kwargs.get('engine_list', []))
+    qureg = eng.allocate_qureg(n)
+    program(qureg, *args)
+    eng.flush()
+    return list(backend.received_commands)
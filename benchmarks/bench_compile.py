@@ -0,0 +1,51 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+End-to-end compilation of projectq programs to cirq circuits with
+:meth:`cirqprojectq.xmon_setup.xmon_engines` and the CIRQ backend.
+"""
+import cirq
+import projectq
+from cirqprojectq import xmon_setup
+from cirqprojectq.circ_engine import CIRQ
+from _circuits import qft_program, siam_trotter_program
+
+def _compile(program, n, *args):
+    qubits = [cirq.GridQubit(i // 8, i % 8) for i in range(n)]
+    backend = CIRQ(qubits=qubits)
+    eng = projectq.MainEngine(backend=backend,
+                              engine_list=xmon_setup.xmon_engines())
+    qureg = eng.allocate_qureg(n)
+    program(qureg, *args)
+    eng.flush()
+    return backend.circuit
+
+class CompileQFT():
+    r"""Quantum Fourier transform."""
+    params = [4, 8, 16]
+    param_names = ['qubits']
+    number = 1
+
+    def time_compile(self, qubits):
+        _compile(qft_program, qubits)
+
+class CompileSIAM():
+    r"""Ten second order Trotter steps of the single impurity Anderson model."""
+    params = [4, 8, 12, 16]
+    param_names = ['qubits']
+    number = 1
+
+    def time_compile(self, qubits):
+        _compile(siam_trotter_program, qubits, 10)
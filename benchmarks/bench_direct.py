@@ -0,0 +1,83 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Compares the two stage translation of projectq circuits to cirq (decomposition
+into xmon gates followed by the translation of the xmon gates) with the single
+pass translation of :class:`cirqprojectq.circ_engine.CIRQ` with ``direct=True``.
+
+Run with ``python benchmarks/bench_direct.py`` or as part of the benchmark
+suite, see ``benchmarks/run_benchmarks.py``.
+"""
+import time
+import numpy as np
+import cirq
+import projectq
+from projectq import ops, cengines
+from cirqprojectq import xmon_setup
+from cirqprojectq.circ_engine import CIRQ
+
+def program(qureg, layers, seed=1):
+    r"""Random layers of rotations, Hadamard gates and CNOT gates."""
+    rng = np.random.RandomState(seed)
+    n = len(qureg)
+    for _ in range(layers):
+        for qb in qureg:
+            [ops.Rx, ops.Ry, ops.Rz][rng.randint(3)](rng.rand() * 6.) | qb
+            ops.H | qb
+        for i in range(n - 1):
+            ops.CNOT | (qureg[i], qureg[i + 1])
+        ops.Swap | (qureg[0], qureg[-1])
+
+def engines(direct):
+    r"""
+    Engine lists of both paths without the common
+    :class:`projectq.cengines.LocalOptimizer`, such that only the translation
+    is timed.
+    """
+    if direct:
+        return xmon_setup.direct_engines()[2:]
+    return [xmon_setup.replacer_xmon(), xmon_setup.xmon_supported_filter()]
+
+def run(direct, n, layers):
+    qubits = [cirq.GridQubit(0, i) for i in range(n)]
+    backend = CIRQ(qubits=qubits, direct=direct)
+    eng = projectq.MainEngine(backend=backend, engine_list=engines(direct))
+    qureg = eng.allocate_qureg(n)
+    start = time.perf_counter()
+    program(qureg, layers)
+    eng.flush()
+    elapsed = time.perf_counter() - start
+    return backend.circuit, elapsed
+
+class DirectTranslation():
+    r"""Two stage and single pass translation of random layers."""
+    params = [[False, True], [4, 16]]
+    param_names = ['direct', 'qubits']
+    number = 1
+
+    def time_translate(self, direct, qubits):
+        run(direct, qubits, 50)
+
+if __name__ == "__main__":
+    for n, layers in [(4, 50), (8, 50), (16, 50)]:
+        two_stage, t_two = min((run(False, n, layers) for _ in range(3)),
+                               key=lambda r: r[1])
+        direct, t_direct = min((run(True, n, layers) for _ in range(3)),
+                               key=lambda r: r[1])
+        assert two_stage == direct
+        ops_count = sum(len(m.operations) for m in direct)
+        print("{:3d} qubits, {:6d} operations: two stage {:.3f} s, "
+              "direct {:.3f} s, speedup {:.2f}x".format(
+                      n, ops_count, t_two, t_direct, t_two / t_direct))
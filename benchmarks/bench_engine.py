@@ -0,0 +1,85 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmarks of the CIRQ backend and the translation rules.
+"""
+import cirq
+import projectq
+from projectq import ops
+from projectq.cengines import DummyEngine
+from cirqprojectq import xmon_gates, common_rules, xmon_rules, direct_rules
+from cirqprojectq.circ_engine import CIRQ
+from cirqprojectq._rules_pq_to_cirq import Ruleset_pq_to_cirq
+from cirqprojectq._flyweight import FlyweightCache
+from _circuits import random_xmon_program, siam_trotter_program, record
+
+class CirqReceive():
+    r"""Throughput of :meth:`CIRQ.receive` for xmon gate commands."""
+    params = [[100, 1000, 10000], [2, 8]]
+    param_names = ['gates', 'qubits']
+
+    def setup(self, gates, qubits):
+        self.commands = record(random_xmon_program, qubits, gates)
+        self.qubits = [cirq.GridQubit(0, i) for i in range(qubits)]
+        self.items = len(self.commands)
+
+    def time_receive(self, gates, qubits):
+        CIRQ(qubits=self.qubits).receive(self.commands)
+
+class CirqReceiveCached():
+    r"""
+    Repeated translation of the same SIAM Trotter circuit by new CIRQ engines,
+    with and without a shared circuit cache.
+    """
+    params = [[False, True], [4, 8]]
+    param_names = ['cache', 'qubits']
+
+    def setup(self, cache, qubits):
+        self.commands = record(siam_trotter_program, qubits, 10)
+        self.qubits = [cirq.GridQubit(0, i) for i in range(qubits)]
+        self.cache = FlyweightCache(16) if cache else None
+        self.items = len(self.commands)
+
+    def time_receive(self, cache, qubits):
+        backend = CIRQ(qubits=self.qubits, circuit_cache=self.cache)
+        backend.receive(self.commands)
+        backend.circuit
+
+_CASES = {'Rx_Ry_Rz': (common_rules.ALL_RULES[0], ops.Rx(0.3), 1),
+          'Paulis': (common_rules.ALL_RULES[1], ops.X, 1),
+          'H_S': (common_rules.ALL_RULES[2], ops.H, 1),
+          'Known_Matrix': (common_rules.ALL_RULES[3], ops.T, 1),
+          'EXP_W': (xmon_rules.ALL_RULES[0], xmon_gates.ExpWGate(0.3, 0.2), 1),
+          'EXP_Z': (xmon_rules.ALL_RULES[1], xmon_gates.ExpZGate(0.3), 1),
+          'EXP_11': (xmon_rules.ALL_RULES[2], xmon_gates.Exp11Gate(0.3), 2),
+          'TEMPLATES': (direct_rules.TEMPLATES, ops.Swap, 2)}
+
+class Translate():
+    r"""Translation of a single command by each rule."""
+    params = sorted(_CASES)
+    param_names = ['rule']
+
+    def setup(self, rule):
+        rule, gate, n = _CASES[rule]
+        eng = projectq.MainEngine(backend=DummyEngine(), engine_list=[])
+        qureg = eng.allocate_qureg(n)
+        self.cmd = gate.generate_command(tuple([qb] for qb in qureg))
+        self.rules = Ruleset_pq_to_cirq([rule])
+        self.mapping = {qb.id: i for i, qb in enumerate(qureg)}
+        self.qubits = [cirq.GridQubit(0, i) for i in range(n)]
+        assert self.rules.is_available(self.cmd)
+
+    def time_translate(self, rule):
+        self.rules.translate(self.cmd, self.mapping, self.qubits)
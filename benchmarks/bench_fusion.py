@@ -0,0 +1,64 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Simulation of xmon circuits with and without the fusion of diagonal gates by
+:class:`cirqprojectq.xmon_fusion.DiagonalFusion`.
+
+Run with ``python benchmarks/bench_fusion.py`` for a report of the fused gates
+and the time saved per simulation, or as part of the benchmark suite, see
+``benchmarks/run_benchmarks.py``.
+"""
+import timeit
+from cirqprojectq.xmon_fusion import DiagonalFusion
+from cirqprojectq.xmon_simulator import XmonSimulator
+from _circuits import siam_trotter_program, ising_trotter_program, record
+
+_PROGRAMS = {'siam': siam_trotter_program, 'ising': ising_trotter_program}
+
+def commands(program, n, fuse):
+    r"""Recorded commands and the fusion engine, None if not fused."""
+    fusion = DiagonalFusion() if fuse else None
+    engine_list = [fusion] if fuse else []
+    return record(_PROGRAMS[program], n, engine_list=engine_list), fusion
+
+def simulate(command_list):
+    backend = XmonSimulator()
+    backend.is_last_engine = True
+    backend.receive(command_list)
+
+class DiagonalFusionSimulation():
+    r"""XmonSimulator on recorded commands with and without fused gates."""
+    params = [sorted(_PROGRAMS), [False, True], [12, 16]]
+    param_names = ['program', 'fuse', 'qubits']
+    number = 1
+
+    def setup(self, program, fuse, qubits):
+        self.commands, _ = commands(program, qubits, fuse)
+
+    def time_simulate(self, program, fuse, qubits):
+        simulate(self.commands)
+
+if __name__ == "__main__":
+    for program in sorted(_PROGRAMS):
+        for n in (8, 12, 16):
+            plain, _ = commands(program, n, False)
+            fused, fusion = commands(program, n, True)
+            times = [min(timeit.repeat(lambda: simulate(c), number=1, repeat=3))
+                     for c in (plain, fused)]
+            counts = fusion.fusion_counts
+            print("{:5s} {:2d} qubits: {:5d} gates fused into {:4d}, "
+                  "{:.4f} s -> {:.4f} s, saved {:.4f} s per simulation".format(
+                          program, n, counts['fused'], counts['diagonal'],
+                          times[0], times[1], times[0] - times[1]))
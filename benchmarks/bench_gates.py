@@ -0,0 +1,132 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmarks of the xmon gates and the decompositions into xmon gates.
+"""
+import numpy as np
+from scipy.stats import unitary_group
+import projectq
+from projectq import ops
+from projectq.cengines import DummyEngine
+from cirqprojectq import xmon_gates, xmon_decompositions
+
+_GATES = {'ExpW': lambda: xmon_gates.ExpWGate(0.3, 0.2),
+          'ExpZ': lambda: xmon_gates.ExpZGate(0.3),
+          'Exp11': lambda: xmon_gates.Exp11Gate(0.3)}
+
+class XmonGateMatrix():
+    r"""Matrix of a new gate and the cached matrix of an existing gate."""
+    params = sorted(_GATES)
+    param_names = ['gate']
+
+    def setup(self, gate):
+        self.gate = _GATES[gate]()
+        self.gate.matrix
+
+    def time_matrix_new(self, gate):
+        _GATES[gate]().matrix
+
+    def time_matrix_cached(self, gate):
+        self.gate.matrix
+
+class XmonGateEquality():
+    r"""Comparison of xmon gates with xmon gates and with projectq gates."""
+    params = sorted(_GATES)
+    param_names = ['gate']
+
+    def setup(self, gate):
+        self.gate = _GATES[gate]()
+        self.same = _GATES[gate]()
+        self.other = ops.Rx(0.3)
+
+    def time_eq_xmon(self, gate):
+        self.gate == self.same
+
+    def time_eq_projectq(self, gate):
+        self.gate == self.other
+
+class XmonGateBatchMatrices():
+    r"""Matrices of many gates, one gate at a time and in one batch call."""
+    params = [sorted(_GATES), [1000]]
+    param_names = ['gate', 'n']
+
+    def setup(self, gate, n):
+        rng = np.random.RandomState(1)
+        self.half_turns = rng.uniform(-2, 2, n)
+        self.axis_half_turns = rng.uniform(-2, 2, n)
+        self.items = n
+
+    def time_per_gate(self, gate, n):
+        if gate == 'ExpW':
+            [xmon_gates.ExpWGate(h, a).matrix
+             for h, a in zip(self.half_turns, self.axis_half_turns)]
+        else:
+            cls = getattr(xmon_gates, gate + 'Gate')
+            [cls(h).matrix for h in self.half_turns]
+
+    def time_batch(self, gate, n):
+        if gate == 'ExpW':
+            xmon_gates.ExpWGate.matrices(self.half_turns, self.axis_half_turns)
+        elif gate == 'ExpZ':
+            xmon_gates.ExpZGate.matrices(self.half_turns)
+        else:
+            xmon_gates.Exp11Gate.diagonals(self.half_turns)
+
+def _rule_name(rule):
+    return '{}.{}'.format(rule.gate_class.__name__, rule.gate_decomposer.__name__)
+
+_RULES = {_rule_name(rule): rule
+          for rule in xmon_decompositions.all_defined_decomposition_rules}
+
+_COMMANDS = {ops.Rx: ops.Rx(0.3), ops.Ry: ops.Ry(0.3), ops.Rz: ops.Rz(0.3),
+             ops.XGate: ops.X, ops.YGate: ops.Y, ops.ZGate: ops.Z,
+             ops.HGate: ops.H, ops.SwapGate: ops.Swap,
+             ops.SqrtSwapGate: ops.SqrtSwap, ops.R: ops.R(0.3),
+             ops.SGate: ops.S, ops.TGate: ops.T,
+             xmon_gates.ExpZGate: xmon_gates.ExpZGate(0.3),
+             xmon_gates.ExpWGate: xmon_gates.ExpWGate(0.3, 0.2)}
+
+_RULE_COMMANDS = {
+        'BasicGate._decompose_single_qubit':
+            ops.MatrixGate(unitary_group.rvs(2, random_state=1)),
+        'BasicGate._decompose_two_qubit':
+            ops.MatrixGate(unitary_group.rvs(4, random_state=1)),
+        'BasicGate._decompose_controlled_phase':
+            ops.MatrixGate(np.diag(np.exp([0.3j, 0.5j])))}
+
+class Decomposition():
+    r"""Each decomposition rule of :mod:`cirqprojectq.xmon_decompositions`."""
+    params = sorted(_RULES)
+    param_names = ['rule']
+
+    def setup(self, rule):
+        self.rule = _RULES[rule]
+        eng = projectq.MainEngine(backend=DummyEngine(), engine_list=[])
+        qureg = eng.allocate_qureg(2)
+        if rule in _RULE_COMMANDS:
+            gate = _RULE_COMMANDS[rule]
+        else:
+            gate = _COMMANDS[self.rule.gate_class]
+        if 'CNOT' in rule or '_controlled' in rule:
+            self.cmd = gate.generate_command(qureg[1])
+            self.cmd.add_control_qubits([qureg[0]])
+        elif np.shape(gate.matrix) == (4, 4):
+            self.cmd = gate.generate_command((qureg[0], qureg[1]))
+        else:
+            self.cmd = gate.generate_command(qureg[0])
+        assert self.rule.gate_recognizer(self.cmd)
+
+    def time_decompose(self, rule):
+        self.rule.gate_decomposer(self.cmd)
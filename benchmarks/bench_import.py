@@ -0,0 +1,41 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Startup time of a fresh interpreter that imports parts of cirqprojectq, as
+paid by every spawned compile worker. 'cirq, projectq' is the time of the
+dependencies alone.
+"""
+import os
+import subprocess
+import sys
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class ImportPackage():
+    r"""Interpreter startup and import of a module."""
+    params = [['cirq, projectq', 'cirqprojectq', 'cirqprojectq.xmon_gates',
+               'cirqprojectq.xmon_setup', 'cirqprojectq.circ_engine']]
+    param_names = ['module']
+    number = 1
+
+    def setup(self, module):
+        self.env = dict(os.environ)
+        self.env['PYTHONPATH'] = os.pathsep.join(
+                [_ROOT] + [p for p in [self.env.get('PYTHONPATH')] if p])
+        self.items = 1
+
+    def time_import(self, module):
+        subprocess.check_call([sys.executable, '-W', 'ignore', '-c',
+                               'import ' + module], env=self.env)
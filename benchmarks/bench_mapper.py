@@ -0,0 +1,62 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Placement and routing of xmon programs on the Bristlecone device by
+:class:`cirqprojectq.device_mapper.DeviceMapper`.
+
+Run with ``python benchmarks/bench_mapper.py`` for a report of the inserted
+swaps and the depth overhead with and without lookahead, or as part of the
+benchmark suite, see ``benchmarks/run_benchmarks.py``.
+"""
+import cirq
+from projectq.cengines import DummyEngine
+from cirqprojectq.device_mapper import DeviceMapper
+from _circuits import random_xmon_program, siam_trotter_program, record
+
+_PROGRAMS = {'random': lambda qureg: random_xmon_program(qureg, 2000),
+             'siam': siam_trotter_program}
+
+def route(commands, lookahead):
+    r"""Map the recorded commands, returns the mapper."""
+    mapper = DeviceMapper(cirq.google.Bristlecone, lookahead=lookahead)
+    mapper.next_engine = DummyEngine()
+    mapper.next_engine.is_last_engine = True
+    mapper.receive(commands)
+    return mapper
+
+class MapBristlecone():
+    r"""Mapping of recorded xmon commands to the Bristlecone device."""
+    params = [sorted(_PROGRAMS), [0, 20], [16, 36]]
+    param_names = ['program', 'lookahead', 'qubits']
+    number = 1
+
+    def setup(self, program, lookahead, qubits):
+        self.commands = record(_PROGRAMS[program], qubits)
+        self.items = len(self.commands)
+
+    def time_route(self, program, lookahead, qubits):
+        route(self.commands, lookahead)
+
+if __name__ == "__main__":
+    for program in sorted(_PROGRAMS):
+        for n in (16, 36):
+            commands = record(_PROGRAMS[program], n)
+            for lookahead in (0, 20):
+                stats = route(commands, lookahead).routing_stats
+                print("{:6s} {:2d} qubits, lookahead {:2d}: {:5d} swaps, depth "
+                      "{:5d} -> {:5d}".format(program, n, lookahead,
+                                              stats['swaps'],
+                                              stats['logical_depth'],
+                                              stats['depth']))
@@ -0,0 +1,41 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Exact SIAM reference states for a validation run over 15 times, with the
+Hamiltonian and the time evolution recomputed for every point as in the
+original example and with :mod:`cirqprojectq.siam`.
+"""
+import numpy as np
+from scipy.sparse.linalg import expm_multiply
+from cirqprojectq import siam
+
+class ExactSIAMReference():
+    r"""Exact states at 15 times."""
+    params = [['loop', 'grid'], [3, 5, 6]]
+    param_names = ['method', 'sites']
+    number = 1
+
+    def setup(self, method, sites):
+        self.times = np.linspace(0.1, 1.5, 15)
+        self.items = len(self.times)
+
+    def time_reference(self, method, sites):
+        if method == 'loop':
+            for time in self.times:
+                siam.HAMILTONIAN_CACHE.clear()
+                h = siam.hamiltonian(sites, -1., 2.)
+                expm_multiply(-1j * time * h, siam.initial_state(sites))
+        else:
+            siam.exact_states(sites, -1., 2., self.times)
@@ -0,0 +1,85 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmarks of the numpy xmon simulator against the ProjectQ C++ simulator and
+the cirq simulator.
+"""
+import numpy as np
+import cirq
+import projectq
+from projectq.backends import Simulator
+from cirqprojectq.circ_engine import CIRQ
+from cirqprojectq.xmon_simulator import XmonSimulator
+from _circuits import siam_trotter_program, record
+
+def _receive(backend, commands):
+    backend.is_last_engine = True
+    backend.receive(commands)
+    return backend
+
+class SimulateSIAM():
+    r"""
+    State vector after the Trotterized SIAM time evolution.
+
+    The xmon simulator and the ProjectQ simulator receive the recorded xmon
+    gate commands, the cirq simulator simulates the translated circuit.
+    """
+    params = [['xmon', 'projectq', 'cirq'], [8, 12, 16]]
+    param_names = ['simulator', 'qubits']
+    number = 1
+
+    def setup(self, simulator, qubits):
+        self.commands = record(siam_trotter_program, qubits)
+        self.items = len(self.commands)
+        if simulator == 'cirq':
+            backend = CIRQ(qubits=[cirq.LineQubit(i) for i in range(qubits)])
+            eng = projectq.MainEngine(backend=backend, engine_list=[])
+            siam_trotter_program(eng.allocate_qureg(qubits))
+            eng.flush()
+            self.circuit = backend.circuit
+            self.simulator = cirq.Simulator()
+
+    def time_simulate(self, simulator, qubits):
+        if simulator == 'xmon':
+            _receive(XmonSimulator(), self.commands)
+        elif simulator == 'projectq':
+            _receive(Simulator(), self.commands)
+        else:
+            self.simulator.simulate(self.circuit)
+
+class SweepSIAM():
+    r"""
+    SIAM time evolution for many interaction strengths, in one pass in batch
+    mode and one simulation per value.
+    """
+    params = [[1, 16, 64], [8, 12]]
+    param_names = ['points', 'qubits']
+    number = 1
+
+    def setup(self, points, qubits):
+        self.values = np.linspace(-.1, .1, points)
+        self.commands = record(siam_trotter_program, qubits, 10, -0.3 * np.pi,
+                               cirq.Symbol('u'))
+        self.point_commands = [
+                record(siam_trotter_program, qubits, 10, -0.3 * np.pi, -10 * np.pi * u)
+                for u in self.values]
+        self.items = points
+
+    def time_batch(self, points, qubits):
+        _receive(XmonSimulator(params={'u': self.values}), self.commands)
+
+    def time_loop(self, points, qubits):
+        for commands in self.point_commands:
+            _receive(XmonSimulator(), commands)
@@ -0,0 +1,54 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Sweep of SIAM simulations over the interaction strength and the Trotter order
+with :func:`cirqprojectq.sweep.run_sweep`, in the calling process and on a
+process pool with one worker per core.
+"""
+import os
+import numpy as np
+from cirqprojectq import xmon_gates
+from cirqprojectq.sweep import run_sweep
+from cirqprojectq.xmon_simulator import XmonSimulator
+from _circuits import siam_trotter_program, record
+
+def _program(qureg, U, order):
+    r"""SIAM time evolution starting with one spin up and one spin down electron."""
+    xmon_gates.ExpWGate(1) | qureg[0]
+    xmon_gates.ExpWGate(1) | qureg[len(qureg) // 2]
+    siam_trotter_program(qureg, 10, -0.3 * np.pi, U, order)
+
+def build(U, order):
+    return record(_program, 10, U, order)
+
+def evaluate(commands, U, order):
+    r"""Probability to find the electrons in the initial orbitals."""
+    backend = XmonSimulator()
+    backend.is_last_engine = True
+    backend.receive(commands)
+    return abs(backend.cheat()[1][1 + (1 << 5)]) ** 2
+
+class SweepSIAMPool():
+    r"""32 points of SIAM simulations with 10 qubits."""
+    params = sorted({1, os.cpu_count() or 1})
+    param_names = ['workers']
+    number = 1
+
+    def setup(self, workers):
+        self.grid = {'U': np.linspace(0, 2, 16), 'order': [1, 2]}
+        self.items = 32
+
+    def time_sweep(self, workers):
+        run_sweep(build, self.grid, evaluate, max_workers=workers)
@@ -0,0 +1,40 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Construction of Trotterized SIAM circuits by appending every step with the
+EARLIEST strategy and with :func:`cirqprojectq.trotter.repeat_step`.
+"""
+import cirq
+from cirqprojectq.trotter import repeat_step
+from _circuits import siam_trotter_step
+
+class BuildSIAMCircuit():
+    r"""SIAM circuit with 12 qubits and an increasing number of steps."""
+    params = [['append', 'repeat'], [10, 100, 1000]]
+    param_names = ['method', 'steps']
+    number = 1
+
+    def setup(self, method, steps):
+        self.qubits = cirq.LineQubit.range(12)
+        self.items = steps
+
+    def time_build(self, method, steps):
+        if method == 'append':
+            circuit = cirq.Circuit()
+            for _ in range(steps):
+                circuit.append(siam_trotter_step(self.qubits),
+                               strategy=cirq.InsertStrategy.EARLIEST)
+        else:
+            repeat_step(siam_trotter_step(self.qubits), steps)
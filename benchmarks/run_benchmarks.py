@@ -0,0 +1,190 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""Runs the benchmark suite and writes the results to a JSON file.
+
+Benchmarks are written in the style of `asv <https://asv.readthedocs.io>`_:
+every module ``benchmarks/bench_*.py`` may define classes with methods whose
+names start with ``time_``. A class can define
+
+* ``params``: a list of parameter values, or a list of lists for several
+  parameters. The benchmark is run for every combination.
+* ``param_names``: names of the parameters.
+* ``setup(self, *params)``: called before timing, not timed.
+* ``number``: number of calls per timing. Determined automatically if not
+  given.
+
+If ``setup`` sets the attribute ``items``, e.g., the number of commands
+processed by one call, the rate in items per second is reported as well.
+
+Usage::
+
+    python benchmarks/run_benchmarks.py -o results.json
+    python benchmarks/run_benchmarks.py -b translate -o new.json --compare results.json
+
+With ``--compare`` the exit code is 1 if a benchmark is slower than the stored
+result by more than the given factor.
+"""
+import argparse
+import datetime
+import glob
+import importlib
+import inspect
+import itertools
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import timeit
+import numpy as np
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+def _modules():
+    sys.path.insert(0, _HERE)
+    sys.path.insert(0, os.path.dirname(_HERE))
+    for path in sorted(glob.glob(os.path.join(_HERE, 'bench_*.py'))):
+        yield importlib.import_module(os.path.basename(path)[:-3])
+
+def _benchmarks(pattern):
+    for module in _modules():
+        for class_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for method in sorted(m for m in dir(cls) if m.startswith('time_')):
+                name = '.'.join([module.__name__, class_name, method])
+                if re.search(pattern, name):
+                    yield name, cls, method
+
+def _param_sets(cls):
+    params = getattr(cls, 'params', None)
+    if params is None:
+        return [()]
+    if not params or not isinstance(params[0], (list, tuple)):
+        params = [params]
+    return list(itertools.product(*params))
+
+def _run(cls, method, params, repeat):
+    instance = cls()
+    if hasattr(instance, 'setup'):
+        instance.setup(*params)
+    func = getattr(instance, method)
+    timer = timeit.Timer(lambda: func(*params))
+    number = getattr(instance, 'number', None)
+    if number is None:
+        number = max(1, timer.autorange()[0] // 5)
+    times = np.array(timer.repeat(repeat=repeat, number=number)) / number
+    result = dict(min=float(times.min()), median=float(np.median(times)),
+                  stddev=float(times.std()), number=number, repeat=repeat)
+    items = getattr(instance, 'items', None)
+    if items:
+        result['rate'] = items / result['min']
+    return result
+
+def _environment():
+    import cirq, projectq
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=_HERE,
+                                         stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return dict(date=datetime.datetime.now().isoformat(), commit=commit,
+                python=platform.python_version(), machine=platform.machine(),
+                processor=platform.processor(), node=platform.node(),
+                packages=dict(cirq=cirq.__version__,
+                              projectq=projectq.__version__,
+                              numpy=np.__version__))
+
+def run_benchmarks(pattern='', repeat=5, verbose=True):
+    r"""
+    Run all benchmarks whose name matches a pattern.
+
+    Args:
+        pattern (str): regular expression matched against
+            ``module.class.method``.
+        repeat (int): number of timings per benchmark.
+        verbose (bool): print the results.
+
+    Returns:
+        dict: the environment and a list of results, one entry per benchmark
+        and parameter set with the times per call in seconds.
+    """
+    results = []
+    for name, cls, method in _benchmarks(pattern):
+        names = getattr(cls, 'param_names', [])
+        for params in _param_sets(cls):
+            result = _run(cls, method, params, repeat)
+            result['name'] = name
+            result['params'] = dict(zip(names, [repr(p) for p in params]))
+            results.append(result)
+            if verbose:
+                rate = ''
+                if 'rate' in result:
+                    rate = ' ({:.4g} items/s)'.format(result['rate'])
+                print('{}({}): {:.4g} s{}'.format(
+                        name, ', '.join(repr(p) for p in params), result['min'],
+                        rate))
+    return dict(environment=_environment(), results=results)
+
+def compare(results, reference, threshold=1.2):
+    r"""
+    Compare benchmark results to reference results.
+
+    Args:
+        results (dict): results of :meth:`run_benchmarks`.
+        reference (dict): earlier results of :meth:`run_benchmarks`.
+        threshold (float): a benchmark is a regression if its minimal time is
+            larger than threshold times the reference time.
+
+    Returns:
+        list of (name, params, ratio): the regressions.
+    """
+    def key(result):
+        return result['name'], json.dumps(result['params'], sort_keys=True)
+    old = {key(result): result['min'] for result in reference['results']}
+    regressions = []
+    for result in results['results']:
+        if key(result) in old:
+            ratio = result['min'] / old[key(result)]
+            if ratio > threshold:
+                regressions.append((result['name'], result['params'], ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-b', '--bench', default='',
+                        help='regular expression selecting benchmarks')
+    parser.add_argument('-o', '--output', help='JSON file for the results')
+    parser.add_argument('-r', '--repeat', type=int, default=5)
+    parser.add_argument('--compare', help='JSON file with reference results')
+    parser.add_argument('--threshold', type=float, default=1.2)
+    args = parser.parse_args(argv)
+    results = run_benchmarks(args.bench, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as fl:
+            json.dump(results, fl, indent=1, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as fl:
+            reference = json.load(fl)
+        regressions = compare(results, reference, args.threshold)
+        for name, params, ratio in regressions:
+            print('REGRESSION {}({}): {:.2f}x slower'.format(
+                    name, ', '.join(params.values()), ratio))
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
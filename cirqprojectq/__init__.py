@@ -22,17 +22,55 @@ Cirqprojectq provides two main functionalities: Firstly, it provides methods and
 classes that can port algorithms from projectq to cirq and secondly it introduces
 Xmon gates and xmon gate compositions to projectq.
 
+The submodules are imported when they are first accessed.
+
 .. autosummary::
 
     xmon_gates
     xmon_decompositions
     xmon_rules
+    direct_rules
     xmon_setup
+    xmon_optimizer
+    xmon_replacer
+    xmon_simulator
+    xmon_fusion
+    device_mapper
+    sweep
+    trotter
+    siam
     circ_engine
 """
 
-from . import (xmon_gates,
-               xmon_decompositions,
-               xmon_rules,
-               xmon_setup,
-               circ_engine)
\ No newline at end of file
+import importlib
+import sys
+
+# The submodules are imported on first access, such that short-lived processes
+# only pay for the submodules they use.
+__all__ = ['xmon_gates',
+           'xmon_decompositions',
+           'xmon_rules',
+           'direct_rules',
+           'xmon_setup',
+           'xmon_optimizer',
+           'xmon_replacer',
+           'xmon_simulator',
+           'xmon_fusion',
+           'device_mapper',
+           'sweep',
+           'trotter',
+           'siam',
+           'circ_engine']
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+if sys.version_info < (3, 7):
+    # Module level __getattr__ requires Python 3.7.
+    for _name in __all__:
+        importlib.import_module('.' + _name, __name__)
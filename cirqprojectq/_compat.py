@@ -0,0 +1,34 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+This file probes the capabilities of the installed cirq version.
+
+Cirq 0.3 provides the xmon gates as classes in :mod:`cirq.google`, cirq 0.4
+replaced them by :class:`cirq.PhasedXPowGate` and the power gates. The
+translation rules are selected with a single cached probe instead of parsing
+the version string.
+"""
+import functools
+import cirq
+
+@functools.lru_cache(maxsize=None)
+def legacy_cirq():
+    r"""
+    Whether cirq provides the xmon gate classes of cirq 0.3.
+
+    Returns:
+        bool: True for cirq 0.3 and older.
+    """
+    return hasattr(cirq.google, 'ExpWGate')
@@ -0,0 +1,142 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+This file provides a flyweight cache for cirq gates and operations.
+
+Translations from ProjectQ to Cirq create the same gates, e.g.,
+:class:`cirq.PhasedXPowGate` with half turns 0.5, over and over again. Cirq
+gates and operations are immutable, hence identical instances can be shared
+between all operations of a circuit. The cache is bounded and evicts the least
+recently used entries.
+"""
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+class FlyweightCache():
+    def __init__(self, maxsize=4096):
+        r"""
+        Bounded LRU cache of cirq gates and operations.
+
+        Entries are keyed on the gate class, the gate parameters and, for
+        operations, the qubits. Parameters that are not hashable are not cached.
+
+        Args:
+            maxsize (int): maximal number of cached entries. If 0, nothing is
+                cached.
+        """
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def _lookup(self, key, factory, *args, **kwargs):
+        try:
+            value = self._cache[key]
+        except KeyError:
+            self._misses += 1
+            value = factory(*args, **kwargs)
+            if self.maxsize > 0:
+                self._cache[key] = value
+                if len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+            return value
+        except TypeError:
+            self._misses += 1
+            return factory(*args, **kwargs)
+        self._hits += 1
+        self._cache.move_to_end(key)
+        return value
+
+    def gate(self, gate_class, **params):
+        r"""
+        Shared instance of a cirq gate.
+
+        Args:
+            gate_class (type): class of the cirq gate.
+            params: keyword arguments of the gate constructor.
+
+        Returns:
+            :class:`cirq.Gate`
+        """
+        key = (gate_class, tuple(sorted(params.items())))
+        return self._lookup(key, gate_class, **params)
+
+    def operation(self, gate_class, qubits, **params):
+        r"""
+        Shared instance of a cirq operation.
+
+        Args:
+            gate_class (type): class of the cirq gate.
+            qubits (tuple of :class:`cirq.QubitId`): qubits the gate acts on.
+            params: keyword arguments of the gate constructor.
+
+        Returns:
+            :class:`cirq.Operation`
+        """
+        key = (gate_class, tuple(sorted(params.items())), tuple(qubits))
+        return self._lookup(key, self._new_operation, gate_class, qubits,
+                            params)
+
+    def lookup(self, key, factory, *args):
+        r"""
+        Shared value for an arbitrary key.
+
+        Args:
+            key (hashable): key that identifies the value.
+            factory (callable): creates the value from args on a cache miss.
+            args: arguments of factory.
+
+        Returns:
+            The cached or created value.
+        """
+        return self._lookup(key, factory, *args)
+
+    def operations(self, key, factory, *args):
+        r"""
+        Shared tuple of cirq operations, e.g., the translation of a gate
+        template.
+
+        Args:
+            key (hashable): key that identifies the operations.
+            factory (callable): creates the operations from args on a cache
+                miss.
+            args: arguments of factory.
+
+        Returns:
+            tuple of :class:`cirq.Operation`
+        """
+        return self._lookup(key, lambda: tuple(factory(*args)))
+
+    def _new_operation(self, gate_class, qubits, params):
+        return self.gate(gate_class, **params).on(*qubits)
+
+    def info(self):
+        r"""
+        Cache statistics.
+
+        Returns:
+            CacheInfo: hits, misses, maxsize and current size of the cache.
+        """
+        return CacheInfo(self._hits, self._misses, self.maxsize,
+                         len(self._cache))
+
+    def clear(self):
+        r"""Remove all entries and reset the statistics."""
+        self._cache.clear()
+        self._hits = 0
+        self._misses = 0
+
+GATE_CACHE = FlyweightCache()
@@ -0,0 +1,122 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+This file provides statistics of the translation from ProjectQ to Cirq.
+
+The statistics are only collected by engines that are instrumented, see
+:class:`cirqprojectq.circ_engine.CIRQ`, such that engines without
+instrumentation do not pay for the bookkeeping.
+"""
+import time
+from collections import defaultdict, namedtuple
+
+RuleStats = namedtuple('RuleStats', ['calls', 'time', 'failures'])
+FlushStats = namedtuple('FlushStats', ['calls', 'time', 'max_time'])
+
+class TranslationStats():
+    def __init__(self):
+        r"""
+        Counters of translation rules and flushes of a CIRQ engine.
+
+        For every rule and gate class the number of translations, the
+        cumulative time of the translations in seconds and the number of failed
+        translations are counted. Flushes are counted together with the
+        cumulative and the longest time to schedule the buffered operations,
+        as well as the largest number of operations buffered between two
+        flushes and of moments held by the engine.
+        """
+        self.reset()
+
+    def reset(self):
+        r"""Reset all counters."""
+        self._rules = defaultdict(lambda: [0, 0., 0])
+        self._flushes = [0, 0., 0.]
+        self._max_buffered_operations = 0
+        self._max_buffered_moments = 0
+
+    def translate(self, rules, cmd, mapping, qubits):
+        r"""
+        Translate a command and count the call of the applied rule.
+
+        Args:
+            rules (:class:`cirqprojectq._rules_pq_to_cirq.Ruleset_pq_to_cirq`):
+                the rule set.
+            cmd (:class:`projectq.ops.Command`): a projectq command instance
+            mapping (:class:`dict`): a dictionary of qubit mappings
+            qubits (list of :class:cirq.QubitID`): cirq qubits
+
+        Returns:
+            :class:`cirq.Operation` or a list or tuple of :class:`cirq.Operation`
+
+        Raises:
+            TypeError: if no rule is known for the gate.
+        """
+        rule = rules.find_rule(cmd)
+        entry = self._rules[(None if rule is None else rule.name,
+                             cmd.gate.__class__.__name__)]
+        entry[0] += 1
+        start = time.perf_counter()
+        try:
+            if rule is None:
+                raise TypeError("Gate {} not known".format(cmd.gate.__class__))
+            return rule.translation(cmd, mapping, qubits)
+        except Exception:
+            entry[2] += 1
+            raise
+        finally:
+            entry[1] += time.perf_counter() - start
+
+    def record_flush(self, duration, operations, moments):
+        r"""
+        Record a flush.
+
+        Args:
+            duration (float): time to schedule the operations in seconds.
+            operations (int): number of operations buffered since the last
+                flush.
+            moments (int): number of moments held by the engine after the
+                flush.
+        """
+        self._flushes[0] += 1
+        self._flushes[1] += duration
+        self._flushes[2] = max(self._flushes[2], duration)
+        self._max_buffered_operations = max(self._max_buffered_operations,
+                                            operations)
+        self._max_buffered_moments = max(self._max_buffered_moments, moments)
+
+    def snapshot(self):
+        r"""
+        Copy of the current statistics.
+
+        Returns:
+            dict: with the keys
+
+            * ``'rules'``: dict rule name -> dict gate class name ->
+              :class:`RuleStats`. Commands without rule are counted as
+              failures of the rule None.
+            * ``'flushes'``: :class:`FlushStats` with the number of flushes,
+              their cumulative and their longest duration in seconds.
+            * ``'max_buffered_operations'``: largest number of operations
+              buffered between two flushes.
+            * ``'max_buffered_moments'``: largest number of moments held by
+              the engine after a flush.
+        """
+        rules = {}
+        for (rule, gate), entry in self._rules.items():
+            rules.setdefault(rule, {})[gate] = RuleStats(*entry)
+        return dict(rules=rules,
+                    flushes=FlushStats(*self._flushes),
+                    max_buffered_operations=self._max_buffered_operations,
+                    max_buffered_moments=self._max_buffered_moments)
@@ -0,0 +1,178 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+This file provides an incremental scheduler that places cirq operations into
+moments.
+
+The scheduler keeps, for every qubit, the index of the last moment that acts
+on it (the frontier). Placing an operation with
+:class:`cirq.circuits.InsertStrategy.EARLIEST` then only requires the frontier
+of the qubits of the operation instead of a backwards search through the
+moments of the circuit, i.e., the cost per operation does not depend on the
+depth of the circuit.
+
+Moments that can not receive any further operations can be removed from the
+scheduler with :meth:`MomentScheduler.pop_sealed`, which allows to stream a
+circuit moment by moment.
+"""
+import cirq
+from cirq.circuits import InsertStrategy
+
+class MomentScheduler():
+    def __init__(self):
+        r"""
+        Incremental scheduler for cirq operations.
+
+        Operations are placed as :meth:`cirq.Circuit.append` places them for
+        the given :class:`cirq.circuits.InsertStrategy`.
+        """
+        self._operations = []
+        self._moments = []
+        self._dirty = set()
+        self._frontier = dict()
+        self._offset = 0
+
+    def __len__(self):
+        return len(self._operations)
+
+    def copy(self):
+        r"""
+        Independent copy of the scheduler.
+
+        Returns:
+            :class:`MomentScheduler`: a scheduler with the same moments and
+            frontier. Built moments are shared, since they are immutable.
+        """
+        other = MomentScheduler()
+        other._operations = [list(ops) for ops in self._operations]
+        other._moments = self.moments
+        other._frontier = self._frontier.copy()
+        other._offset = self._offset
+        return other
+
+    @property
+    def offset(self):
+        r"""
+        int: number of moments that have been removed by :meth:`pop_sealed`.
+        """
+        return self._offset
+
+    def _place(self, op, index):
+        r"""Add an operation to the moment with absolute index `index`."""
+        local = index - self._offset
+        if local == len(self._operations):
+            self._operations.append([op])
+            self._moments.append(None)
+        else:
+            self._operations[local].append(op)
+        self._dirty.add(local)
+        for q in op.qubits:
+            self._frontier[q] = index
+
+    def append(self, operations, strategy=InsertStrategy.EARLIEST):
+        r"""
+        Place operations into moments.
+
+        Args:
+            operations (iterable of :class:`cirq.Operation`): operations in
+                the order in which they are applied.
+            strategy (:class:`cirq.circuits.InsertStrategy`): insert strategy
+                as in :meth:`cirq.Circuit.append`.
+
+        Raises:
+            ValueError: if the strategy is unknown.
+        """
+        frontier = self._frontier
+        if strategy is InsertStrategy.EARLIEST:
+            for op in operations:
+                index = max([frontier.get(q, -1) for q in op.qubits],
+                            default=self._offset - 1) + 1
+                self._place(op, index)
+            return
+        if strategy not in (InsertStrategy.NEW, InsertStrategy.INLINE,
+                            InsertStrategy.NEW_THEN_INLINE):
+            raise ValueError('Unrecognized append strategy: {}'.format(strategy))
+        for op in operations:
+            last = self._offset + len(self._operations) - 1
+            if (strategy is not InsertStrategy.INLINE or not self._operations
+                    or any(frontier.get(q, -1) == last for q in op.qubits)):
+                self._place(op, last + 1)
+            else:
+                self._place(op, last)
+            if strategy is InsertStrategy.NEW_THEN_INLINE:
+                strategy = InsertStrategy.INLINE
+
+    def touch(self, qubit):
+        r"""
+        Make sure operations on a qubit are placed after removed moments.
+
+        Args:
+            qubit (:class:`cirq.QubitId`): a qubit that becomes active.
+        """
+        self._frontier[qubit] = max(self._frontier.get(qubit, -1),
+                                    self._offset - 1)
+
+    def pop_sealed(self, active_qubits, strategy=InsertStrategy.EARLIEST):
+        r"""
+        Remove and return the moments that no later operation can be added to.
+
+        With :class:`cirq.circuits.InsertStrategy.EARLIEST` these are all
+        moments up to the smallest frontier of the active qubits. For the other
+        strategies only the last moment can receive further operations. If no
+        qubit is active, all moments are returned.
+
+        Args:
+            active_qubits (iterable of :class:`cirq.QubitId`): qubits that may
+                receive further operations.
+            strategy (:class:`cirq.circuits.InsertStrategy`): insert strategy
+                of later operations.
+
+        Returns:
+            list(:class:`cirq.Moment`)
+        """
+        frontier = [self._frontier.get(q, -1) for q in active_qubits]
+        if not frontier:
+            count = len(self._operations)
+        elif strategy is InsertStrategy.EARLIEST:
+            count = min(frontier) + 1 - self._offset
+        else:
+            count = len(self._operations) - 1
+        if count <= 0:
+            return []
+        moments = self.moments[:count]
+        del self._operations[:count]
+        del self._moments[:count]
+        self._dirty = set()
+        self._offset += count
+        return moments
+
+    @property
+    def moments(self):
+        r"""
+        list(:class:`cirq.Moment`): the scheduled moments.
+
+        Only moments that changed since the last call are rebuilt.
+        """
+        for index in self._dirty:
+            self._moments[index] = cirq.Moment(self._operations[index])
+        self._dirty.clear()
+        return list(self._moments)
+
+    @property
+    def frontier(self):
+        r"""
+        dict: index of the last moment acting on each qubit.
+        """
+        return self._frontier.copy()
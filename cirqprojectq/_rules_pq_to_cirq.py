@@ -15,6 +15,16 @@
 """
 This file provides classes to store rules for translating ProjectQ to Cirq
 operations.
+
+Rules are registered per gate class. Lookups resolve a gate class through its
+method resolution order (MRO), i.e., a rule registered for a base class also
+applies to its subclasses unless a more specific rule exists. Rules with a
+recognizer only apply to the commands they recognize; otherwise the next rule
+is used. Each resolution is stored in a dispatch table such that availability
+checks and translations of subsequent commands with the same gate class cost a
+single dictionary lookup. The rule found for the last command is remembered,
+such that translating a command right after checking its availability does not
+run the recognizers again.
 """
 from collections import defaultdict
 
@@ -28,6 +38,8 @@ class Ruleset_pq_to_cirq():
             rules (list of :class:`Rule_pq_to_cirq`): the rules that can be used for translations.
         """
         self._known_rules = defaultdict(list)
+        self._dispatch = dict()
+        self._last = (None, None, None)
         self.add_rules(rules)
 
     def add_rules(self, rules=[]):
@@ -48,11 +60,83 @@ class Ruleset_pq_to_cirq():
         r"""
         Add a single rule to the set of known rules.
 
+        The dispatch table and the rule remembered for the last command are
+        invalidated, the dispatch table is rebuilt lazily.
+
         Args:
             rule (:class:`Rule_pq_to_cirq`): a rule that can be used for translations.
         """
         for cls in rule.classes:
-            self._known_rules[cls].append(rule.translation)
+            self._known_rules[cls].append(rule)
+        self._dispatch.clear()
+        self._last = (None, None, None)
+
+    def _resolve(self, gate_class):
+        r"""
+        Find the rules for a gate class by walking its method resolution order.
+
+        Args:
+            gate_class (type): class of a projectq gate.
+
+        Returns:
+            tuple of :class:`Rule_pq_to_cirq`: rules in order of precedence.
+        """
+        return tuple(rule for cls in gate_class.__mro__
+                     for rule in self._known_rules.get(cls, ()))
+
+    def get_rules(self, gate_class):
+        r"""
+        Rules that can translate gates of the given class.
+
+        Args:
+            gate_class (type): class of a projectq gate.
+
+        Returns:
+            tuple of :class:`Rule_pq_to_cirq`: rules in order of precedence.
+        """
+        try:
+            return self._dispatch[gate_class]
+        except KeyError:
+            rules = self._resolve(gate_class)
+            self._dispatch[gate_class] = rules
+            return rules
+
+    def find_rule(self, cmd):
+        r"""
+        Rule that translates a projectq command.
+
+        The result for the last command is remembered, such that
+        :meth:`is_available` followed by :meth:`translate` of the same command
+        only runs the recognizers once.
+
+        Args:
+            cmd (:class:`projectq.ops.Command`): a projectq command instance
+
+        Returns:
+            :class:`Rule_pq_to_cirq` or None if no rule applies.
+        """
+        last_cmd, last_gate, last_rule = self._last
+        if cmd is last_cmd and cmd.gate is last_gate:
+            return last_rule
+        found = None
+        for rule in self.get_rules(type(cmd.gate)):
+            if rule.recognizer is None or rule.recognizer(cmd):
+                found = rule
+                break
+        self._last = (cmd, cmd.gate, found)
+        return found
+
+    def is_available(self, cmd):
+        r"""
+        Check if a projectq command can be translated.
+
+        Args:
+            cmd (:class:`projectq.ops.Command`): a projectq command instance
+
+        Returns:
+            bool: True if a rule applies to the command.
+        """
+        return self.find_rule(cmd) is not None
 
     def translate(self, cmd, mapping, qubits):
         r"""
@@ -64,28 +148,40 @@ class Ruleset_pq_to_cirq():
             qubits (list of :class:cirq.QubitID`): cirq qubits
 
         Returns:
-            :class:`cirq.Operation`
+            :class:`cirq.Operation` or a list or tuple of :class:`cirq.Operation`
+
+        Raises:
+            TypeError: if no rule is known for the gate.
         """
-        if type(cmd.gate) in self._known_rules:
-            return self._known_rules[type(cmd.gate)][0](cmd, mapping, qubits)
-        else:
-            raise TypeError
+        rule = self.find_rule(cmd)
+        if rule is None:
+            raise TypeError("Gate {} not known".format(cmd.gate.__class__))
+        return rule.translation(cmd, mapping, qubits)
 
     @property
     def known_rules(self):
         """
         Dictionary of known translations.
         """
-        return self._known_rules.copy()
+        return {cls: [rule.translation for rule in rules]
+                for cls, rules in self._known_rules.items()}
 
 class Rule_pq_to_cirq():
-    def __init__(self, classes, translation):
+    def __init__(self, classes, translation, recognizer=None, name=None):
         r"""
         A class to store a single translation rule from Projectq to Cirq.
 
         Args:
             classes (list of :class:`projectq.ops.BasicGate`): the gate classes to which the rule applies.
             translation (callable(:class:`projectq.ops.Command`, :class:`dict`, list of :class:cirq.QubitID`)): a translation to cirq
+                returning a :class:`cirq.Operation` or a list or tuple of operations.
+            recognizer (callable(:class:`projectq.ops.Command`)): optional
+                check if the rule can translate a given command. If None, the
+                rule applies to all commands with a gate of one of the classes.
+            name (str): name of the rule used in statistics. Defaults to the
+                name of the translation function.
         """
         self.classes = classes
         self.translation = translation
+        self.recognizer = recognizer
+        self.name = name or getattr(translation, '__name__', repr(translation))
@@ -15,17 +15,47 @@
 """
 Provides a projectq engine that translates a projectq circuit to a cirq circuit.
 """
+import inspect
+import time
 import cirq
-version = [int(cirq.__version__[0]), int(cirq.__version__[2])]
-if (version[0] == 0 and version[1] <= 3):
-    from .common_rules_03x import common_gates_ruleset
-else:
-    from .common_rules_040 import common_gates_ruleset
 from projectq import ops as pqo
 from projectq.cengines import BasicEngine
 from projectq.meta import get_control_count
-from . import xmon_rules
-import cirq
+from . import common_rules, xmon_rules, direct_rules, xmon_gates
+from ._rules_pq_to_cirq import Ruleset_pq_to_cirq
+from ._moment_scheduler import MomentScheduler
+from ._flyweight import GATE_CACHE, FlyweightCache
+from ._instrumentation import TranslationStats
+
+_ALWAYS_AVAILABLE = (pqo.MeasureGate, pqo.AllocateQubitGate,
+                     pqo.DeallocateQubitGate, pqo.BarrierGate)
+
+# Default rule sets, shared by all engines such that the dispatch tables and
+# the keys of shared circuit caches are shared as well.
+_DEFAULT_RULES = Ruleset_pq_to_cirq(common_rules.ALL_RULES + xmon_rules.ALL_RULES)
+_DIRECT_RULES = Ruleset_pq_to_cirq(direct_rules.ALL_RULES)
+
+def _gate_key(gate):
+    r"""
+    Hashable key of a gate that determines its translation.
+
+    Args:
+        gate (:class:`projectq.ops.BasicGate`): a projectq gate.
+
+    Returns:
+        The class and the canonical parameters of xmon, rotation and phase
+        gates, the class of parameterless projectq gates and None for all
+        other gates.
+    """
+    if isinstance(gate, xmon_gates.XmonGate):
+        return (type(gate), gate._key)
+    if isinstance(gate, (pqo.BasicRotationGate, pqo.BasicPhaseGate)):
+        return (type(gate), gate.angle)
+    gate_class = type(gate)
+    if (gate_class.__eq__ is pqo.BasicGate.__eq__ and
+            gate_class.__module__.startswith('projectq.ops')):
+        return gate_class
+    return None
 
 class CIRQ(BasicEngine):
     r"""
@@ -34,21 +64,72 @@ class CIRQ(BasicEngine):
     Args:
         qubits (list(:class:`cirq.devices.grid_qubit`)): the qubits
         device (:class:`cirq.devices.Device`): a device that provides the qubits.
-        rules (cirqprojectq._rules_pq_to_cirq.Ruleset_pq_to_cirq): rule set
+            The qubit with id k is the k-th of the sorted qubits of the
+            device. Use a :class:`cirqprojectq.device_mapper.DeviceMapper` to
+            place the qubits on the device.
+        rules (cirqprojectq._rules_pq_to_cirq.Ruleset_pq_to_cirq): rule set.
+            Defaults to the rules for common gates and xmon gates.
         strategy (:class:`cirq.circuits.InsertStrategy`): Insert strategy in cirq.
+        moment_sink (callable(:class:`cirq.Moment`) or generator): optional
+            consumer of finished moments. If given, the engine streams the
+            circuit: on every flush, moments that no later operation can be
+            added to are passed to the sink (called, or sent to the generator,
+            which is primed by the engine) and removed from the engine.
+        direct (bool): If True and no rules are given, the engine only
+            accepts xmon gates and common gates with an xmon gate template,
+            see :mod:`cirqprojectq.direct_rules`. The latter are translated in
+            a single pass to the cirq operations of their templates; all other
+            gates have to be decomposed by the preceding engines, see
+            :meth:`cirqprojectq.xmon_setup.direct_engines`.
+        instrument (bool): If True, the engine collects statistics of the
+            translation rules and flushes, see :meth:`stats`.
+        circuit_cache (int or :class:`cirqprojectq._flyweight.FlyweightCache`):
+            If given, the translated operations of the commands between two
+            flushes are cached in an LRU cache of this size, or in the given
+            cache which can be shared by several engines. The key is the
+            sequence of gate classes, canonical gate parameters and mapped
+            qubits of the commands. If the same sequence is received again, the
+            cached operations are used instead of translating the commands.
+
+    Note:
+        In streaming mode :attr:`circuit` only contains the moments that have
+        not been passed to the sink yet. Operations on a newly allocated qubit
+        are never placed into a moment that has already been passed on.
+
+    Note:
+        With a circuit cache, commands are translated on the next flush, i.e.,
+        translation errors are raised by the flush. Commands with gates
+        without key, see :func:`_gate_key`, disable the cache until the next
+        flush.
     """
     def __init__(self, qubits=None, device=None, rules=None,
-                 strategy=cirq.circuits.InsertStrategy.EARLIEST):
+                 strategy=cirq.circuits.InsertStrategy.EARLIEST,
+                 moment_sink=None, direct=False, instrument=False,
+                 circuit_cache=None):
         BasicEngine.__init__(self)
         self.strategy = strategy
-        #TODO: Make rules an input.
-        if rules is None:
-            self._rules = common_gates_ruleset
-            self._rules.add_rules(xmon_rules.ALL_RULES)
+        if inspect.isgenerator(moment_sink):
+            next(moment_sink)
+            moment_sink = moment_sink.send
+        self._moment_sink = moment_sink
+        if rules is None and direct:
+            rules = _DIRECT_RULES
+        elif rules is None:
+            rules = _DEFAULT_RULES
+        self._rules = rules
+        self._stats = TranslationStats() if instrument else None
+        if isinstance(circuit_cache, int):
+            circuit_cache = FlyweightCache(circuit_cache)
+        self._circuit_cache = circuit_cache
 
         assert not (qubits is None and device is None), "Please specify one of qubits or device!"
         self._device = device
-        self._qubits = qubits or device.qubits
+        if qubits is None:
+            # Devices provide their qubits as a set, the mapped id of a qubit
+            # is its index in the sorted qubits, see
+            # :class:`cirqprojectq.device_mapper.DeviceMapper`.
+            qubits = sorted(device.qubits)
+        self._qubits = list(qubits)
         self._reset()
         self._new = True
 
@@ -57,13 +138,16 @@ class CIRQ(BasicEngine):
         r"""
         :class:`cirq.Circuit`: the circuit stored in the engine.
         """
+        if self._circuit is None:
+            self._circuit = cirq.circuits.Circuit(self._scheduler.moments)
         return self._circuit
 
-# TODO: use a device?
     @property
     def device(self):
         r"""
-        :class:`cirq.devices.Device`: A device. Currently not used.
+        :class:`cirq.devices.Device`: The device providing the qubits or None.
+        The mapped id of a qubit is its index in the sorted device qubits, see
+        :class:`cirqprojectq.device_mapper.DeviceMapper`.
         """
         return self._device
 
@@ -74,22 +158,69 @@ class CIRQ(BasicEngine):
         """
         return self._qubits
 
+    def cache_info(self):
+        r"""
+        Statistics of the flyweight cache of translated cirq gates and
+        operations.
+
+        The cache is shared by all translation rules and engines.
+
+        Returns:
+            CacheInfo: named tuple with hits, misses, maxsize and currsize.
+        """
+        return GATE_CACHE.info()
+
+    def circuit_cache_info(self):
+        r"""
+        Statistics of the circuit cache.
+
+        Returns:
+            CacheInfo: named tuple with hits, misses, maxsize and currsize, or
+            None if the engine has no circuit cache.
+        """
+        if self._circuit_cache is None:
+            return None
+        return self._circuit_cache.info()
+
+    def stats(self):
+        r"""
+        Statistics of the translation rules and flushes of the engine.
+
+        Returns:
+            dict: snapshot of the statistics, see
+            :meth:`cirqprojectq._instrumentation.TranslationStats.snapshot`,
+            or None if the engine is not instrumented.
+        """
+        if self._stats is None:
+            return None
+        return self._stats.snapshot()
+
+    def reset_stats(self):
+        r"""Reset the statistics of an instrumented engine."""
+        if self._stats is not None:
+            self._stats.reset()
+
     def _reset(self):
         r"""Resets the circuit."""
-        self._circuit = cirq.circuits.Circuit()
+        self._circuit = None
+        self._scheduler = MomentScheduler()
         self._operations = []
+        self._clear_commands()
         self._mapping = dict()
         self._inverse_mapping = dict()
+        self._active = set()
 
     def reset(self, keep_map=True):
         r"""Resets the engine."""
         map_ = self._mapping.copy()
         imap_ = self._inverse_mapping.copy()
+        active_ = self._active.copy()
         self._reset()
         self._new = True
         if keep_map:
             self._mapping = map_
             self._inverse_mapping = imap_
+            self._active = active_
 
     def is_available(self, cmd):
         """
@@ -98,13 +229,10 @@ class CIRQ(BasicEngine):
         Args:
             cmd (Command): Command for which to check availability
         """
-        if cmd.gate in (pqo.Measure, pqo.Allocate, pqo.Deallocate, pqo.Barrier):
+        if isinstance(cmd.gate, _ALWAYS_AVAILABLE):
             return True
         else:
-            if type(cmd.gate) in self._rules.known_rules:
-                return True
-            else:
-                return False
+            return self._rules.is_available(cmd)
 
 
     def _store(self, cmd):
@@ -116,33 +244,125 @@ class CIRQ(BasicEngine):
         if self._new:
             self._new = False
             self._operations = []
-        if cmd.gate == pqo.Allocate:
+            self._clear_commands()
+        if isinstance(cmd.gate, pqo.AllocateQubitGate):
             qb_id = cmd.qubits[0][0].id
-            #TODO placement
-#            for tag in cmd.tags:
-#                if isinstance(tag, QubitPlacementTag):
-#                    self._mapping[qb_id] = tag.position
-#                    self._inverse_mapping[tag.position] = qb_id
-#                    break
             if qb_id not in self._mapping:
                 self._mapping[qb_id] = qb_id
-#                raise Exception("No qubit placement info found in Allocate.\n"
-#                                "Please make sure you are using the CIRQ Mapper")
-            # TODO check if id in device.qubits
+            qubit = self._qubits[self._mapping[qb_id]]
+            self._active.add(qubit)
+            self._scheduler.touch(qubit)
             return
-        elif cmd.gate in (pqo.Allocate, pqo.Deallocate, pqo.Barrier):
+        elif isinstance(cmd.gate, pqo.DeallocateQubitGate):
+            qb_id = cmd.qubits[0][0].id
+            self._active.discard(self._qubits[self._mapping[qb_id]])
+            return
+        elif isinstance(cmd.gate, pqo.BarrierGate):
             return
+        elif self._fingerprint is not None:
+            key = _gate_key(cmd.gate)
+            if key is not None:
+                self._fingerprint.append(
+                        (key, len(cmd.control_qubits),
+                         tuple(self._mapping[qb.id]
+                               for qr in cmd.all_qubits for qb in qr)))
+                self._commands.append(cmd)
+                return
+            self._operations.extend(self._translate_commands())
+            self._fingerprint = None
+        self._translate(cmd)
+
+    def _clear_commands(self):
+        r"""Reset the commands buffered for the circuit cache."""
+        self._commands = []
+        self._fingerprint = None if self._circuit_cache is None else []
+
+    def _translate(self, cmd):
+        r"""Translate a command and buffer the cirq operations.
+
+        Args:
+            cmd: Projectq command.
+        """
+        try:
+            if self._stats is None:
+                operation = self._rules.translate(cmd, self._mapping, self._qubits)
+            else:
+                operation = self._stats.translate(self._rules, cmd,
+                                                  self._mapping, self._qubits)
+        except Exception as err:
+            raise TypeError("Translation of gate {} failed: {}".format(
+                    cmd.gate, err)) from err
+        if isinstance(operation, (list, tuple)):
+            self._operations.extend(operation)
         else:
-            try:
-                self._operations.append(self._rules.translate(cmd, self._mapping, self._qubits))
-            except:
-                raise TypeError("Gate {} not known".format(cmd.gate.__class__))
+            self._operations.append(operation)
+
+    def _translate_commands(self):
+        r"""Translate the commands buffered for the circuit cache.
+
+        Returns:
+            list of :class:`cirq.Operation`
+        """
+        operations, self._operations = self._operations, []
+        for cmd in self._commands:
+            self._translate(cmd)
+        self._commands = []
+        operations, self._operations = self._operations, operations
+        return operations
 
     def _run(self):
-        r"""Appends operations to circuit and resets operations."""
-        self.circuit.append(self._operations,
-                            strategy=cirq.circuits.InsertStrategy.EARLIEST)
+        r"""Appends operations to circuit and resets operations.
+
+        Operations are placed into moments with the same result as
+        :meth:`cirq.Circuit.append` using :attr:`strategy`. For
+        :class:`cirq.circuits.InsertStrategy.EARLIEST` the cost per operation
+        is independent of the depth of the circuit. In streaming mode finished
+        moments are passed to the moment sink.
+        """
+        if self._stats is not None:
+            start = time.perf_counter()
+        buffered = len(self._operations)
+        if self._commands:
+            buffered = self._run_cached()
+        elif self._operations:
+            self._scheduler.append(self._operations, self.strategy)
+            self._circuit = None
         self._operations = []
+        self._clear_commands()
+        if self._moment_sink is not None:
+            sealed = self._scheduler.pop_sealed(self._active, self.strategy)
+            if sealed:
+                self._circuit = None
+            for moment in sealed:
+                self._moment_sink(moment)
+        if self._stats is not None:
+            self._stats.record_flush(time.perf_counter() - start, buffered,
+                                     len(self._scheduler))
+
+    def _run_cached(self):
+        r"""Schedules the buffered commands using the circuit cache.
+
+        If nothing has been scheduled yet, the scheduled moments are cached as
+        well and copied on a cache hit.
+
+        Returns:
+            int: number of operations.
+        """
+        key = (self._rules, tuple(self._qubits), tuple(self._fingerprint))
+        operations, schedules = self._circuit_cache.lookup(
+                key, lambda: (tuple(self._translate_commands()), dict()))
+        self._commands = []
+        if len(self._scheduler) == 0 and self._scheduler.offset == 0:
+            schedule = schedules.get(self.strategy)
+            if schedule is None:
+                self._scheduler.append(operations, self.strategy)
+                schedules[self.strategy] = self._scheduler.copy()
+            else:
+                self._scheduler = schedule.copy()
+        else:
+            self._scheduler.append(operations, self.strategy)
+        self._circuit = None
+        return len(operations)
 
     def receive(self, command_list):
         """
@@ -153,7 +373,7 @@ class CIRQ(BasicEngine):
             command_list: List of commands to execute
         """
         for cmd in command_list:
-            if not cmd.gate == pqo.FlushGate():
+            if not isinstance(cmd.gate, pqo.FlushGate):
                 self._store(cmd)
             else:
                 self._run()
@@ -16,9 +16,10 @@
 This module provides translation rules from Projectq to Cirq for some common
 gates.
 """
-import cirq
-version = [int(cirq.__version__[0]), int(cirq.__version__[2])]
-if (version[0] == 0 and version[1] <= 3):
+from ._compat import legacy_cirq
+if legacy_cirq():
     from . import common_rules_03x
+    from .common_rules_03x import ALL_RULES, common_gates_ruleset
 else:
-    from . import common_rules_040
\ No newline at end of file
+    from . import common_rules_040
+    from .common_rules_040 import ALL_RULES, common_gates_ruleset
@@ -16,9 +16,8 @@
 This module provides translation rules from Projectq to Cirq for some common
 gates.
 """
-import cirq
-version = [int(cirq.__version__[0]), int(cirq.__version__[2])]
-assert(version[0] > 0 or version[1] >= 4)
+from ._compat import legacy_cirq
+assert(not legacy_cirq())
 import cmath
 import cirq, projectq
 from projectq import ops as pqo
@@ -37,6 +36,28 @@ KNOWN_SINGLE_QUBIT_GATES = {pqo.XGate: cop.X,
 
 from ._rules_pq_to_cirq import Ruleset_pq_to_cirq as Ruleset
 from ._rules_pq_to_cirq import Rule_pq_to_cirq as Rule
+from ._flyweight import GATE_CACHE
+
+_ROTATION_GATES = {pqo.Rx: cop.XPowGate,
+                   pqo.Ry: cop.YPowGate,
+                   pqo.Rz: cop.ZPowGate}
+_PAULI_GATES = {pqo.XGate: cop.X,
+                pqo.YGate: cop.Y,
+                pqo.ZGate: cop.Z}
+_H_S_GATES = {pqo.HGate: cop.H,
+              pqo.SGate: cop.S}
+
+
+def _half_turns(angle):
+    r"""
+    Rotation angle in half turns.
+
+    ProjectQ rotation gates store their angle in rad. A :class:`cirq.Symbol`
+    can't be scaled and is taken to be in half turns.
+    """
+    if isinstance(angle, cirq.Symbol):
+        return angle
+    return angle / cmath.pi
 
 
 def _rx_ry_rz(cmd, mapping, qubits):
@@ -54,17 +75,17 @@ def _rx_ry_rz(cmd, mapping, qubits):
     Returns:
         :class:`cirq.Operation`
     """
-    gates = {pqo.Rx: cop.XPowGate,
-               pqo.Ry: cop.YPowGate,
-               pqo.Rz: cop.ZPowGate}
+    gate_class = _ROTATION_GATES[type(cmd.gate)]
     qb_pos = [mapping[qb.id] for qr in cmd.qubits for qb in qr]
     assert len(qb_pos)==1
-    cirqGate = gates[type(cmd.gate)](half_turns=cmd.gate.angle / cmath.pi)
+    exponent = _half_turns(cmd.gate.angle)
     if get_control_count(cmd) > 0:
+        cirqGate = GATE_CACHE.gate(gate_class, exponent=exponent)
         ctrl_pos = [mapping[qb.id] for qb in cmd.control_qubits]
         return cop.ControlledGate(cirqGate)(*[qubits[c] for c in ctrl_pos+qb_pos])
     else:
-        return cirqGate(*[qubits[idx] for idx in qb_pos])
+        return GATE_CACHE.operation(gate_class, [qubits[idx] for idx in qb_pos],
+                                    exponent=exponent)
 
 def _pauli_gates(cmd, mapping, qubits):
     """
@@ -78,12 +99,9 @@ def _pauli_gates(cmd, mapping, qubits):
     Returns:
         :class:`cirq.Operation`
     """
-    gates = {pqo.XGate: cop.X,
-               pqo.YGate: cop.Y,
-               pqo.ZGate: cop.Z}
     qb_pos = [mapping[qb.id] for qr in cmd.qubits for qb in qr]
     assert len(qb_pos)==1
-    cirqGate = gates[type(cmd.gate)]
+    cirqGate = _PAULI_GATES[type(cmd.gate)]
     if get_control_count(cmd) > 0:
         ctrl_pos = [mapping[qb.id] for qb in cmd.control_qubits]
         return cop.ControlledGate(cirqGate)(*[qubits[c] for c in ctrl_pos+qb_pos])
@@ -102,17 +120,31 @@ def _h_s_gate(cmd, mapping, qubits):
     Returns:
         :class:`cirq.Operation`
     """
-    gates = {pqo.HGate: cop.H,
-               pqo.SGate: cop.S}
     qb_pos = [mapping[qb.id] for qr in cmd.qubits for qb in qr]
     assert len(qb_pos)==1
-    cirqGate = gates[type(cmd.gate)]
+    cirqGate = _H_S_GATES[type(cmd.gate)]
     if get_control_count(cmd) > 0:
         ctrl_pos = [mapping[qb.id] for qb in cmd.control_qubits]
         return cop.ControlledGate(cirqGate)(*[qubits[c] for c in ctrl_pos+qb_pos])
     else:
         return cirqGate(*[qubits[idx] for idx in qb_pos])
 
+def _recognize_known_matrix(cmd):
+    """
+    Check if a command acts with a single qubit matrix on one target qubit.
+
+    Args:
+        cmd (:class:`projectq.ops.Command`): a projectq command instance
+
+    Returns:
+        bool
+    """
+    try:
+        shape = cmd.gate.matrix.shape
+    except AttributeError:
+        return False
+    return shape == (2, 2) and sum(len(qr) for qr in cmd.qubits) == 1
+
 def _gates_with_known_matrix(cmd, mapping, qubits):
     """
     Translate a single qubit gate with known matrix into a Cirq gate.
@@ -125,21 +157,20 @@ def _gates_with_known_matrix(cmd, mapping, qubits):
     Returns:
         :class:`cirq.Operation`
     """
-    gate = cmd.gate
-    if len(get_control_count(cmd)) == 0 and hasattr(gate, 'matrix'):
-            qb_pos = [mapping[qb.id] for qr in cmd.qubits for qb in qr]
-            return cop.matrix_gates.SingleQubitMatrixGate(matrix=gate.matrix)(
-                    *[qubits[q] for q in qb_pos])
-    elif len(get_control_count(cmd)) > 0 and hasattr(gate, 'matrix'):
-        qb_pos = [mapping[qb.id] for qr in cmd.qubits for qb in qr]
+    qb_pos = [mapping[qb.id] for qr in cmd.qubits for qb in qr]
+    cirqGate = cop.matrix_gates.SingleQubitMatrixGate(matrix=cmd.gate.matrix)
+    if get_control_count(cmd) > 0:
         ctrl_pos = [mapping[qb.id] for qb in cmd.control_qubits]
-        cirqGate = cop.matrix_gates.SingleQubitMatrixGate(matrix=gate.matrix)
-        return cop.ControlledGate(cirqGate)(*[qubits[q] for q in qb_pos+ctrl_pos])
+        return cop.ControlledGate(cirqGate)(*[qubits[q] for q in ctrl_pos+qb_pos])
+    else:
+        return cirqGate(*[qubits[q] for q in qb_pos])
 
 
 Rx_Ry_Rz = Rule([pqo.Rx, pqo.Ry, pqo.Rz], _rx_ry_rz)
 Paulis = Rule([pqo.XGate, pqo.YGate, pqo.ZGate], _pauli_gates)
 H_S = Rule([pqo.HGate, pqo.SGate], _h_s_gate)
-Known_Matrix = Rule([pqo.BasicGate], _gates_with_known_matrix)
+Known_Matrix = Rule([pqo.BasicGate], _gates_with_known_matrix,
+                    _recognize_known_matrix)
 
-common_gates_ruleset = Ruleset(rules = [Rx_Ry_Rz, Paulis, H_S, Known_Matrix])
\ No newline at end of file
+ALL_RULES = [Rx_Ry_Rz, Paulis, H_S, Known_Matrix]
+common_gates_ruleset = Ruleset(rules = ALL_RULES)
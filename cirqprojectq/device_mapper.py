@@ -0,0 +1,318 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""Provides a mapper engine that places and routes qubits on cirq devices.
+
+Two-qubit gates on xmon devices act on adjacent qubits only. The
+:class:`DeviceMapper` places the logical qubits of a program on the qubits of
+a device, e.g., the grid of :class:`cirq.google.Bristlecone`, and inserts
+:class:`projectq.ops.SwapGate` s to move the qubits of two-qubit gates next to
+each other.
+
+The mapped id of a qubit is its index in the sorted qubits of the device,
+which is the convention of :class:`cirqprojectq.circ_engine.CIRQ` for a
+device. See :meth:`cirqprojectq.xmon_setup.device_engines` for an engine list
+that decomposes the swaps into xmon gates.
+
+Placement:
+    The commands are buffered until a flush or until ``storage`` commands are
+    stored. Newly allocated qubits are placed greedily, in the order of their
+    interactions in the buffer: each qubit goes to the free device qubit with
+    the smallest distance to its placed partners, weighted by the number of
+    gates between them. Swaps of earlier gates can move qubits to these
+    positions before the allocation, then the qubit goes to the best device
+    qubit that is free at its allocation.
+
+Routing:
+    For a two-qubit gate on distant qubits, one of the two qubits is swapped
+    with a neighbor one step closer to the other, until they are adjacent. Of
+    these candidate swaps the mapper picks the one with the smallest distances
+    of the next ``lookahead`` two-qubit gates, weighted by their position.
+    Every gate gets the minimal number of swaps for itself, the lookahead
+    picks the paths that help the following gates.
+"""
+from projectq import ops
+from projectq.cengines import BasicMapperEngine
+from projectq.meta import LogicalQubitIDTag
+from projectq.types import WeakQubitRef
+
+_DECAY = 0.9
+
+def _distances(neighbors):
+    r"""All pair distances of a graph by breadth first search."""
+    infinity = len(neighbors)
+    distances = []
+    for source in range(len(neighbors)):
+        row = [infinity] * len(neighbors)
+        row[source] = 0
+        layer = [source]
+        while layer:
+            following = []
+            for p in layer:
+                for n in neighbors[p]:
+                    if row[n] == infinity:
+                        row[n] = row[p] + 1
+                        following.append(n)
+            layer = following
+        distances.append(row)
+    return distances
+
+def _ids(cmd):
+    return [qb.id for qr in cmd.all_qubits for qb in qr]
+
+class DeviceMapper(BasicMapperEngine):
+    r"""
+    Maps logical qubits to the qubits of a device and routes two-qubit gates
+    with swaps.
+
+    Args:
+        device (:class:`cirq.devices.Device`): device with the attribute
+            qubits, e.g., a :class:`cirq.google.XmonDevice`.
+        qubits (list): device qubits, instead of a device. Two qubits are
+            connected if they are adjacent, see
+            :meth:`cirq.GridQubit.is_adjacent`.
+        lookahead (int): number of following two-qubit gates that decide
+            between the possible swaps.
+        storage (int): number of commands buffered before mapping.
+    """
+    def __init__(self, device=None, qubits=None, lookahead=20, storage=1000):
+        BasicMapperEngine.__init__(self)
+        assert not (qubits is None and device is None), "Please specify one of qubits or device!"
+        if qubits is None:
+            qubits = sorted(device.qubits)
+        self.qubits = list(qubits)
+        self.lookahead = lookahead
+        self.storage = storage
+        self._neighbors = [[j for j, other in enumerate(self.qubits)
+                            if j != i and qubit.is_adjacent(other)]
+                           for i, qubit in enumerate(self.qubits)]
+        self._distances = _distances(self._neighbors)
+        # The most central qubits come first.
+        self._central = sorted(range(len(self.qubits)),
+                               key=lambda p: (sum(self._distances[p]), p))
+        self._stored_commands = []
+        self.current_mapping = dict()
+        self._swaps = 0
+        self._logical_layers = dict()
+        self._mapped_layers = [0] * len(self.qubits)
+
+    @property
+    def routing_stats(self):
+        r"""
+        dict: number of inserted swaps ('swaps'), depth of the program in gates
+        ('logical_depth'), depth of the mapped program with a swap counted as
+        one gate ('depth') and the difference ('depth_overhead').
+        """
+        logical = max(self._logical_layers.values(), default=0)
+        mapped = max(self._mapped_layers, default=0)
+        return {'swaps': self._swaps, 'logical_depth': logical,
+                'depth': mapped, 'depth_overhead': mapped - logical}
+
+    def is_available(self, cmd):
+        r"""
+        Only gates with at most two qubits, including control qubits, can be
+        mapped.
+
+        Args:
+            cmd (Command): Command for which to check availability
+        """
+        return len(_ids(cmd)) <= 2
+
+    def _add_layer(self, layers, ids):
+        layer = max(layers[i] for i in ids) + 1
+        for i in ids:
+            layers[i] = layer
+
+    def _send_mapped(self, cmd, tags=()):
+        r"""Send a command with the mapped qubit ids."""
+        mapping = self._current_mapping
+
+        def mapped(qureg):
+            return [WeakQubitRef(self, mapping[qb.id]) for qb in qureg]
+        self.send([ops.Command(self, cmd.gate,
+                               tuple(mapped(qr) for qr in cmd.qubits),
+                               controls=mapped(cmd.control_qubits),
+                               tags=list(cmd.tags) + list(tags))])
+
+    def _send_gate(self, gate, mapped_ids):
+        self.send([ops.Command(self, gate, tuple([WeakQubitRef(self, p)]
+                                                 for p in mapped_ids))])
+
+    def _place(self, commands):
+        r"""
+        Free device qubits for the qubits allocated in the commands.
+
+        Returns:
+            tuple: (dict, dict) preferred device qubit of each newly allocated
+            logical qubit and the number of gates of each new qubit with each
+            other qubit.
+        """
+        new = [cmd.qubits[0][0].id for cmd in commands
+               if isinstance(cmd.gate, ops.AllocateQubitGate) and
+               cmd.qubits[0][0].id not in self._current_mapping]
+        if not new:
+            return dict(), dict()
+        weights = {qb_id: dict() for qb_id in new}
+        for cmd in commands:
+            ids = _ids(cmd)
+            if len(ids) == 2:
+                for a, b in (ids, ids[::-1]):
+                    if a in weights:
+                        weights[a][b] = weights[a].get(b, 0) + 1
+        positions = dict(self._current_mapping)
+        used = set(positions.values())
+        if len(used) + len(new) > len(self.qubits):
+            raise RuntimeError("The program uses more than the {} qubits of "
+                               "the device.".format(len(self.qubits)))
+        placement = dict()
+        order = {qb_id: k for k, qb_id in enumerate(new)}
+        while len(placement) < len(new):
+            # The qubit with the most gates with placed qubits, then with the
+            # most gates, then the first allocated.
+            qb_id = min((qb_id for qb_id in new if qb_id not in placement),
+                        key=lambda q: (-sum(w for p, w in weights[q].items()
+                                            if p in positions),
+                                       -sum(weights[q].values()), order[q]))
+            partners = [(positions[p], w) for p, w in weights[qb_id].items()
+                        if p in positions]
+            free = [p for p in self._central if p not in used]
+            best = min(free, key=lambda p: sum(w * self._distances[p][q]
+                                               for q, w in partners))
+            placement[qb_id] = best
+            positions[qb_id] = best
+            used.add(best)
+        return placement, weights
+
+    def _position(self, preferred, weights):
+        r"""
+        Device qubit of a qubit at its allocation: the preferred one if it is
+        still free, otherwise the free one closest to its placed partners.
+        """
+        mapping = self._current_mapping
+        used = set(mapping.values())
+        if preferred not in used:
+            return preferred
+        partners = [(mapping[p], w) for p, w in weights.items() if p in mapping]
+        free = [p for p in self._central if p not in used]
+        return min(free, key=lambda p: (sum(w * self._distances[p][q]
+                                            for q, w in partners),
+                                        self._distances[p][preferred]))
+
+    def _cost(self, window, mapping):
+        r"""Weighted distances of the following two-qubit gates."""
+        cost = 0.
+        weight = 1.
+        for a, b in window:
+            if a in mapping and b in mapping:
+                cost += weight * self._distances[mapping[a]][mapping[b]]
+            weight *= _DECAY
+        return cost
+
+    def _swap(self, p, n):
+        r"""Swap the qubits at device qubits p and n, n may be free."""
+        inverse = {v: k for k, v in self._current_mapping.items()
+                   if v in (p, n)}
+        if n not in inverse:
+            # Move into a free qubit, which is in the state 0.
+            self._send_gate(ops.Allocate, [n])
+            self._send_gate(ops.Swap, [p, n])
+            self._send_gate(ops.Deallocate, [p])
+        else:
+            self._send_gate(ops.Swap, [p, n])
+            self._current_mapping[inverse[n]] = p
+        self._current_mapping[inverse[p]] = n
+        self._swaps += 1
+        self._add_layer(self._mapped_layers, (p, n))
+
+    def _route(self, a, b, window):
+        r"""Insert swaps until the logical qubits a and b are adjacent."""
+        mapping = self._current_mapping
+        while True:
+            pa, pb = mapping[a], mapping[b]
+            distance = self._distances[pa][pb]
+            if distance >= len(self.qubits):
+                raise RuntimeError("The qubits {} and {} of the device are not "
+                                   "connected.".format(self.qubits[pa],
+                                                       self.qubits[pb]))
+            if distance <= 1:
+                return
+            inverse = {v: k for k, v in mapping.items()}
+            best = None
+            for p, other in ((pa, pb), (pb, pa)):
+                for n in self._neighbors[p]:
+                    if self._distances[n][other] != distance - 1:
+                        continue
+                    trial = dict(mapping)
+                    trial[inverse[p]] = n
+                    if n in inverse:
+                        trial[inverse[n]] = p
+                    cost = self._cost(window, trial)
+                    if best is None or cost < best[0]:
+                        best = (cost, p, n)
+            self._swap(best[1], best[2])
+
+    def _run(self):
+        r"""Map and send all stored commands."""
+        commands, self._stored_commands = self._stored_commands, []
+        placement, weights = self._place(commands)
+        pairs = [(k, _ids(cmd)) for k, cmd in enumerate(commands)]
+        pairs = [(k, tuple(ids)) for k, ids in pairs if len(ids) == 2]
+        following = 0
+        for k, cmd in enumerate(commands):
+            ids = _ids(cmd)
+            if isinstance(cmd.gate, ops.AllocateQubitGate):
+                qb_id = ids[0]
+                if qb_id not in self._current_mapping:
+                    self._current_mapping[qb_id] = self._position(
+                            placement[qb_id], weights[qb_id])
+                self._logical_layers.setdefault(qb_id, 0)
+                self._send_mapped(cmd, [LogicalQubitIDTag(qb_id)])
+                continue
+            if isinstance(cmd.gate, ops.DeallocateQubitGate):
+                self._send_mapped(cmd, [LogicalQubitIDTag(ids[0])])
+                del self._current_mapping[ids[0]]
+                continue
+            if len(ids) == 2:
+                while following < len(pairs) and pairs[following][0] <= k:
+                    following += 1
+                window = [pair for _, pair in
+                          pairs[following:following + self.lookahead]]
+                self._route(ids[0], ids[1], window)
+            if len(ids) > 2:
+                raise RuntimeError("The mapper only supports gates with at "
+                                   "most two qubits, got {}.".format(cmd))
+            if not isinstance(cmd.gate, ops.BarrierGate):
+                self._add_layer(self._logical_layers, ids)
+                self._add_layer(self._mapped_layers,
+                                [self._current_mapping[i] for i in ids])
+            if isinstance(cmd.gate, ops.MeasureGate):
+                self._send_mapped(cmd, [LogicalQubitIDTag(ids[0])])
+            else:
+                self._send_mapped(cmd)
+
+    def receive(self, command_list):
+        r"""
+        Receive a list of commands, map them and forward them.
+
+        Args:
+            command_list (list<Command>): List of commands to receive.
+        """
+        for cmd in command_list:
+            if isinstance(cmd.gate, ops.FlushGate):
+                self._run()
+                self.send([cmd])
+            else:
+                self._stored_commands.append(cmd)
+                if len(self._stored_commands) >= self.storage:
+                    self._run()
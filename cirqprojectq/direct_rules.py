@@ -0,0 +1,79 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+This module provides translation rules from common projectq gates directly to
+the cirq counterparts of xmon gates.
+
+Rotation gates (Rx, Ry, Rz), Pauli gates (X, Y, Z), the Hadamard gate, CNOT
+and SWAP gates are translated in a single step to the cirq operations of their
+xmon gate templates, see :mod:`cirqprojectq.xmon_replacer`. The result is the
+same as decomposing the gates into xmon gates and translating the xmon gates
+afterwards, but no intermediate projectq commands are created.
+
+Note:
+    The rules only apply if
+    :data:`cirqprojectq.xmon_decompositions.CORRECT_PHASES` is False.
+"""
+from projectq import ops
+from . import xmon_decompositions, xmon_rules
+from .xmon_replacer import get_template
+from ._rules_pq_to_cirq import Ruleset_pq_to_cirq as Ruleset
+from ._rules_pq_to_cirq import Rule_pq_to_cirq as Rule
+from ._flyweight import GATE_CACHE
+
+_TEMPLATE_CLASSES = [ops.Rx, ops.Ry, ops.Rz, ops.XGate, ops.YGate, ops.ZGate,
+                     ops.HGate, ops.SwapGate]
+
+def _recognize_template(cmd):
+    """
+    Check if a command has an xmon gate template.
+
+    Args:
+        - cmd (:class:`projectq.ops.Command`) - a projectq command instance
+
+    Returns:
+        - bool
+    """
+    if xmon_decompositions.CORRECT_PHASES:
+        return False
+    # Subclasses of the template classes have no template.
+    return get_template(cmd) is not None
+
+def _template_operations(cmd, mapping, qubits):
+    translations = xmon_rules.XMON_TRANSLATIONS
+    return [translations[type(gate)](gate, [qubits[mapping[qb.id]] for qb in qbs])
+            for gate, qbs in get_template(cmd)]
+
+def _translate_template(cmd, mapping, qubits):
+    """
+    Translate a command to the cirq operations of its xmon gate template.
+
+    The operations are cached per gate and cirq qubits.
+
+    Args:
+        - cmd (:class:`projectq.ops.Command`) - a projectq command instance
+        - mapping (:class:`dict`) - a dictionary of qubit mappings
+        - qubits (list of :class:cirq.QubitID`) - cirq qubits
+
+    Returns:
+        - tuple of :class:`cirq.Operation`
+    """
+    key = (type(cmd.gate), getattr(cmd.gate, 'angle', None),
+           tuple(qubits[mapping[qb.id]] for qr in cmd.all_qubits for qb in qr))
+    return GATE_CACHE.operations(key, _template_operations, cmd, mapping, qubits)
+
+TEMPLATES = Rule(_TEMPLATE_CLASSES, _translate_template, _recognize_template)
+ALL_RULES = [TEMPLATES] + xmon_rules.ALL_RULES
+direct_ruleset = Ruleset(rules = ALL_RULES)
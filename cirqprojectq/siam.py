@@ -0,0 +1,168 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""Provides the exact time evolution of the single impurity Anderson model.
+
+The reference for Trotterized simulations of the single impurity Anderson
+model (SIAM) with sites orbitals per spin,
+
+.. math::
+
+    H = t \sum_{\sigma} \sum_{i=0}^{sites-2} (c^\dagger_{i\sigma} c_{i+1\sigma}
+        + c^\dagger_{i+1\sigma} c_{i\sigma}) + U n_{d\uparrow} n_{d\downarrow},
+
+in the Jordan-Wigner representation. The spin up orbitals are the qubits
+0 to sites - 1, the spin down orbitals the qubits sites to 2 sites - 1, and d
+is the impurity site. The sparse Hamiltonians are cached per set of
+parameters. The exact states of all times of a grid are computed in a single
+call of :func:`scipy.sparse.linalg.expm_multiply`:
+
+.. code-block:: python
+
+    exact = siam.exact_states(3, t, U, times)
+    fidelities = siam.fidelities(exact, simulated_states)
+
+By default, qubit k is the k-th least significant bit of the index of a basis
+state, as in ProjectQ and the
+:class:`cirqprojectq.xmon_simulator.XmonSimulator`. With big_endian, qubit 0
+is the most significant bit, as in the cirq simulators.
+"""
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import expm_multiply
+from ._flyweight import FlyweightCache
+
+HAMILTONIAN_CACHE = FlyweightCache(16)
+
+def _bit(qubit, qubits, big_endian):
+    return qubits - 1 - qubit if big_endian else qubit
+
+def _hamiltonian(sites, t, U, impsite, big_endian):
+    n = 2 * sites
+    index = np.arange(1 << n)
+    rows, cols, data = [], [], []
+    for spin in (0, sites):
+        for i in range(sites - 1):
+            # Neighboring orbitals, the Jordan-Wigner strings cancel.
+            b0 = _bit(spin + i, n, big_endian)
+            b1 = _bit(spin + i + 1, n, big_endian)
+            hop = index[((index >> b0) ^ (index >> b1)) & 1 == 1]
+            rows.append(hop)
+            cols.append(hop ^ ((1 << b0) | (1 << b1)))
+            data.append(np.full(len(hop), t, dtype=float))
+    up = _bit(impsite, n, big_endian)
+    down = _bit(impsite + sites, n, big_endian)
+    occupied = index[(index >> up) & (index >> down) & 1 == 1]
+    rows.append(occupied)
+    cols.append(occupied)
+    data.append(np.full(len(occupied), U, dtype=float))
+    return sparse.csr_matrix((np.concatenate(data),
+                              (np.concatenate(rows), np.concatenate(cols))),
+                             shape=(1 << n, 1 << n))
+
+def hamiltonian(sites, t, U, impsite=None, big_endian=False):
+    r"""
+    Sparse SIAM Hamiltonian.
+
+    The matrices are cached in :data:`HAMILTONIAN_CACHE` and shared between
+    calls, they must not be modified.
+
+    Args:
+        sites (int): number of orbitals per spin.
+        t (float): hopping amplitude.
+        U (float): interaction strength.
+        impsite (int): impurity site, defaults to sites // 2.
+        big_endian (bool): if True, qubit 0 is the most significant bit.
+
+    Returns:
+        :class:`scipy.sparse.csr_matrix`: the Hamiltonian of 2 sites qubits.
+    """
+    if impsite is None:
+        impsite = sites // 2
+    key = (sites, t, U, impsite, big_endian)
+    return HAMILTONIAN_CACHE.lookup(key, _hamiltonian, *key)
+
+def initial_state(sites, big_endian=False):
+    r"""
+    Initial state of the examples: the first (sites + 1) // 2 spin up orbitals
+    and the last sites - sites // 2 spin down orbitals are occupied.
+
+    Args:
+        sites (int): number of orbitals per spin.
+        big_endian (bool): if True, qubit 0 is the most significant bit.
+
+    Returns:
+        numpy.ndarray: the basis state of 2 sites qubits.
+    """
+    n = 2 * sites
+    occupied = (list(range(sites // 2 + sites % 2)) +
+                [i + sites for i in range(sites // 2, sites)])
+    state = np.zeros(1 << n, dtype=complex)
+    state[sum(1 << _bit(q, n, big_endian) for q in occupied)] = 1
+    return state
+
+def exact_states(sites, t, U, times, initial=None, impsite=None,
+                 big_endian=False):
+    r"""
+    Exact states at the times of a grid.
+
+    For equidistant times, all states are computed in a single call of
+    :func:`scipy.sparse.linalg.expm_multiply`, otherwise the state is
+    propagated from time to time.
+
+    Args:
+        sites (int): number of orbitals per spin.
+        t (float): hopping amplitude.
+        U (float): interaction strength.
+        times (array): increasing times.
+        initial (numpy.ndarray): state at time 0, defaults to
+            :func:`initial_state`.
+        impsite (int): impurity site, defaults to sites // 2.
+        big_endian (bool): if True, qubit 0 is the most significant bit.
+
+    Returns:
+        numpy.ndarray: the states, of shape (len(times), :math:`2^{2 sites}`).
+    """
+    times = np.atleast_1d(np.asarray(times, dtype=float))
+    if initial is None:
+        initial = initial_state(sites, big_endian)
+    generator = -1j * hamiltonian(sites, t, U, impsite, big_endian)
+    steps = np.diff(times)
+    if len(times) > 1 and np.allclose(steps, steps[0]):
+        return expm_multiply(generator, initial, start=times[0],
+                             stop=times[-1], num=len(times), endpoint=True)
+    states = np.empty((len(times), len(initial)), dtype=complex)
+    state = initial
+    for k, dt in enumerate(np.diff(times, prepend=0)):
+        state = expm_multiply(generator * dt, state)
+        states[k] = state
+    return states
+
+def fidelities(exact, states):
+    r"""
+    Fidelities :math:`|\langle \psi_{exact} | \psi \rangle|^2` of states.
+
+    Args:
+        exact (numpy.ndarray): exact states, the last axis is the state
+            vector.
+        states (numpy.ndarray): simulated states, broadcast against exact,
+            e.g., a batch of states of shape (B, :math:`2^n`) against a single
+            exact state or one exact state per simulated state.
+
+    Returns:
+        numpy.ndarray: the fidelities, of the broadcast shape without the
+        last axis.
+    """
+    exact, states = np.broadcast_arrays(np.asarray(exact), np.asarray(states))
+    return np.abs(np.einsum('...i,...i->...', exact.conj(), states)) ** 2
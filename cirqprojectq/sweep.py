@@ -0,0 +1,117 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""Provides a runner for parameter sweeps of simulations on a process pool.
+
+A sweep builds a circuit for every point of a parameter grid and evaluates it,
+e.g., simulates it and computes a fidelity. The points are split into chunks,
+which are processed in parallel by a :class:`concurrent.futures.ProcessPoolExecutor`.
+The results are returned in the order of the grid.
+
+.. code-block:: python
+
+    def build(order, steps):
+        return trotter_circuit(order, steps)
+
+    def fidelity(circuit, order, steps):
+        return abs(np.vdot(exact, simulate(circuit))) ** 2
+
+    results = run_sweep(build, {'order': [1, 2], 'steps': range(1, 16)},
+                        fidelity)
+
+The builder and the evaluation function are sent to the worker processes and
+have to be picklable, i.e., defined at the top level of a module.
+"""
+import itertools
+import os
+from concurrent import futures
+import cirq
+
+def grid_points(grid):
+    r"""
+    Points of a parameter grid.
+
+    Args:
+        grid (dict, :class:`cirq.Sweep` or iterable of dict): values of each
+            parameter by name, a sweep or the points themselves. For a dict,
+            the points are the cartesian product of the values, with the last
+            parameter varying fastest.
+
+    Returns:
+        list of dict: the parameters of each point by name.
+    """
+    if isinstance(grid, cirq.Sweep):
+        return [dict(resolver.param_dict) for resolver in grid]
+    if isinstance(grid, dict):
+        names = list(grid)
+        return [dict(zip(names, values))
+                for values in itertools.product(*[grid[name] for name in names])]
+    return [dict(point) for point in grid]
+
+def _run_chunk(build, evaluate, points):
+    return [evaluate(build(**point), **point) for point in points]
+
+def run_sweep(build, grid, evaluate, max_workers=None, chunksize=None,
+              progress=None):
+    r"""
+    Build and evaluate a circuit for every point of a parameter grid.
+
+    Args:
+        build (callable): called with the parameters of a point as keyword
+            arguments, returns a circuit.
+        grid (dict, :class:`cirq.Sweep` or iterable of dict): parameter grid,
+            see :func:`grid_points`.
+        evaluate (callable): called with the circuit and the parameters of the
+            point as keyword arguments, returns the result of the point.
+        max_workers (int): number of worker processes, defaults to the number
+            of cores. With 1, the points are processed in the calling process.
+        chunksize (int): number of points per task. Defaults to about four
+            tasks per worker.
+        progress (callable): called in the calling process with the number of
+            finished points and the total number of points whenever a chunk is
+            finished.
+
+    Returns:
+        list: the results in the order of the points of the grid.
+    """
+    points = grid_points(grid)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, -(-len(points) // (4 * max_workers)))
+    chunks = [points[i:i + chunksize] for i in range(0, len(points), chunksize)]
+    results = [None] * len(chunks)
+    done = 0
+    if max_workers == 1:
+        for i, chunk in enumerate(chunks):
+            results[i] = _run_chunk(build, evaluate, chunk)
+            done += len(chunk)
+            if progress is not None:
+                progress(done, len(points))
+    else:
+        with futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            tasks = {executor.submit(_run_chunk, build, evaluate, chunk): i
+                     for i, chunk in enumerate(chunks)}
+            try:
+                for task in futures.as_completed(tasks):
+                    i = tasks[task]
+                    results[i] = task.result()
+                    done += len(chunks[i])
+                    if progress is not None:
+                        progress(done, len(points))
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+    return [result for chunk in results for result in chunk]
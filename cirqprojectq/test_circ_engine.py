@@ -0,0 +1,327 @@
+import pytest
+import numpy as np
+import cirq
+import projectq
+from projectq import ops
+from projectq import cengines
+from cirqprojectq import xmon_gates, xmon_setup, xmon_decompositions
+from cirqprojectq.circ_engine import CIRQ
+from cirqprojectq._moment_scheduler import MomentScheduler
+from cirqprojectq._flyweight import FlyweightCache
+from cirqprojectq._rules_pq_to_cirq import Ruleset_pq_to_cirq, Rule_pq_to_cirq
+
+
+def _random_operations(qubits, n, seed=1):
+    rng = np.random.RandomState(seed)
+    operations = []
+    for _ in range(n):
+        if rng.rand() < 0.3:
+            q0, q1 = rng.choice(len(qubits), 2, replace=False)
+            operations.append(cirq.CZ(qubits[q0], qubits[q1]))
+        else:
+            operations.append(cirq.X(qubits[rng.randint(len(qubits))]))
+    return operations
+
+STRATEGIES = [cirq.InsertStrategy.EARLIEST, cirq.InsertStrategy.INLINE,
+              cirq.InsertStrategy.NEW, cirq.InsertStrategy.NEW_THEN_INLINE]
+
+@pytest.mark.parametrize("chunks", [1, 3, 7])
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_scheduler_matches_cirq(chunks, strategy):
+    qubits = [cirq.GridQubit(0, i) for i in range(5)]
+    operations = _random_operations(qubits, 200)
+    circuit = cirq.Circuit()
+    scheduler = MomentScheduler()
+    for chunk in np.array_split(np.arange(len(operations)), chunks):
+        batch = [operations[i] for i in chunk]
+        circuit.append(batch, strategy=strategy)
+        scheduler.append(batch, strategy)
+    assert cirq.Circuit(scheduler.moments) == circuit
+
+def test_engine_circuit():
+    qubits = [cirq.GridQubit(0, i) for i in range(2)]
+    backend = CIRQ(qubits=qubits)
+    eng = projectq.MainEngine(backend=backend, engine_list=[])
+    qureg = eng.allocate_qureg(2)
+    xmon_gates.ExpWGate(0.5, 0.25) | qureg[0]
+    eng.flush()
+    xmon_gates.Exp11Gate(1.) | (qureg[0], qureg[1])
+    xmon_gates.ExpZGate(0.5) | qureg[1]
+    xmon_gates.ExpWGate(0.5) | qureg[1]
+    eng.flush()
+    expected = cirq.Circuit()
+    expected.append([cirq.PhasedXPowGate(exponent=0.5, phase_exponent=0.25)(qubits[0])],
+                    strategy=cirq.InsertStrategy.EARLIEST)
+    expected.append([cirq.CZPowGate(exponent=1.)(*qubits),
+                     cirq.ZPowGate(exponent=0.5, global_shift=-0.5)(qubits[1]),
+                     cirq.PhasedXPowGate(exponent=0.5, phase_exponent=0.)(qubits[1])],
+                    strategy=cirq.InsertStrategy.EARLIEST)
+    assert backend.circuit == expected
+    assert len(backend.circuit) == 4
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_engine_strategy(strategy):
+    qubits = [cirq.GridQubit(0, i) for i in range(2)]
+    backend = CIRQ(qubits=qubits, strategy=strategy)
+    eng = projectq.MainEngine(backend=backend, engine_list=[])
+    qureg = eng.allocate_qureg(2)
+    xmon_gates.ExpZGate(0.5) | qureg[0]
+    xmon_gates.ExpZGate(0.5) | qureg[0]
+    xmon_gates.ExpZGate(0.5) | qureg[1]
+    eng.flush()
+    expected = cirq.Circuit()
+    expected.append([cirq.ZPowGate(exponent=0.5, global_shift=-0.5)(qubits[i])
+                     for i in (0, 0, 1)], strategy=strategy)
+    assert backend.circuit == expected
+
+def test_streaming():
+    qubits = [cirq.GridQubit(0, i) for i in range(3)]
+    reference = CIRQ(qubits=qubits)
+    received = []
+    def sink():
+        while True:
+            received.append((yield))
+    streaming = CIRQ(qubits=qubits, moment_sink=sink())
+    for backend in (reference, streaming):
+        eng = projectq.MainEngine(backend=backend, engine_list=[])
+        qureg = eng.allocate_qureg(3)
+        for step in range(10):
+            for qb in qureg:
+                xmon_gates.ExpWGate(0.1 * step) | qb
+            xmon_gates.Exp11Gate(0.5) | (qureg[0], qureg[1])
+            xmon_gates.Exp11Gate(0.5) | (qureg[1], qureg[2])
+            eng.flush()
+            if backend is streaming:
+                assert len(backend.circuit) <= 3
+        eng.flush(deallocate_qubits=True)
+    assert len(streaming.circuit) == 0
+    assert cirq.Circuit(received) == reference.circuit
+
+def test_flyweight_cache():
+    qubits = [cirq.GridQubit(0, i) for i in range(2)]
+    backend = CIRQ(qubits=qubits)
+    eng = projectq.MainEngine(backend=backend, engine_list=[])
+    qureg = eng.allocate_qureg(2)
+    before = backend.cache_info()
+    for _ in range(5):
+        xmon_gates.ExpWGate(0.5, 0.5) | qureg[0]
+        ops.Rz(0.3) | qureg[1]
+    eng.flush()
+    info = backend.cache_info()
+    assert info.hits - before.hits >= 8
+    operations = [op for moment in backend.circuit for op in moment.operations]
+    assert operations[0] is operations[2]
+    assert operations[1] is operations[3]
+
+def _direct_program(qureg):
+    ops.H | qureg[0]
+    ops.Rx(0.3) | qureg[1]
+    ops.Ry(-1.2) | qureg[2]
+    ops.Rz(4.) | qureg[0]
+    ops.X | qureg[1]
+    ops.Y | qureg[2]
+    ops.Z | qureg[0]
+    ops.C(ops.X) | (qureg[0], qureg[2])
+    ops.Swap | (qureg[1], qureg[2])
+    ops.C(ops.Rz(0.5)) | (qureg[1], qureg[0])
+    ops.S | qureg[1]
+    xmon_gates.ExpWGate(0.5, 0.25) | qureg[2]
+    ops.QFT | qureg
+
+@pytest.mark.parametrize("correct_phases", [False, True])
+def test_direct_matches_two_stage(correct_phases, monkeypatch):
+    monkeypatch.setattr(xmon_decompositions, 'CORRECT_PHASES', correct_phases)
+    qubits = [cirq.GridQubit(0, i) for i in range(3)]
+    two_stage = [cengines.TagRemover(), cengines.LocalOptimizer(),
+                 xmon_setup.replacer_xmon(), xmon_setup.xmon_supported_filter()]
+    circuits = []
+    for engine_list, direct in [(two_stage, False),
+                                (xmon_setup.direct_engines(), True)]:
+        backend = CIRQ(qubits=qubits, direct=direct)
+        eng = projectq.MainEngine(backend=backend, engine_list=engine_list)
+        qureg = eng.allocate_qureg(3)
+        _direct_program(qureg)
+        eng.flush()
+        circuits.append(backend.circuit)
+    assert len(circuits[0]) > 0
+    assert circuits[0] == circuits[1]
+
+class _SubclassedX(ops.XGate):
+    pass
+
+def test_direct_matches_unitary():
+    qubits = [cirq.GridQubit(0, i) for i in range(3)]
+    backend = CIRQ(qubits=qubits, direct=True)
+    eng = projectq.MainEngine(backend=backend,
+                              engine_list=xmon_setup.direct_engines())
+    qureg = eng.allocate_qureg(3)
+    _direct_program(qureg)
+    _SubclassedX() | qureg[1]
+    eng.flush()
+    q0, q1, q2 = qubits
+    reference = cirq.Circuit.from_ops(
+            cirq.H(q0), cirq.Rx(0.3)(q1), cirq.Ry(-1.2)(q2), cirq.Rz(4.)(q0),
+            cirq.X(q1), cirq.Y(q2), cirq.Z(q0), cirq.CNOT(q0, q2),
+            cirq.SWAP(q1, q2), cirq.ControlledGate(cirq.Rz(0.5))(q1, q0),
+            cirq.S(q1), cirq.PhasedXPowGate(exponent=0.5,
+                                            phase_exponent=0.25)(q2))
+    # The quantum Fourier transform of projectq, the most significant
+    # qubit comes last.
+    for k in reversed(range(3)):
+        reference.append(cirq.H(qubits[k]))
+        for j in reversed(range(k)):
+            reference.append(cirq.CZ(qubits[j], qubits[k]) ** (1. / 2 ** (k - j)))
+    reference.append(cirq.X(q1))
+    u = backend.circuit.to_unitary_matrix(qubit_order=qubits)
+    v = reference.to_unitary_matrix(qubit_order=qubits)
+    assert abs(np.trace(u.conj().T.dot(v))) / 8 == pytest.approx(1)
+
+def test_engine_stats():
+    qubits = [cirq.GridQubit(0, i) for i in range(2)]
+    backend = CIRQ(qubits=qubits, instrument=True)
+    eng = projectq.MainEngine(backend=backend, engine_list=[])
+    qureg = eng.allocate_qureg(2)
+    xmon_gates.ExpWGate(0.5, 0.25) | qureg[0]
+    xmon_gates.ExpWGate(0.25) | qureg[1]
+    xmon_gates.Exp11Gate(1.) | (qureg[0], qureg[1])
+    eng.flush()
+    ops.H | qureg[0]
+    eng.flush()
+    stats = backend.stats()
+    assert stats['rules']['_expWGate']['ExpWGate'].calls == 2
+    assert stats['rules']['_exp11Gate']['Exp11Gate'].calls == 1
+    assert stats['rules']['_h_s_gate']['HGate'].failures == 0
+    assert stats['rules']['_expWGate']['ExpWGate'].time > 0
+    assert stats['flushes'].calls == 2
+    assert 0 < stats['flushes'].max_time <= stats['flushes'].time
+    assert stats['max_buffered_operations'] == 3
+    assert stats['max_buffered_moments'] == 3
+    backend.reset_stats()
+    assert backend.stats()['rules'] == {}
+    assert backend.stats()['flushes'] == (0, 0., 0.)
+    assert CIRQ(qubits=qubits).stats() is None
+
+def _failing_translation(cmd, mapping, qubits):
+    raise ValueError("no translation")
+
+def test_engine_stats_failures():
+    rules = Ruleset_pq_to_cirq([Rule_pq_to_cirq([ops.Rz], _failing_translation)])
+    backend = CIRQ(qubits=[cirq.GridQubit(0, 0)], rules=rules, instrument=True)
+    eng = projectq.MainEngine(backend=backend, engine_list=[])
+    qubit = eng.allocate_qubit()
+    with pytest.raises(TypeError) as err:
+        ops.Rz(0.5) | qubit
+    assert "no translation" in str(err.value)
+    assert backend.stats()['rules']['_failing_translation']['Rz'] == (1, pytest.approx(0, abs=1), 1)
+
+def _parametrized_program(qureg, a, b):
+    xmon_gates.ExpWGate(.5, .25) | qureg[0]
+    xmon_gates.ExpWGate(a, .5) | qureg[1]
+    xmon_gates.Exp11Gate(b) | (qureg[0], qureg[1])
+    xmon_gates.ExpZGate(a) | qureg[0]
+    xmon_gates.ExpWGate(a) | qureg[0]
+    ops.H | qureg[1]
+
+@pytest.mark.parametrize("optimize", [False, True])
+def test_parametrized_circuit(optimize):
+    qubits = [cirq.GridQubit(0, i) for i in range(2)]
+    def compile_(a, b):
+        backend = CIRQ(qubits=qubits)
+        eng = projectq.MainEngine(backend=backend,
+                                  engine_list=xmon_setup.xmon_engines(optimize=optimize))
+        _parametrized_program(eng.allocate_qureg(2), a, b)
+        eng.flush()
+        return backend.circuit
+    circuit = compile_(cirq.Symbol('a'), cirq.Symbol('b'))
+    for a, b in [(0.3, 0.7), (-0.4, 1.2)]:
+        resolved = cirq.protocols.resolve_parameters(
+                circuit, cirq.ParamResolver({'a': a, 'b': b}))
+        if optimize:
+            # The optimizer only moves numeric ExpZ gates through ExpW gates,
+            # whose canonical axis only keeps the matrix up to a global phase.
+            cirq.testing.assert_allclose_up_to_global_phase(
+                    resolved.to_unitary_matrix(), compile_(a, b).to_unitary_matrix(),
+                    atol=1e-10)
+        else:
+            np.testing.assert_allclose(resolved.to_unitary_matrix(),
+                                       compile_(a, b).to_unitary_matrix(), atol=1e-10)
+
+def test_parametrized_controlled_expz():
+    qubits = [cirq.GridQubit(0, i) for i in range(2)]
+    def compile_(a):
+        backend = CIRQ(qubits=qubits)
+        eng = projectq.MainEngine(backend=backend, engine_list=[])
+        qureg = eng.allocate_qureg(2)
+        xmon_gates.ExpZGate(a) | qureg[1]
+        ops.C(xmon_gates.ExpZGate(a)) | (qureg[0], qureg[1])
+        eng.flush()
+        return backend.circuit
+    circuit = compile_(cirq.Symbol('a'))
+    for a in (0.3, -1.4):
+        resolved = cirq.protocols.resolve_parameters(circuit,
+                                                     cirq.ParamResolver({'a': a}))
+        # qubits[0] is the most significant qubit in cirq.
+        expected = np.kron(np.diag([1, 0]), np.eye(2)) + np.kron(
+                np.diag([0, 1]), xmon_gates.ExpZGate(a).matrix)
+        expected = expected.dot(np.kron(np.eye(2), xmon_gates.ExpZGate(a).matrix))
+        np.testing.assert_allclose(resolved.to_unitary_matrix(), expected, atol=1e-10)
+        np.testing.assert_allclose(resolved.to_unitary_matrix(),
+                                   compile_(a).to_unitary_matrix(), atol=1e-10)
+
+def test_parametrized_rotation():
+    backend = CIRQ(qubits=[cirq.GridQubit(0, 0)])
+    eng = projectq.MainEngine(backend=backend, engine_list=[])
+    gate = ops.Rx(0.)
+    gate.angle = cirq.Symbol('a')
+    gate | eng.allocate_qubit()
+    eng.flush()
+    resolved = cirq.protocols.resolve_parameters(backend.circuit,
+                                                 cirq.ParamResolver({'a': 0.5}))
+    assert resolved == cirq.Circuit.from_ops(cirq.X(cirq.GridQubit(0, 0))**0.5)
+
+class _MatrixGate(ops.BasicGate):
+    @property
+    def matrix(self):
+        return np.array([[0, 1], [1, 0]])
+
+def _cached_circuit(cache, program, flushes=2):
+    qubits = [cirq.GridQubit(0, i) for i in range(3)]
+    backend = CIRQ(qubits=qubits, circuit_cache=cache)
+    eng = projectq.MainEngine(backend=backend, engine_list=[])
+    qureg = eng.allocate_qureg(3)
+    for _ in range(flushes):
+        program(qureg)
+        eng.flush()
+    return backend
+
+def _cacheable_program(qureg):
+    xmon_gates.ExpWGate(0.5, 0.25) | qureg[0]
+    xmon_gates.Exp11Gate(0.3) | (qureg[0], qureg[2])
+    ops.Rz(0.3) | qureg[1]
+    ops.C(ops.X) | (qureg[1], qureg[2])
+    ops.H | qureg[2]
+
+def _uncacheable_program(qureg):
+    _cacheable_program(qureg)
+    _MatrixGate() | qureg[1]
+    ops.X | qureg[1]
+
+@pytest.mark.parametrize("program", [_cacheable_program, _uncacheable_program])
+def test_circuit_cache(program):
+    expected = _cached_circuit(None, program).circuit
+    cache = FlyweightCache(8)
+    first = _cached_circuit(cache, program)
+    second = _cached_circuit(cache, program)
+    assert first.circuit == expected
+    assert second.circuit == expected
+    info = second.circuit_cache_info()
+    if program is _cacheable_program:
+        assert (info.hits, info.misses, info.currsize) == (3, 1, 1)
+    else:
+        assert (info.hits, info.misses, info.currsize) == (0, 0, 0)
+    assert CIRQ(qubits=[cirq.GridQubit(0, 0)]).circuit_cache_info() is None
+
+def test_circuit_cache_size():
+    backend = _cached_circuit(1, _cacheable_program, flushes=3)
+    assert backend.circuit == _cached_circuit(None, _cacheable_program, flushes=3).circuit
+    assert backend.circuit_cache_info().currsize == 1
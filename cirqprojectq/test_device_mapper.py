@@ -0,0 +1,119 @@
+import pytest
+import numpy as np
+import projectq
+import cirq
+from projectq import ops
+from projectq.backends import Simulator
+from projectq.cengines import DummyEngine
+from cirqprojectq import xmon_gates, xmon_setup
+from cirqprojectq.circ_engine import CIRQ
+from cirqprojectq.device_mapper import DeviceMapper
+
+
+def _program(qureg, seed=1):
+    rng = np.random.RandomState(seed)
+    for _ in range(60):
+        q0, q1 = rng.choice(len(qureg), 2, replace=False)
+        xmon_gates.ExpWGate(rng.rand(), rng.rand()) | qureg[q0]
+        xmon_gates.Exp11Gate(rng.rand()) | (qureg[q0], qureg[q1])
+
+def _logical_state(backend, mapping, n):
+    positions, state = backend.cheat()
+    index = np.arange(1 << n)
+    physical = sum(((index >> k) & 1) << positions[mapping[k]] for k in range(n))
+    return np.array(state)[physical]
+
+def test_mapped_simulation():
+    qubits = [cirq.GridQubit(r, c) for r in range(2) for c in range(3)]
+    states = []
+    for mapper in (None, DeviceMapper(qubits=qubits, storage=50)):
+        backend = Simulator()
+        eng = projectq.MainEngine(backend=backend,
+                                  engine_list=[mapper] if mapper else [])
+        qureg = eng.allocate_qureg(5)
+        _program(qureg)
+        eng.flush()
+        mapping = mapper.current_mapping if mapper else {k: k for k in range(5)}
+        states.append(_logical_state(backend, mapping, 5))
+        ops.All(ops.Measure) | qureg
+    np.testing.assert_allclose(states[1], states[0], atol=1e-10)
+    assert mapper.routing_stats['swaps'] > 0
+
+def test_device_engines():
+    device = cirq.google.Foxtail
+    backend = CIRQ(device=device)
+    eng = projectq.MainEngine(backend=backend,
+                              engine_list=xmon_setup.device_engines(device))
+    qureg = eng.allocate_qureg(6)
+    ops.QFT | qureg
+    eng.flush()
+    assert backend.qubits == sorted(device.qubits)
+    for op in backend.circuit.all_operations():
+        device.validate_operation(op)
+    stats = eng.mapper.routing_stats
+    assert stats['swaps'] > 0
+    assert stats['depth_overhead'] == stats['depth'] - stats['logical_depth'] > 0
+
+def _interleaved_program(eng, seed):
+    rng = np.random.RandomState(seed)
+    qubits = []
+    for _ in range(6):
+        qubits.append(eng.allocate_qubit())
+        ops.H | qubits[-1]
+        for _ in range(4):
+            if len(qubits) > 1:
+                a, b = rng.choice(len(qubits), 2, replace=False)
+                ops.CNOT | (qubits[a], qubits[b])
+    return qubits
+
+@pytest.mark.parametrize("seed", range(6))
+def test_allocation_between_gates(seed):
+    device = cirq.google.Foxtail
+    states = []
+    for mapped in (False, True):
+        backend = Simulator()
+        recorder = DummyEngine(save_commands=True)
+        if mapped:
+            engines = xmon_setup.device_engines(device)
+        else:
+            engines = xmon_setup.xmon_engines()
+        eng = projectq.MainEngine(backend=backend,
+                                  engine_list=engines + [recorder])
+        qubits = _interleaved_program(eng, seed)
+        eng.flush()
+        live = set()
+        for cmd in recorder.received_commands:
+            if isinstance(cmd.gate, ops.AllocateQubitGate):
+                assert cmd.qubits[0][0].id not in live
+                live.add(cmd.qubits[0][0].id)
+            elif isinstance(cmd.gate, ops.DeallocateQubitGate):
+                live.remove(cmd.qubits[0][0].id)
+        mapping = eng.mapper.current_mapping if mapped else {k: k for k in range(6)}
+        states.append(_logical_state(backend, mapping, 6))
+        ops.All(ops.Measure) | qubits
+    assert abs(np.vdot(states[0], states[1])) == pytest.approx(1)
+
+def test_placement_without_swaps():
+    qubits = [cirq.GridQubit(r, c) for r in range(3) for c in range(3)]
+    backend = DummyEngine(save_commands=True)
+    mapper = DeviceMapper(qubits=qubits)
+    eng = projectq.MainEngine(backend=backend, engine_list=[mapper])
+    qureg = eng.allocate_qureg(6)
+    for _ in range(2):
+        for k in [3, 0, 4, 1, 2]:
+            xmon_gates.Exp11Gate(.5) | (qureg[k], qureg[k + 1])
+    eng.flush()
+    mapping = mapper.current_mapping
+    for k in range(5):
+        assert qubits[mapping[k]].is_adjacent(qubits[mapping[k + 1]])
+    assert mapper.routing_stats == {'swaps': 0, 'logical_depth': 5, 'depth': 5,
+                                    'depth_overhead': 0}
+    assert not any(isinstance(cmd.gate, ops.SwapGate)
+                   for cmd in backend.received_commands)
+
+def test_too_many_qubits():
+    eng = projectq.MainEngine(backend=DummyEngine(),
+                              engine_list=[DeviceMapper(qubits=cirq.LineQubit.range(2))])
+    eng.allocate_qureg(3)
+    with pytest.raises(RuntimeError):
+        eng.flush()
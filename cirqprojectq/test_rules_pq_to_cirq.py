@@ -0,0 +1,69 @@
+import pytest
+import cirq
+import projectq
+from projectq import ops
+from projectq.cengines import DummyEngine
+from cirqprojectq import xmon_gates
+from cirqprojectq._rules_pq_to_cirq import Ruleset_pq_to_cirq, Rule_pq_to_cirq
+
+
+def _translate_rz(cmd, mapping, qubits):
+    return "Rz"
+
+def _translate_basic(cmd, mapping, qubits):
+    return "basic"
+
+@pytest.fixture
+def eng():
+    return projectq.MainEngine(backend=DummyEngine(), engine_list=[])
+
+def _cmd(eng, gate):
+    qb = eng.allocate_qubit()
+    return ops.Command(eng, gate, (qb,))
+
+def test_mro_resolution(eng):
+    rules = Ruleset_pq_to_cirq([Rule_pq_to_cirq([ops.Rz], _translate_rz),
+                                Rule_pq_to_cirq([ops.BasicGate], _translate_basic)])
+    assert rules.translate(_cmd(eng, ops.Rz(0.1)), None, None) == "Rz"
+    assert rules.translate(_cmd(eng, ops.Rx(0.1)), None, None) == "basic"
+    assert rules.translate(_cmd(eng, xmon_gates.ExpZGate(0.1)), None, None) == "basic"
+    assert rules.get_rules(object) == ()
+
+def test_unknown_gate(eng):
+    rules = Ruleset_pq_to_cirq([Rule_pq_to_cirq([ops.Rz], _translate_rz)])
+    assert not rules.is_available(_cmd(eng, ops.Rx(0.1)))
+    with pytest.raises(TypeError):
+        rules.translate(_cmd(eng, ops.Rx(0.1)), None, None)
+
+def test_dispatch_invalidated_by_add_rule(eng):
+    rules = Ruleset_pq_to_cirq([Rule_pq_to_cirq([ops.BasicGate], _translate_basic)])
+    cmd = _cmd(eng, ops.Rz(0.1))
+    assert rules.translate(cmd, None, None) == "basic"
+    rules.add_rule(Rule_pq_to_cirq([ops.Rz], _translate_rz))
+    assert rules.translate(cmd, None, None) == "Rz"
+
+def test_recognizer(eng):
+    rules = Ruleset_pq_to_cirq([Rule_pq_to_cirq([ops.BasicGate], _translate_basic,
+                                                lambda cmd: hasattr(cmd.gate, 'matrix'))])
+    assert rules.is_available(_cmd(eng, ops.Rz(0.1)))
+    assert not rules.is_available(_cmd(eng, ops.QFT))
+
+def test_recognizer_falls_through(eng):
+    rules = Ruleset_pq_to_cirq([Rule_pq_to_cirq([ops.Rz], _translate_rz,
+                                                lambda cmd: cmd.gate.angle < 1),
+                                Rule_pq_to_cirq([ops.BasicGate], _translate_basic)])
+    assert rules.translate(_cmd(eng, ops.Rz(0.1)), None, None) == "Rz"
+    assert rules.translate(_cmd(eng, ops.Rz(2.)), None, None) == "basic"
+
+def test_recognizer_runs_once_per_command(eng):
+    calls = []
+    def recognizer(cmd):
+        calls.append(cmd)
+        return True
+    rules = Ruleset_pq_to_cirq([Rule_pq_to_cirq([ops.Rz], _translate_rz, recognizer)])
+    cmd = _cmd(eng, ops.Rz(0.1))
+    assert rules.is_available(cmd)
+    assert rules.translate(cmd, None, None) == "Rz"
+    assert len(calls) == 1
+    assert rules.translate(_cmd(eng, ops.Rz(0.1)), None, None) == "Rz"
+    assert len(calls) == 2
@@ -0,0 +1,71 @@
+import pytest
+import numpy as np
+from scipy.linalg import expm
+from cirqprojectq import siam
+
+
+def _annihilation(mode, modes):
+    # Jordan-Wigner with mode 0 as the most significant bit.
+    ops = [np.diag([1., -1.])] * mode + [np.array([[0., 1.], [0., 0.]])]
+    ops += [np.eye(2)] * (modes - mode - 1)
+    matrix = np.eye(1)
+    for op in ops:
+        matrix = np.kron(matrix, op)
+    return matrix
+
+def _dense_hamiltonian(sites, t, U, impsite):
+    c = [_annihilation(m, 2 * sites) for m in range(2 * sites)]
+    h = 0
+    for spin in (0, sites):
+        for i in range(sites - 1):
+            hop = c[spin + i].T.dot(c[spin + i + 1])
+            h = h + t * (hop + hop.T)
+    n = [op.T.dot(op) for op in c]
+    return h + U * n[impsite].dot(n[impsite + sites])
+
+def _reverse_bits(matrix, qubits):
+    shape = [2] * (2 * qubits)
+    axes = list(reversed(range(qubits))) + list(reversed(range(qubits, 2 * qubits)))
+    return matrix.reshape(shape).transpose(axes).reshape(matrix.shape)
+
+@pytest.mark.parametrize("sites", [2, 3])
+def test_hamiltonian(sites):
+    expected = _dense_hamiltonian(sites, -0.7, 1.3, sites // 2)
+    np.testing.assert_allclose(
+        siam.hamiltonian(sites, -0.7, 1.3, big_endian=True).toarray(), expected)
+    np.testing.assert_allclose(siam.hamiltonian(sites, -0.7, 1.3).toarray(),
+                               _reverse_bits(expected, 2 * sites))
+
+def test_hamiltonian_cache():
+    siam.HAMILTONIAN_CACHE.clear()
+    h = siam.hamiltonian(3, -1., 2.)
+    assert siam.hamiltonian(3, -1., 2., impsite=1) is h
+    assert siam.hamiltonian(3, -1., 1.) is not h
+    assert siam.HAMILTONIAN_CACHE.info().hits == 1
+
+def test_initial_state():
+    state = siam.initial_state(3)
+    assert state[1 + 2 + 16 + 32] == 1 and np.sum(abs(state)) == 1
+    state = siam.initial_state(3, big_endian=True)
+    assert state[32 + 16 + 2 + 1] == 1
+    state = siam.initial_state(2, big_endian=True)
+    assert state[8 + 1] == 1
+
+@pytest.mark.parametrize("times", [[0.5], [0, 0.5, 1, 1.5], [0.2, 0.3, 1.1]])
+def test_exact_states(times):
+    h = siam.hamiltonian(3, -1., 2.).toarray()
+    initial = siam.initial_state(3)
+    states = siam.exact_states(3, -1., 2., times)
+    assert states.shape == (len(times), 64)
+    for time, state in zip(times, states):
+        np.testing.assert_allclose(state, expm(-1j * time * h).dot(initial),
+                                   atol=1e-10)
+
+def test_fidelities():
+    exact = siam.exact_states(2, -1., 2., [0, 1, 2])
+    assert siam.fidelities(exact, exact) == pytest.approx(np.ones(3))
+    batch = siam.fidelities(exact[:, None, :], exact[None, :, :])
+    assert batch.shape == (3, 3)
+    np.testing.assert_allclose(np.diag(batch), 1)
+    assert siam.fidelities(exact[0], exact)[0] == pytest.approx(1)
+    assert siam.fidelities(exact[0], -1j * exact[0]) == pytest.approx(1)
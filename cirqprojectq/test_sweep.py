@@ -0,0 +1,42 @@
+import pytest
+import numpy as np
+import cirq
+from cirqprojectq.sweep import grid_points, run_sweep
+
+
+def _build(half_turns, axis):
+    qubit = cirq.LineQubit(0)
+    return cirq.Circuit.from_ops(cirq.PhasedXPowGate(exponent=half_turns,
+                                                     phase_exponent=axis)(qubit))
+
+def _probability(circuit, half_turns, axis):
+    return abs(circuit.to_unitary_matrix()[1, 0]) ** 2
+
+def _fail(circuit, half_turns, axis):
+    if half_turns > 0.5:
+        raise ValueError("failed")
+    return half_turns
+
+def test_grid_points():
+    assert grid_points({'a': [1, 2], 'b': [3, 4, 5]})[:4] == [
+            {'a': 1, 'b': 3}, {'a': 1, 'b': 4}, {'a': 1, 'b': 5}, {'a': 2, 'b': 3}]
+    assert len(grid_points({'a': [1, 2], 'b': [3, 4, 5]})) == 6
+    assert grid_points(cirq.Points('a', [1, 2])) == [{'a': 1}, {'a': 2}]
+    assert grid_points([{'a': 1}]) == [{'a': 1}]
+
+@pytest.mark.parametrize("max_workers, chunksize", [(1, None), (2, None), (2, 1), (3, 4)])
+def test_run_sweep(max_workers, chunksize):
+    grid = {'half_turns': np.linspace(0, 1, 7), 'axis': [0, 0.25]}
+    calls = []
+    results = run_sweep(_build, grid, _probability, max_workers=max_workers,
+                        chunksize=chunksize, progress=lambda *args: calls.append(args))
+    expected = [np.sin(np.pi * point['half_turns'] / 2) ** 2 for point in grid_points(grid)]
+    np.testing.assert_allclose(results, expected, atol=1e-10)
+    assert calls[-1] == (14, 14)
+    assert [done for done, _ in calls] == sorted(done for done, _ in calls)
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_run_sweep_error(max_workers):
+    with pytest.raises(ValueError):
+        run_sweep(_build, {'half_turns': [0, 1], 'axis': [0]}, _fail,
+                  max_workers=max_workers)
@@ -0,0 +1,60 @@
+import pytest
+import numpy as np
+import cirq
+from cirqprojectq.trotter import repeat_step
+
+
+def _random_step(qubits, gates, seed):
+    rng = np.random.RandomState(seed)
+    step = []
+    for _ in range(gates):
+        if rng.rand() < 0.4:
+            q0, q1 = rng.choice(len(qubits), 2, replace=False)
+            step.append((cirq.CZ**rng.rand())(qubits[q0], qubits[q1]))
+        else:
+            step.append((cirq.X**rng.rand())(qubits[rng.randint(len(qubits))]))
+    return step
+
+def _appended(step, repetitions, circuit):
+    circuit = cirq.Circuit(circuit, device=circuit.device)
+    for _ in range(repetitions):
+        circuit.append(step, strategy=cirq.InsertStrategy.EARLIEST)
+    return circuit
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("repetitions", [1, 2, 3, 7, 25])
+def test_repeat_step_equals_append(seed, repetitions):
+    qubits = cirq.LineQubit.range(5)
+    step = _random_step(qubits, 1 + seed, seed)
+    initial = cirq.Circuit.from_ops(_random_step(qubits[:3], seed % 4, seed + 100),
+                                    strategy=cirq.InsertStrategy.EARLIEST)
+    expected = _appended(step, repetitions, initial)
+    assert repeat_step(step, repetitions, initial) == expected
+    assert initial == cirq.Circuit.from_ops(_random_step(qubits[:3], seed % 4, seed + 100),
+                                            strategy=cirq.InsertStrategy.EARLIEST)
+
+def test_repeat_step_staircase():
+    # The steps overlap in many moments.
+    qubits = cirq.LineQubit.range(6)
+    step = [(cirq.CZ**.1)(qubits[i], qubits[i + 1]) for i in range(5)]
+    step += [(cirq.Z**.2)(qubits[0])]
+    for repetitions in (1, 4, 30):
+        assert repeat_step(step, repetitions) == _appended(step, repetitions, cirq.Circuit())
+
+def test_repeat_step_without_stitching():
+    qubits = cirq.LineQubit.range(2)
+    step = [(cirq.X**.5)(qubits[0]), cirq.CZ(*qubits),
+            (cirq.X**.5)(qubits[1])]
+    block = cirq.Circuit.from_ops(step, strategy=cirq.InsertStrategy.EARLIEST)
+    circuit = repeat_step(block, 3, stitch=False)
+    assert list(circuit) == list(block) * 3
+    assert len(repeat_step(block, 3)) == 7
+
+def test_repeat_step_device():
+    qubits = [cirq.GridQubit(0, i) for i in range(3)]
+    device = cirq.google.XmonDevice(cirq.Duration(nanos=0), cirq.Duration(nanos=20),
+                                    cirq.Duration(nanos=50), qubits)
+    step = [cirq.CZ(qubits[0], qubits[1]), cirq.CZ(qubits[1], qubits[2]),
+            (cirq.X**.5)(qubits[2])]
+    circuit = cirq.Circuit(device=device)
+    assert repeat_step(step, 4, circuit) == _appended(step, 4, circuit)
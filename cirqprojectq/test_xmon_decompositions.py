@@ -0,0 +1,135 @@
+import pytest
+import numpy as np
+import projectq
+from projectq import ops
+from projectq.backends import Simulator
+from projectq.cengines import AutoReplacer, DummyEngine, InstructionFilter
+from scipy.stats import unitary_group
+from cirqprojectq import xmon_gates, xmon_setup, xmon_decompositions
+from cirqprojectq.xmon_decompositions import two_qubit_matrix_to_xmon
+
+_ISWAP = np.array([[1, 0, 0, 0], [0, 0, 1j, 0], [0, 1j, 0, 0], [0, 0, 0, 1]])
+_CNOT = np.eye(4)[[0, 3, 2, 1]]
+
+def _state(gate, engine_list):
+    backend = Simulator()
+    eng = projectq.MainEngine(backend=backend, engine_list=engine_list)
+    qureg = eng.allocate_qureg(3)
+    ops.All(xmon_gates.ExpWGate(.4, .3)) | qureg
+    xmon_gates.ExpWGate(.3, .1) | qureg[1]
+    gate | (qureg[2], qureg[0])
+    eng.flush()
+    state = backend.cheat()[1]
+    ops.All(ops.Measure) | qureg
+    return np.array(state)
+
+def _xmon_or_phase(eng, cmd):
+    if isinstance(cmd.gate, ops.Ph):
+        return True
+    return xmon_setup._filter_xmon(eng, cmd)
+
+def _engines():
+    # The global phases of CORRECT_PHASES are passed on to the simulator.
+    return [AutoReplacer(xmon_setup.xmon_rules()),
+            InstructionFilter(_xmon_or_phase)]
+
+_GATES = [ops.Swap, ops.SqrtSwap, ops.MatrixGate(_ISWAP),
+          ops.MatrixGate(_CNOT), ops.MatrixGate(np.diag([1, 1, 1, 1j]))] + \
+         [ops.MatrixGate(unitary_group.rvs(4, random_state=seed))
+          for seed in range(3)]
+
+@pytest.mark.parametrize("gate", _GATES)
+@pytest.mark.parametrize("correct_phases", [False, True])
+def test_two_qubit_simulation(gate, correct_phases, monkeypatch):
+    monkeypatch.setattr(xmon_decompositions, 'CORRECT_PHASES', correct_phases)
+    expected = _state(gate, [])
+    state = _state(gate, _engines())
+    overlap = np.vdot(expected, state)
+    assert abs(overlap) == pytest.approx(1)
+    if correct_phases:
+        np.testing.assert_allclose(state, expected, atol=1e-10)
+
+@pytest.mark.parametrize("matrix, exp11", [
+        (np.kron(unitary_group.rvs(2, random_state=1),
+                 unitary_group.rvs(2, random_state=2)), 0),
+        (_CNOT, 1), (np.diag([1, 1, 1, np.exp(.3j)]), 1), (_ISWAP, 2),
+        (ops.Swap.matrix, 3), (unitary_group.rvs(4, random_state=5), 3)])
+def test_two_qubit_gate_counts(matrix, exp11):
+    gates, phase = two_qubit_matrix_to_xmon(matrix)
+    v = np.eye(4)
+    for gate, qubits in gates:
+        m = np.asarray(gate.matrix)
+        if qubits == (0,):
+            m = np.kron(np.eye(2), m)
+        elif qubits == (1,):
+            m = np.kron(m, np.eye(2))
+        v = m.dot(v)
+    np.testing.assert_allclose(np.exp(1j * phase) * v, matrix, atol=1e-10)
+    assert sum(len(qubits) == 2 for _, qubits in gates) == exp11
+    # At most one ExpWGate per qubit between the Exp11Gates and one ExpZGate
+    # per qubit at the end.
+    assert len(gates) <= 3 * exp11 + 4
+
+def test_two_qubit_rule_is_fallback():
+    backend = DummyEngine(save_commands=True)
+    eng = projectq.MainEngine(backend=backend, engine_list=_engines())
+    qureg = eng.allocate_qureg(2)
+    ops.MatrixGate(_ISWAP) | qureg
+    ops.Swap | (qureg[0], qureg[1])
+    eng.flush()
+    exp11 = [cmd.gate for cmd in backend.received_commands
+             if isinstance(cmd.gate, xmon_gates.Exp11Gate)]
+    # Two for the iSWAP, three for the SWAP with its own rule.
+    assert len(exp11) == 5
+    assert all(cmd.gate != ops.Swap for cmd in backend.received_commands)
+
+def _single_qubit_state(gate, engine_list):
+    backend = Simulator()
+    eng = projectq.MainEngine(backend=backend, engine_list=engine_list)
+    qureg = eng.allocate_qureg(2)
+    ops.All(xmon_gates.ExpWGate(.4, .3)) | qureg
+    gate | qureg[1]
+    eng.flush()
+    state = backend.cheat()[1]
+    ops.All(ops.Measure) | qureg
+    return np.array(state)
+
+@pytest.mark.parametrize("gate", [ops.S, ops.Sdag, ops.T, ops.Tdag, ops.SqrtX,
+                                  ops.R(0.3), ops.MatrixGate(np.eye(2)),
+                                  ops.MatrixGate(unitary_group.rvs(2, random_state=3))])
+@pytest.mark.parametrize("correct_phases", [False, True])
+def test_single_qubit_simulation(gate, correct_phases, monkeypatch):
+    monkeypatch.setattr(xmon_decompositions, 'CORRECT_PHASES', correct_phases)
+    expected = _single_qubit_state(gate, [])
+    backend = DummyEngine(save_commands=True)
+    state = _single_qubit_state(gate, _engines() + [backend])
+    overlap = np.vdot(expected, state)
+    assert abs(overlap) == pytest.approx(1)
+    if correct_phases:
+        np.testing.assert_allclose(state, expected, atol=1e-10)
+    # Without the ExpWGates of the initial state.
+    gates = [type(cmd.gate) for cmd in backend.received_commands
+             if isinstance(cmd.gate, xmon_gates.XmonGate)][2:]
+    assert gates.count(xmon_gates.ExpWGate) <= 1
+    assert gates.count(xmon_gates.ExpZGate) <= 1
+
+@pytest.mark.parametrize("gate, exp11", [
+        (ops.C(ops.R(0.3)), 1), (ops.C(ops.Rz(-1.1)), 1), (ops.C(ops.Z), 1),
+        (ops.C(ops.S), 1), (ops.C(ops.Tdag), 1),
+        (ops.C(xmon_gates.ExpZGate(.4)), 1), (ops.C(ops.Rx(0.7)), 1),
+        (ops.C(ops.Ry(2.3)), 1), (ops.C(xmon_gates.ExpWGate(.3, .2)), 1),
+        (ops.C(ops.Rz(0.)), 0)])
+@pytest.mark.parametrize("correct_phases", [False, True])
+def test_controlled_simulation(gate, exp11, correct_phases, monkeypatch):
+    monkeypatch.setattr(xmon_decompositions, 'CORRECT_PHASES', correct_phases)
+    expected = _state(gate, [])
+    backend = DummyEngine(save_commands=True)
+    state = _state(gate, _engines() + [backend])
+    overlap = np.vdot(expected, state)
+    assert abs(overlap) == pytest.approx(1)
+    if correct_phases:
+        np.testing.assert_allclose(state, expected, atol=1e-10)
+    gates = [cmd.gate for cmd in backend.received_commands]
+    assert sum(isinstance(g, xmon_gates.Exp11Gate) for g in gates) == exp11
+    # Without the ExpWGates of the initial state.
+    assert sum(isinstance(g, xmon_gates.XmonGate) for g in gates) - 4 <= 5
@@ -0,0 +1,95 @@
+import pytest
+import numpy as np
+import projectq
+from projectq import ops
+from projectq.backends import Simulator
+from projectq.cengines import DummyEngine
+from cirqprojectq import xmon_gates, xmon_setup
+from cirqprojectq.xmon_fusion import DiagonalFusion, DiagonalGate
+from cirqprojectq.xmon_simulator import XmonSimulator
+
+
+def _diagonal_program(qureg, seed=1):
+    rng = np.random.RandomState(seed)
+    for _ in range(200):
+        r = rng.rand()
+        q0, q1 = rng.choice(len(qureg), 2, replace=False)
+        if r < 0.4:
+            xmon_gates.Exp11Gate(rng.uniform(-1, 1)) | (qureg[q0], qureg[q1])
+        elif r < 0.8:
+            xmon_gates.ExpZGate(rng.uniform(-1, 1)) | qureg[q0]
+        elif r < 0.9:
+            xmon_gates.ExpWGate(rng.rand(), rng.rand()) | qureg[q0]
+        else:
+            ops.C(xmon_gates.ExpZGate(rng.rand())) | (qureg[q0], qureg[q1])
+
+def _simulate(backend, engine_list):
+    eng = projectq.MainEngine(backend=backend, engine_list=engine_list)
+    qureg = eng.allocate_qureg(6)
+    ops.All(xmon_gates.ExpWGate(.5, .25)) | qureg
+    _diagonal_program(qureg)
+    eng.flush()
+    state = backend.cheat()[1]
+    ops.All(ops.Measure) | qureg
+    return state
+
+@pytest.mark.parametrize("max_qubits", [2, 4, 10])
+def test_fusion_matches_simulation(max_qubits):
+    expected = _simulate(XmonSimulator(), [])
+    fusion = DiagonalFusion(max_qubits)
+    np.testing.assert_allclose(_simulate(XmonSimulator(), [fusion]), expected,
+                               atol=1e-10)
+    counts = fusion.fusion_counts
+    assert counts['fused'] > counts['diagonal'] > 0
+    # The projectq simulator supports gates with at most 5 qubits.
+    np.testing.assert_allclose(_simulate(Simulator(), [DiagonalFusion(min(max_qubits, 5))]),
+                               expected, atol=1e-10)
+
+def test_fusion_order():
+    backend = DummyEngine(save_commands=True)
+    fusion = DiagonalFusion()
+    eng = projectq.MainEngine(backend=backend, engine_list=[fusion])
+    qureg = eng.allocate_qureg(3)
+    xmon_gates.ExpZGate(.5) | qureg[0]
+    xmon_gates.Exp11Gate(.3) | (qureg[0], qureg[1])
+    xmon_gates.ExpWGate(.2) | qureg[2]
+    xmon_gates.ExpZGate(.1) | qureg[1]
+    xmon_gates.ExpWGate(.4) | qureg[0]
+    xmon_gates.ExpZGate(.7) | qureg[2]
+    xmon_gates.ExpZGate(.6) | qureg[0]
+    eng.flush()
+    gates = [cmd.gate for cmd in backend.received_commands
+             if not isinstance(cmd.gate, (ops.AllocateQubitGate, ops.FlushGate))]
+    assert gates[0] == xmon_gates.ExpWGate(.2)
+    assert isinstance(gates[1], DiagonalGate) and gates[1].num_qubits == 2
+    expected = (xmon_gates.ExpZGate(.1).matrix[1, 1] * xmon_gates.Exp11Gate(.3).matrix[3, 3]
+                * xmon_gates.ExpZGate(.5).matrix[1, 1])
+    assert gates[1].phases[3] == pytest.approx(expected)
+    assert gates[2:] == [xmon_gates.ExpWGate(.4), DiagonalGate(
+            np.kron(np.diag(xmon_gates.ExpZGate(.6).matrix), np.diag(xmon_gates.ExpZGate(.7).matrix)))]
+    assert fusion.fusion_counts == {'fused': 5, 'diagonal': 2}
+
+def test_diagonal_gate():
+    gate = DiagonalGate(np.exp(1j * np.arange(4)))
+    assert gate.num_qubits == 2
+    assert gate == DiagonalGate(np.exp(1j * np.arange(4)))
+    assert gate != DiagonalGate(np.exp(1j * np.arange(4) + 0.1))
+    np.testing.assert_allclose(gate.get_inverse().matrix.dot(gate.matrix), np.eye(4))
+    with pytest.raises(ValueError):
+        gate.phases[0] = 1
+
+def test_xmon_engines():
+    def program(qureg):
+        ops.QFT | qureg
+        ops.C(ops.Rz(0.4)) | (qureg[0], qureg[2])
+    states = []
+    for fuse in (False, True):
+        backend = XmonSimulator()
+        eng = projectq.MainEngine(backend=backend,
+                                  engine_list=xmon_setup.xmon_engines(fuse_diagonal=fuse))
+        qureg = eng.allocate_qureg(4)
+        program(qureg)
+        eng.flush()
+        states.append(backend.cheat()[1])
+        ops.All(ops.Measure) | qureg
+    np.testing.assert_allclose(states[0], states[1], atol=1e-10)
@@ -2,24 +2,27 @@ import pytest
 import numpy as np
 import itertools
 from numpy import testing as nptest
+from projectq.ops import NotMergeable, NotInvertible
 from cirqprojectq import xmon_gates
 import cirq
 from cirq import ops
-version = [int(cirq.__version__[0]), int(cirq.__version__[2])]
-if (version[0] == 0 and version[1] <= 3):
+from cirqprojectq._compat import legacy_cirq
+if legacy_cirq():
     from cirq import google
 else:
     from cirq.protocols.unitary import unitary
 
 @pytest.mark.parametrize("half_turns", [-1.5, -1., -.5, 0, 0.25, 0.3, 1., 1.5, 2.])
 def test_expz_matrix(half_turns):
-    if (version[0] == 0 and version[1] <= 3):
-        nptest.assert_array_almost_equal(xmon_gates.ExpZGate(half_turns=half_turns).matrix,
-                                google.ExpZGate(half_turns=half_turns).matrix())
+    if legacy_cirq():
+        # The legacy ExpZGate maps half turns to (-1, 1] and drops the sign.
+        m = xmon_gates.ExpZGate(half_turns=half_turns).matrix
+        m2 = google.ExpZGate(half_turns=half_turns).matrix()
+        assert abs(np.trace(np.conj(m).T.dot(m2))) == pytest.approx(2)
     else:
         nptest.assert_array_almost_equal(xmon_gates.ExpZGate(half_turns=half_turns).matrix,
                                 unitary(ops.ZPowGate(exponent=half_turns,
-                                                     global_shift=half_turns)))
+                                                     global_shift=-0.5)))
 
 
 @pytest.mark.parametrize("half_turns, axis_half_turns",
@@ -28,7 +31,7 @@ def test_expz_matrix(half_turns):
 def test_expw_matrix(half_turns, axis_half_turns):
     m1 = xmon_gates.ExpWGate(half_turns=half_turns,
                                 axis_half_turns=axis_half_turns).matrix
-    if (version[0] == 0 and version[1] <= 3):
+    if legacy_cirq():
         m2 = google.ExpWGate(half_turns=half_turns,
                             axis_half_turns=axis_half_turns).matrix()
     else:
@@ -39,9 +42,95 @@ def test_expw_matrix(half_turns, axis_half_turns):
 
 @pytest.mark.parametrize("half_turns", [-1.5, -1., -.5, 0, 0.25, 0.3, 1., 1.5, 2.])
 def test_expw_matrix(half_turns):
-    if (version[0] == 0 and version[1] <= 3):
+    if legacy_cirq():
         nptest.assert_array_almost_equal(xmon_gates.Exp11Gate(half_turns=half_turns).matrix,
                                 google.Exp11Gate(half_turns=half_turns).matrix())
     else:
         nptest.assert_array_almost_equal(xmon_gates.Exp11Gate(half_turns=half_turns).matrix,
-                                unitary(ops.CZPowGate(exponent=half_turns)))
\ No newline at end of file
+                                unitary(ops.CZPowGate(exponent=half_turns)))
+
+def test_xmon_gate_equality_and_hash():
+    assert xmon_gates.ExpWGate(0.5, 0.25) == xmon_gates.ExpWGate(0.5 + 1e-13, 0.25)
+    assert xmon_gates.ExpWGate(0.5, 0.25) != xmon_gates.ExpWGate(0.5, 0.3)
+    assert xmon_gates.ExpWGate(0.5, -0.75) == xmon_gates.ExpWGate(-0.5, 0.25)
+    assert xmon_gates.ExpWGate(0, 0.3) == xmon_gates.ExpWGate(0, 0.7)
+    assert xmon_gates.ExpZGate(2.) == xmon_gates.ExpZGate(-2. + 1e-13)
+    assert xmon_gates.ExpZGate(1.) != xmon_gates.ExpZGate(-1.)
+    assert xmon_gates.ExpZGate(0.5) != xmon_gates.Exp11Gate(0.5)
+    gates = {xmon_gates.ExpZGate(4.5), xmon_gates.ExpZGate(0.5),
+             xmon_gates.Exp11Gate(0.5), xmon_gates.ExpWGate(0.5, 1.25),
+             xmon_gates.ExpWGate(-0.5, 0.25)}
+    assert len(gates) == 3
+
+
+def test_xmon_gate_immutable():
+    gate = xmon_gates.ExpWGate(0.5, 0.25)
+    with pytest.raises(AttributeError):
+        gate.half_turns = 0.3
+    assert gate.matrix is gate.matrix
+    with pytest.raises(ValueError):
+        gate.matrix[0, 0] = 0
+
+
+@pytest.mark.parametrize("a, b", list(itertools.product([-1.5, -.5, 0, 0.3, 1.],
+                                                         [-0.7, 0, 0.25, 1.])))
+def test_merge_and_inverse(a, b):
+    for axis in [0, 0.25, 0.5, -0.3]:
+        w = xmon_gates.ExpWGate(a, axis)
+        merged = w.get_merged(xmon_gates.ExpWGate(b, axis))
+        nptest.assert_array_almost_equal(merged.matrix, w.matrix.dot(
+            xmon_gates.ExpWGate(b, axis).matrix))
+        nptest.assert_array_almost_equal(w.get_inverse().matrix.dot(w.matrix),
+                                         np.eye(2))
+    e = xmon_gates.Exp11Gate(a)
+    nptest.assert_array_almost_equal(e.get_merged(xmon_gates.Exp11Gate(b)).matrix,
+                                     e.matrix.dot(xmon_gates.Exp11Gate(b).matrix))
+    nptest.assert_array_almost_equal(e.get_inverse().matrix.dot(e.matrix), np.eye(4))
+    assert xmon_gates.Exp11Gate(1).get_inverse() == xmon_gates.Exp11Gate(1)
+
+
+def test_merge_different_axes():
+    with pytest.raises(NotMergeable):
+        xmon_gates.ExpWGate(0.5, 0.).get_merged(xmon_gates.ExpWGate(0.5, 0.5))
+    with pytest.raises(NotMergeable):
+        xmon_gates.ExpWGate(0.5, 0.).get_merged(xmon_gates.ExpZGate(0.5))
+    identity = xmon_gates.ExpWGate(0, 0.3)
+    assert identity.get_merged(xmon_gates.ExpWGate(0.5, 0.5)) == xmon_gates.ExpWGate(0.5, 0.5)
+
+
+def test_symbolic_gates():
+    a = cirq.Symbol('a')
+    gates = lambda: [xmon_gates.ExpWGate(a, 0.25), xmon_gates.ExpWGate(0.5, a),
+                     xmon_gates.ExpZGate(a), xmon_gates.Exp11Gate(a)]
+    for gate, same in zip(gates(), gates()):
+        assert gate.is_parameterized
+        assert gate == same and hash(gate) == hash(same)
+        assert not hasattr(gate, 'matrix')
+        with pytest.raises(NotInvertible):
+            gate.get_inverse()
+        with pytest.raises(NotMergeable):
+            gate.get_merged(gate)
+    assert xmon_gates.ExpWGate(a, -0.5).axis_half_turns == -0.5
+    assert xmon_gates.ExpWGate(a) != xmon_gates.ExpWGate(cirq.Symbol('b'))
+    assert not xmon_gates.ExpZGate(0.3).is_parameterized
+
+def test_batch_matrices():
+    values = [-2.5, -1.5, -1., -.75, -.5, 0, 0.25, 0.3, 1., 1.5, 2., 3.2]
+    h, a = [np.array(x) for x in zip(*itertools.product(values, values))]
+    matrices = xmon_gates.ExpWGate.matrices(h, a)
+    assert matrices.shape == (len(h), 2, 2)
+    for m, hi, ai in zip(matrices, h, a):
+        nptest.assert_allclose(m, xmon_gates.ExpWGate(hi, ai).matrix, atol=1e-12)
+    nptest.assert_allclose(xmon_gates.ExpWGate.matrices(values)[4],
+                           xmon_gates.ExpWGate(values[4]).matrix)
+    diagonals = xmon_gates.ExpZGate.diagonals(values)
+    matrices = xmon_gates.ExpZGate.matrices(values)
+    diagonals11 = xmon_gates.Exp11Gate.diagonals(values)
+    matrices11 = xmon_gates.Exp11Gate.matrices(values)
+    assert diagonals.shape == (len(values), 2)
+    assert diagonals11.shape == (len(values), 4)
+    for i, hi in enumerate(values):
+        nptest.assert_allclose(matrices[i], xmon_gates.ExpZGate(hi).matrix, atol=1e-12)
+        nptest.assert_allclose(diagonals[i], np.diag(matrices[i]))
+        nptest.assert_allclose(matrices11[i], xmon_gates.Exp11Gate(hi).matrix, atol=1e-12)
+        nptest.assert_allclose(diagonals11[i], np.diag(matrices11[i]))
@@ -0,0 +1,67 @@
+import pytest
+import numpy as np
+import projectq
+from projectq import ops
+from projectq.backends import Simulator
+from projectq.cengines import DummyEngine
+from cirqprojectq import xmon_gates
+from cirqprojectq.xmon_optimizer import XmonOptimizer
+from cirqprojectq.xmon_decompositions import single_qubit_matrix_to_xmon
+
+
+def _random_program(qureg, seed):
+    rng = np.random.RandomState(seed)
+    for _ in range(60):
+        r = rng.rand()
+        if r < 0.4:
+            xmon_gates.ExpWGate(rng.rand() * 2 - 1, rng.rand()) | qureg[rng.randint(3)]
+        elif r < 0.8:
+            xmon_gates.ExpZGate(rng.rand() * 2 - 1) | qureg[rng.randint(3)]
+        else:
+            q0, q1 = rng.choice(3, 2, replace=False)
+            xmon_gates.Exp11Gate(rng.rand() * 2 - 1) | (qureg[q0], qureg[q1])
+
+def _final_state(engine_list, seed):
+    eng = projectq.MainEngine(backend=Simulator(), engine_list=engine_list)
+    qureg = eng.allocate_qureg(3)
+    _random_program(qureg, seed)
+    eng.flush()
+    state = np.array(eng.backend.cheat()[1])
+    ops.All(ops.Measure) | qureg
+    return state
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("eject_z", [True, False])
+def test_optimizer_preserves_state(seed, eject_z):
+    optimizer = XmonOptimizer(eject_z=eject_z)
+    reference = _final_state([], seed)
+    optimized = _final_state([optimizer], seed)
+    assert np.isclose(abs(np.vdot(reference, optimized)), 1)
+    assert optimizer.gate_counts['out'] < optimizer.gate_counts['in']
+
+def test_z_ejection():
+    backend = DummyEngine(save_commands=True)
+    eng = projectq.MainEngine(backend=backend, engine_list=[XmonOptimizer()])
+    qureg = eng.allocate_qureg(2)
+    xmon_gates.ExpWGate(0.5, 0.) | qureg[0]
+    xmon_gates.ExpZGate(0.3) | qureg[0]
+    xmon_gates.ExpWGate(0.2, 0.1) | qureg[1]
+    xmon_gates.Exp11Gate(1.) | (qureg[0], qureg[1])
+    xmon_gates.ExpZGate(0.2) | qureg[0]
+    xmon_gates.ExpWGate(0.5, 0.) | qureg[0]
+    ops.All(ops.Measure) | qureg
+    eng.flush()
+    gates = [cmd.gate for cmd in backend.received_commands
+             if isinstance(cmd.gate, xmon_gates.XmonGate)]
+    assert gates == [xmon_gates.ExpWGate(0.5, 0.), xmon_gates.ExpWGate(0.2, 0.1),
+                     xmon_gates.Exp11Gate(1.), xmon_gates.ExpWGate(0.5, -0.5)]
+
+def test_single_qubit_matrix_to_xmon():
+    rng = np.random.RandomState(3)
+    for _ in range(50):
+        a = rng.randn(2, 2) + 1j * rng.randn(2, 2)
+        u, _ = np.linalg.qr(a)
+        w_gate, z_gate, phase = single_qubit_matrix_to_xmon(u)
+        v = z_gate.matrix.dot(w_gate.matrix)
+        np.testing.assert_array_almost_equal(np.exp(1j * phase) * v, u)
+    assert single_qubit_matrix_to_xmon(np.eye(2)) == (None, None, 0.)
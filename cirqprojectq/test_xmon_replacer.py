@@ -0,0 +1,79 @@
+import pytest
+import numpy as np
+import projectq
+from projectq import ops
+from projectq.backends import Simulator
+from projectq.cengines import DummyEngine
+from cirqprojectq import xmon_setup, xmon_decompositions
+from cirqprojectq.xmon_replacer import get_template
+
+
+def _program(qureg):
+    ops.H | qureg[0]
+    ops.Rx(0.3) | qureg[1]
+    ops.Ry(-1.2) | qureg[2]
+    ops.Rz(4.) | qureg[0]
+    ops.X | qureg[1]
+    ops.Y | qureg[2]
+    ops.Z | qureg[0]
+    ops.C(ops.X) | (qureg[0], qureg[2])
+    ops.Swap | (qureg[1], qureg[2])
+    ops.C(ops.Rz(0.5)) | (qureg[1], qureg[0])
+    ops.S | qureg[1]
+    ops.QFT | qureg
+
+def _commands(templates):
+    backend = DummyEngine(save_commands=True)
+    eng = projectq.MainEngine(backend=backend,
+                              engine_list=xmon_setup.xmon_engines(templates=templates))
+    qureg = eng.allocate_qureg(3)
+    _program(qureg)
+    eng.flush()
+    return [(cmd.gate, [qb.id for qr in cmd.all_qubits for qb in qr])
+            for cmd in backend.received_commands]
+
+@pytest.mark.parametrize("correct_phases", [False, True])
+def test_templates_match_decompositions(correct_phases, monkeypatch):
+    monkeypatch.setattr(xmon_decompositions, 'CORRECT_PHASES', correct_phases)
+    assert _commands(True) == _commands(False)
+
+_GATES = {'H': lambda q: ops.H | q[1],
+          'CNOT': lambda q: ops.CNOT | (q[1], q[2]),
+          'CY': lambda q: ops.C(ops.Y) | (q[1], q[2]),
+          'CH': lambda q: ops.C(ops.H) | (q[1], q[2]),
+          'Swap': lambda q: ops.Swap | (q[1], q[2]),
+          'Rx': lambda q: ops.Rx(0.3) | q[1],
+          'S': lambda q: ops.S | q[1]}
+
+def _simulated_state(gate, engine_list):
+    backend = Simulator()
+    eng = projectq.MainEngine(backend=backend, engine_list=engine_list)
+    qureg = eng.allocate_qureg(3)
+    for k, qb in enumerate(qureg):
+        ops.Ry(0.4 + k) | qb
+        ops.Rz(0.3 * k) | qb
+    _GATES[gate](qureg)
+    eng.flush()
+    # The simulator orders the qubits by their allocation in the backend.
+    positions, state = backend.cheat()
+    index = np.arange(8)
+    physical = sum(((index >> k) & 1) << positions[qb.id]
+                   for k, qb in enumerate(qureg))
+    ops.All(ops.Measure) | qureg
+    return np.array(state)[physical]
+
+@pytest.mark.parametrize("templates", [False, True])
+@pytest.mark.parametrize("gate", sorted(_GATES))
+def test_templates_match_unitary(gate, templates):
+    expected = _simulated_state(gate, [])
+    state = _simulated_state(gate, xmon_setup.xmon_engines(templates=templates))
+    assert abs(np.vdot(expected, state)) == pytest.approx(1)
+
+def test_hadamard_template():
+    eng = projectq.MainEngine(backend=DummyEngine(), engine_list=[])
+    template = get_template(ops.H.generate_command(eng.allocate_qubit()))
+    v = np.eye(2)
+    for gate, _ in template:
+        v = np.asarray(gate.matrix).dot(v)
+    h = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
+    assert abs(np.trace(v.conj().T.dot(h))) / 2 == pytest.approx(1)
@@ -0,0 +1,168 @@
+import pytest
+import numpy as np
+import cirq
+import projectq
+from projectq import ops
+from projectq.backends import Simulator
+from cirqprojectq import xmon_gates, xmon_setup
+from cirqprojectq.xmon_simulator import XmonSimulator
+
+
+def _random_xmon_program(qureg, gates, seed=1):
+    rng = np.random.RandomState(seed)
+    for _ in range(gates):
+        r = rng.rand()
+        if r < 0.3:
+            q0, q1 = rng.choice(len(qureg), 2, replace=False)
+            xmon_gates.Exp11Gate(rng.uniform(-2, 2)) | (qureg[q0], qureg[q1])
+        elif r < 0.65:
+            xmon_gates.ExpWGate(rng.uniform(-2, 2), rng.uniform(-2, 2)) | qureg[rng.randint(len(qureg))]
+        elif r < 0.8:
+            q0, q1 = rng.choice(len(qureg), 2, replace=False)
+            ops.C(xmon_gates.ExpWGate(rng.rand(), rng.rand())) | (qureg[q0], qureg[q1])
+        else:
+            xmon_gates.ExpZGate(rng.uniform(-2, 2)) | qureg[rng.randint(len(qureg))]
+
+def _state(backend, program, n, engine_list=None):
+    eng = projectq.MainEngine(backend=backend, engine_list=engine_list or [])
+    qureg = eng.allocate_qureg(n)
+    program(qureg)
+    eng.flush()
+    mapping, state = backend.cheat()
+    amplitudes = [backend.get_amplitude([(i >> k) & 1 for k in range(n)], qureg)
+                  for i in range(2 ** n)]
+    ops.All(ops.Measure) | qureg
+    return np.array(amplitudes)
+
+def test_matches_projectq_simulator():
+    program = lambda qureg: _random_xmon_program(qureg, 200)
+    expected = _state(Simulator(), program, 5)
+    np.testing.assert_allclose(_state(XmonSimulator(), program, 5), expected,
+                               atol=1e-10)
+
+def test_xmon_engines():
+    def program(qureg):
+        ops.All(ops.H) | qureg
+        ops.CNOT | (qureg[0], qureg[3])
+        ops.Rx(0.3) | qureg[1]
+        ops.C(ops.Rz(0.4)) | (qureg[0], qureg[2])
+    expected = _state(Simulator(), program, 4, xmon_setup.xmon_engines())
+    state = _state(XmonSimulator(), program, 4, xmon_setup.xmon_engines())
+    np.testing.assert_allclose(state, expected, atol=1e-10)
+
+def _bell_pair(rnd_seed):
+    backend = XmonSimulator(rnd_seed=rnd_seed)
+    eng = projectq.MainEngine(backend=backend, engine_list=[])
+    qureg = eng.allocate_qureg(3)
+    xmon_gates.ExpWGate(0.5) | qureg[1]
+    ops.C(xmon_gates.ExpWGate(1)) | (qureg[1], qureg[2])
+    eng.flush()
+    return eng, backend, qureg
+
+def test_deallocate_superposition():
+    eng, backend, qureg = _bell_pair(1)
+    assert backend.get_probability('1', [qureg[2]]) == pytest.approx(0.5)
+    assert backend.get_probability('11', qureg[1:]) == pytest.approx(0.5)
+    with pytest.raises(RuntimeError):
+        eng.deallocate_qubit(qureg[1])
+    ops.All(ops.Measure) | qureg
+
+@pytest.mark.parametrize("rnd_seed", [1, 2, 3, 4])
+def test_measure_and_deallocate(rnd_seed):
+    eng, backend, qureg = _bell_pair(rnd_seed)
+    ops.Measure | qureg[1]
+    result = int(qureg[1])
+    assert backend.get_probability([result], [qureg[2]]) == pytest.approx(1)
+    del qureg[1]
+    mapping, state = backend.cheat()
+    assert sorted(mapping.values()) == [0, 1] and len(state) == 4
+    assert abs(backend.get_amplitude([0, result], qureg)) == pytest.approx(1)
+    ops.Measure | qureg[1]
+    assert int(qureg[1]) == result
+
+def test_not_available():
+    backend = XmonSimulator()
+    eng = projectq.MainEngine(backend=backend, engine_list=[])
+    qubit = eng.allocate_qubit()
+    with pytest.raises(Exception):
+        ops.H | qubit
+    with pytest.raises(Exception):
+        xmon_gates.ExpZGate(xmon_gates.value.Symbol('a')) | qubit
+
+def _symbolic_program(qureg, values):
+    rng = np.random.RandomState(2)
+    symbols = [cirq.Symbol('a'), cirq.Symbol('b')]
+    resolve = lambda s: values[s.name] if values is not None else s
+    for _ in range(60):
+        r = rng.rand()
+        symbol = symbols[rng.randint(2)]
+        q0, q1 = rng.choice(len(qureg), 2, replace=False)
+        if r < 0.3:
+            xmon_gates.Exp11Gate(resolve(symbol)) | (qureg[q0], qureg[q1])
+        elif r < 0.45:
+            xmon_gates.ExpWGate(resolve(symbol), rng.uniform(-2, 2)) | qureg[q0]
+        elif r < 0.6:
+            xmon_gates.ExpWGate(rng.rand(), resolve(symbol)) | qureg[q0]
+        elif r < 0.7:
+            ops.C(xmon_gates.ExpWGate(resolve(symbol), .3)) | (qureg[q0], qureg[q1])
+        elif r < 0.85:
+            xmon_gates.ExpZGate(resolve(symbol)) | qureg[q0]
+        else:
+            xmon_gates.ExpWGate(rng.rand(), rng.rand()) | qureg[q0]
+
+def test_batch_matches_single_points():
+    a = np.linspace(-2, 2, 7)
+    b = np.linspace(0, 1.5, 7)
+    operator = ops.QubitOperator('X0 Z2', 0.5) + ops.QubitOperator('Y1', -1.)
+    backend = XmonSimulator(params={'a': a, 'b': b})
+    eng = projectq.MainEngine(backend=backend, engine_list=[])
+    qureg = eng.allocate_qureg(4)
+    _symbolic_program(qureg, None)
+    eng.flush()
+    assert backend.batch_size == 7
+    mapping, states = backend.cheat()
+    assert states.shape == (7, 16)
+    expectation = backend.get_expectation_value(operator, qureg)
+    probabilities = backend.get_probability('10', qureg[1:3])
+    for i in range(7):
+        single = XmonSimulator()
+        eng = projectq.MainEngine(backend=single, engine_list=[])
+        qureg = eng.allocate_qureg(4)
+        _symbolic_program(qureg, {'a': a[i], 'b': b[i]})
+        eng.flush()
+        np.testing.assert_allclose(states[i], single.cheat()[1], atol=1e-10)
+        assert expectation[i] == pytest.approx(
+                single.get_expectation_value(operator, qureg))
+        assert probabilities[i] == pytest.approx(single.get_probability('10', qureg[1:3]))
+        ops.All(ops.Measure) | qureg
+
+def test_expectation_value():
+    eng = projectq.MainEngine(backend=Simulator(), engine_list=[])
+    qureg = eng.allocate_qureg(3)
+    _random_xmon_program(qureg, 50)
+    eng.flush()
+    operator = (ops.QubitOperator('X0 Y1 Z2', 0.5) + ops.QubitOperator('Y0', -1.)
+                + ops.QubitOperator('', 0.3))
+    expected = eng.backend.get_expectation_value(operator, qureg)
+    ops.All(ops.Measure) | qureg
+    backend = XmonSimulator()
+    eng = projectq.MainEngine(backend=backend, engine_list=[])
+    qureg = eng.allocate_qureg(3)
+    _random_xmon_program(qureg, 50)
+    eng.flush()
+    assert backend.get_expectation_value(operator, qureg) == pytest.approx(expected)
+    ops.All(ops.Measure) | qureg
+
+def test_batch_sweep_and_deallocate():
+    sweep = cirq.Linspace('x', 0, 1, 2) * cirq.Points('y', [0.25, 0.5])
+    backend = XmonSimulator(params=sweep)
+    assert backend.batch_size == 4
+    eng = projectq.MainEngine(backend=backend, engine_list=[])
+    qureg = eng.allocate_qureg(2)
+    xmon_gates.ExpWGate(cirq.Symbol('x')) | qureg[0]
+    xmon_gates.ExpZGate(cirq.Symbol('y')) | qureg[0]
+    del qureg[0]
+    np.testing.assert_allclose(backend.get_probability('0', qureg), 1)
+    assert backend.cheat()[1].shape == (4, 2)
+    with pytest.raises(RuntimeError):
+        ops.Measure | qureg[0]
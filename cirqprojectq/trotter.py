@@ -0,0 +1,162 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""Provides the construction of cirq circuits of repeated Trotter steps.
+
+A Trotterized time evolution appends the same step many times,
+
+.. code-block:: python
+
+    for _ in range(steps):
+        circuit.append(trotter_step(t / steps, U / steps, qubits),
+                       strategy=cirq.InsertStrategy.EARLIEST)
+
+which runs the insertion search of cirq for every operation of every step.
+:func:`repeat_step` schedules a single step and repeats its moments instead:
+
+.. code-block:: python
+
+    circuit = repeat_step(trotter_step(t / steps, U / steps, qubits), steps,
+                          circuit)
+
+With stitching, the operations at the beginning of a step move into the free
+moments at the end of the previous step, exactly as with the ``EARLIEST``
+strategy, and the result equals the circuit of the loop above. After a few
+steps, the steps are placed with a constant offset and the moments repeat
+periodically, so only these few steps are scheduled and the construction time
+doesn't grow with the number of steps. This holds for steps where all
+operations are connected by shared qubits, as for the SIAM and Ising steps.
+Otherwise, every step is scheduled, which is still much faster than the
+insertion search of cirq.
+"""
+import cirq
+
+def _schedule(operations, frontier):
+    r"""
+    Moments of the operations with the ``EARLIEST`` strategy.
+
+    Args:
+        operations (list): operations of a step.
+        frontier (dict): first free moment of each qubit, updated in place.
+
+    Returns:
+        list of int: moment index of each operation.
+    """
+    positions = []
+    for op in operations:
+        p = max([frontier.get(qb, 0) for qb in op.qubits] + [0])
+        for qb in op.qubits:
+            frontier[qb] = p + 1
+        positions.append(p)
+    return positions
+
+def _moments(contents, length):
+    return [cirq.Moment(contents.get(k, ())) for k in range(length)]
+
+def _stitch(operations, repetitions, circuit):
+    r"""
+    Moments of the circuit followed by the repeated step, as appended with the
+    ``EARLIEST`` strategy.
+    """
+    moments = list(circuit)
+    contents = {k: list(moment.operations) for k, moment in enumerate(moments)}
+    frontier = dict()
+    for k, moment in enumerate(moments):
+        for qb in moment.qubits:
+            frontier[qb] = k + 1
+    # Schedule steps until two consecutive steps differ by a constant offset.
+    # All later steps have the same offset. Steps on independent groups of
+    # qubits, which advance at different rates, are scheduled one by one.
+    placed = []
+    steady = None
+    while len(placed) < repetitions:
+        positions = _schedule(operations, frontier)
+        placed.append(positions)
+        if len(placed) > 1:
+            offsets = set(p - q for p, q in zip(positions, placed[-2]))
+            if len(offsets) == 1:
+                steady = len(placed) - 2
+                break
+    if steady is None:
+        for positions in placed:
+            for op, p in zip(operations, positions):
+                contents.setdefault(p, []).append(op)
+        return _moments(contents, max(contents) + 1)
+    period = placed[-1][0] - placed[-2][0]
+    start = min(placed[steady])
+    span = max(placed[steady]) - start + 1
+    transient = [p for positions in placed[:steady] for p in positions]
+    # The moments [cut, cut + period) only contain operations of steady steps
+    # and all steps that reach into them have been scheduled.
+    cut = max([len(moments), start + max(span - period, 0)]
+              + [p + 1 for p in transient])
+    scheduled = min(repetitions, steady + 1 + (cut + period - 1 - start) // period)
+    for positions in placed[:steady + 1]:
+        for op, p in zip(operations, positions):
+            contents.setdefault(p, []).append(op)
+    for j in range(1, scheduled - steady):
+        for op, p in zip(operations, placed[steady]):
+            contents.setdefault(p + j * period, []).append(op)
+    result = _moments(contents, max(contents) + 1)
+    if scheduled == repetitions:
+        return result
+    window = result[cut:cut + period]
+    return (result[:cut] + window * (repetitions - scheduled + 1)
+            + result[cut + period:])
+
+def repeat_step(step, repetitions, circuit=None, stitch=True):
+    r"""
+    A circuit with repeated steps.
+
+    Args:
+        step (:class:`cirq.OP_TREE` or :class:`cirq.Circuit`): operations of
+            a single step.
+        repetitions (int): number of steps.
+        circuit (:class:`cirq.Circuit`): circuit before the first step, not
+            modified. Defaults to an empty circuit.
+        stitch (bool): if True, the result equals the circuit after appending
+            the operations of the step with the ``EARLIEST`` strategy for
+            every step. If False, the moments of a single step are
+            concatenated without moving operations across the boundaries of
+            the steps.
+
+    Returns:
+        :class:`cirq.Circuit`: the circuit followed by the steps.
+
+    Note:
+        Devices can forbid operations in otherwise free moments, which makes
+        the placement depend on the content of the moments. For circuits on a
+        device other than :class:`cirq.UnconstrainedDevice`, the steps are
+        appended with cirq.
+    """
+    if circuit is None:
+        circuit = cirq.Circuit()
+    device = circuit.device
+    if isinstance(step, cirq.Circuit):
+        step = list(step.all_operations())
+    operations = list(cirq.flatten_op_tree(cirq.transform_op_tree(
+        step, device.decompose_operation)))
+    if not stitch:
+        block = cirq.Circuit(device=device)
+        block.append(operations, strategy=cirq.InsertStrategy.EARLIEST)
+        return cirq.Circuit(list(circuit) + list(block) * repetitions,
+                            device=device)
+    if device is not cirq.UnconstrainedDevice:
+        result = cirq.Circuit(circuit, device=device)
+        for _ in range(repetitions):
+            result.append(operations, strategy=cirq.InsertStrategy.EARLIEST)
+        return result
+    if not operations or repetitions <= 0:
+        return cirq.Circuit(circuit)
+    return cirq.Circuit(_stitch(operations, repetitions, circuit))
@@ -16,7 +16,12 @@ r"""Provides decompositon rules to decompose common gates into Xmon gates.
 
 The module :mod:`cirqprojectq.xmon_decompositions` provides decomposition rules for
 rotation gates (Rx, Ry, Rz), Pauli gates (X, Y, Z), the Hadamard gate and for CNOT
-gates into native Xmon gates.
+and SWAP gates into native Xmon gates. All other uncontrolled single qubit gates
+with a matrix are decomposed into at most one ExpWGate and one ExpZGate with
+:meth:`single_qubit_matrix_to_xmon`, uncontrolled two qubit gates into the
+minimal number of Exp11Gates with :meth:`two_qubit_matrix_to_xmon`.
+Controlled phases, controlled Rz, Z, S, T and ExpZ gates as well as controlled
+Rx, Ry and ExpW gates are decomposed with a single Exp11Gate.
 All defined rules can be imported as
 :meth:`cirqprojectq.xmon_decompositions.all_defined_decomposition_rules`.
 
@@ -55,6 +60,53 @@ def _check_phase(angle):
 
 all_defined_decomposition_rules = []
 
+def single_qubit_matrix_to_xmon(matrix, tolerance=1e-10):
+    r"""Decompose a single qubit unitary into an ExpWGate and an ExpZGate.
+
+    Every single qubit unitary :math:`U` can be written as
+
+    .. math::
+
+        U = e^{i\alpha} \mathrm{ExpZ}(z) \mathrm{ExpW}(\varphi, \theta)
+
+    i.e., as an ExpWGate followed by an ExpZGate and a global phase.
+
+    Args:
+        matrix (:class:`numpy.ndarray`): unitary 2x2 matrix.
+        tolerance (float): gates with less than tolerance half turns are
+            treated as identity.
+
+    Returns:
+        tuple: (:class:`xmon_gates.ExpWGate` or None,
+        :class:`xmon_gates.ExpZGate` or None, float) The gates and the global
+        phase :math:`\alpha`. Gates that are the identity are None.
+    """
+    u = np.asarray(matrix, dtype=complex)
+    c = abs(u[0, 0])
+    s = abs(u[1, 0])
+    half_turns = 2 * np.arctan2(s, c) / np.pi
+    z = 0.
+    if c > tolerance:
+        z = (np.angle(u[1, 1]) - np.angle(u[0, 0])) / np.pi
+    axis = 0.
+    if s > tolerance:
+        if c > tolerance:
+            axis = (np.angle(u[1, 0]) - np.angle(u[0, 0]) + np.pi / 2) / np.pi - z
+        else:
+            axis = (np.angle(u[1, 0]) - np.angle(u[0, 1])) / (2 * np.pi) - z / 2
+    v = np.eye(2, dtype=complex)
+    w_gate = None
+    z_gate = None
+    if half_turns > tolerance:
+        w_gate = xmon_gates.ExpWGate(half_turns=half_turns, axis_half_turns=axis)
+        v = w_gate.matrix
+    z = xmon_gates.ExpZGate(half_turns=z)
+    if abs(z.half_turns) > tolerance:
+        z_gate = z
+        v = z_gate.matrix.dot(v)
+    phase = np.angle(np.trace(np.conj(v).T.dot(u)))
+    return w_gate, z_gate, phase
+
 def _recognize_rotations(cmd):
     if isinstance(cmd.gate, (ops.Rx, ops.Ry, ops.Rz)) and get_control_count(cmd) == 0:
         return True
@@ -210,13 +262,13 @@ def _decompose_H(cmd):
 
         ::
 
-            ── H ──  -->  ── ExpW(1/2, 1/2) ── ExpZ(1) ──
+            ── H ──  -->  ── ExpW(-1/2, 1/2) ── ExpZ(1) ──
 
         This corresponds to the following map:
 
         .. math::
 
-            H \to e^{-i\pi/4}H
+            H \to e^{-3i\pi/4}H
 
     If :meth:`CORRECT_PHASES` is True, the phases are countered by a projectq phase
     gate :class:`ops.Ph`.
@@ -224,15 +276,59 @@ def _decompose_H(cmd):
     qb = cmd.qubits
     eng = cmd.engine
     with Control(eng, cmd.control_qubits):
-        #TODO: I added a minus! Check please!
-        xmon_gates.ExpWGate(half_turns=.5, axis_half_turns=.5) | qb
+        xmon_gates.ExpWGate(half_turns=-.5, axis_half_turns=.5) | qb
         xmon_gates.ExpZGate(half_turns=1.) | qb
         if CORRECT_PHASES:
-            ops.Ph(np.pi/4) | qb
+            ops.Ph(3 * np.pi/4) | qb
 
 all_defined_decomposition_rules.append(DecompositionRule(ops.HGate,
                              _decompose_H, _recognize_H))
 
+def _recognize_single_qubit(cmd):
+    # Global phase gates are removed by projectq.setups.decompositions.
+    if (isinstance(cmd.gate, ops.Ph) or get_control_count(cmd) != 0 or
+            sum(len(qr) for qr in cmd.qubits) != 1):
+        return False
+    try:
+        return np.shape(cmd.gate.matrix) == (2, 2)
+    except (AttributeError, NotImplementedError, TypeError, ValueError):
+        return False
+
+def _decompose_single_qubit(cmd):
+    r"""Decompose a single qubit gate with a matrix into xmon gates.
+
+    Uses :meth:`single_qubit_matrix_to_xmon`, i.e., at most one ExpWGate and
+    one ExpZGate:
+
+    ::
+
+        ── U ──  -->  ── ExpW(t, a) ── ExpZ(z) ──
+
+    This corresponds to the following map:
+
+    .. math::
+
+        U \to e^{-i\alpha} U
+
+    with the phase :math:`\alpha` of :meth:`single_qubit_matrix_to_xmon`,
+    e.g., for S, T, SqrtX, R and MatrixGates.
+
+    If :meth:`CORRECT_PHASES` is True, the phase is countered by a projectq
+    phase gate :class:`ops.Ph`.
+    """
+    qb = cmd.qubits
+    w_gate, z_gate, phase = single_qubit_matrix_to_xmon(cmd.gate.matrix)
+    if w_gate is not None:
+        w_gate | qb
+    if z_gate is not None:
+        z_gate | qb
+    if CORRECT_PHASES:
+        ops.Ph(phase) | qb
+
+for op in [ops.R, ops.BasicGate]:
+    all_defined_decomposition_rules.append(DecompositionRule(op,
+                                 _decompose_single_qubit, _recognize_single_qubit))
+
 def _recognize_CNOT(cmd):
     if isinstance(cmd.gate, ops.XGate) and get_control_count(cmd) == 1:
         return True
@@ -260,8 +356,8 @@ def _decompose_CNOT(cmd):
     Warning:
         The Hadamard gates are correct Hamard gates! They have no wrong phases.
         However, in a second decomposition step these gates will each yield
-        a phase of :math:`\exp(-i\pi/4)` if CORRECT_PHASES is False! In this case, the
-        final map will be :math:`\mathrm{CNOT}\to\exp(-i\pi/4)\mathrm{CNOT}`
+        a phase of :math:`\exp(-3i\pi/4)` if CORRECT_PHASES is False! In this case, the
+        final map will be :math:`\mathrm{CNOT}\to\exp(-3i\pi/2)\mathrm{CNOT}`
 
     """
     qb = cmd.qubits
@@ -272,6 +368,130 @@ def _decompose_CNOT(cmd):
 all_defined_decomposition_rules.append(DecompositionRule(ops.XGate,
                              _decompose_CNOT, _recognize_CNOT))
 
+def _controlled_matrix(cmd):
+    r"""Matrix of a gate with one control and one target qubit or None."""
+    if get_control_count(cmd) != 1 or sum(len(qr) for qr in cmd.qubits) != 1:
+        return None
+    try:
+        u = np.asarray(cmd.gate.matrix, dtype=complex)
+    except (AttributeError, NotImplementedError, TypeError, ValueError):
+        return None
+    if u.shape != (2, 2):
+        return None
+    return u
+
+def _decompose_controlled(cmd, basis=None):
+    r"""
+    Decompose a controlled gate :math:`U = V D V^\dagger` with a diagonal D
+    into :math:`V^\dagger`, a controlled D and V. The controlled D is an
+    ExpZGate on the control qubit and an Exp11Gate.
+    """
+    control = cmd.control_qubits[0]
+    target = cmd.qubits[0]
+    u = np.asarray(cmd.gate.matrix, dtype=complex)
+    phase = 0.
+    z_matrix = np.eye(2)
+    if basis is not None:
+        u = np.conj(basis).T.dot(u).dot(basis)
+        w_gate, z_gate, alpha = single_qubit_matrix_to_xmon(np.conj(basis).T)
+        phase += alpha
+        if w_gate is not None:
+            w_gate | target
+        if z_gate is not None:
+            # Commutes with the Exp11Gate
+            z_matrix = z_gate.matrix
+    # diag(1, 1, d0, d1) = (R(arg d0) x 1) Exp11(arg(d1 / d0) / pi)
+    d0, d1 = u[0, 0], u[1, 1]
+    z_gate = xmon_gates.ExpZGate(half_turns=np.angle(d0) / np.pi)
+    if abs(z_gate.half_turns) > 1e-10:
+        z_gate | control
+        phase += np.angle(d0) / 2
+    exp11 = xmon_gates.Exp11Gate(half_turns=np.angle(d1 / d0) / np.pi)
+    if abs(exp11.half_turns) > 1e-10:
+        exp11 | (control, target)
+    if basis is not None:
+        w_gate, z_gate, alpha = single_qubit_matrix_to_xmon(basis.dot(z_matrix))
+        phase += alpha
+        if w_gate is not None:
+            w_gate | target
+        if z_gate is not None:
+            z_gate | target
+    if CORRECT_PHASES:
+        ops.Ph(phase) | control
+
+def _recognize_controlled_phase(cmd):
+    u = _controlled_matrix(cmd)
+    return u is not None and abs(u[0, 1]) < 1e-10 and abs(u[1, 0]) < 1e-10
+
+def _decompose_controlled_phase(cmd):
+    r"""Decompose a controlled diagonal gate into an Exp11Gate.
+
+    A controlled phase gate is an Exp11Gate, other diagonal gates like Rz, Z,
+    S, T and ExpZGate need an additional ExpZGate on the control qubit:
+
+    ::
+
+        ── C ──        ── ExpZ(a / pi) ── @ ───────────────────
+           |     -->                      |
+        ── D ──        ────────────────── Exp11((b - a) / pi) ──
+
+    for :math:`D = \mathrm{diag}(e^{ia}, e^{ib})`. This corresponds to the
+    following map:
+
+    .. math::
+
+        C(D) \to e^{-ia/2}C(D)
+
+    If :meth:`CORRECT_PHASES` is True, the phase is countered by a projectq
+    phase gate :class:`ops.Ph`.
+    """
+    _decompose_controlled(cmd)
+
+for op in [ops.R, ops.Rz, ops.ZGate, ops.SGate, ops.TGate, xmon_gates.ExpZGate,
+           ops.BasicGate]:
+    all_defined_decomposition_rules.append(DecompositionRule(op,
+                                 _decompose_controlled_phase,
+                                 _recognize_controlled_phase))
+
+def _recognize_controlled_rotation(cmd):
+    return (isinstance(cmd.gate, (ops.Rx, ops.Ry, xmon_gates.ExpWGate)) and
+            _controlled_matrix(cmd) is not None)
+
+def _decompose_controlled_rotation(cmd):
+    r"""Decompose a controlled rotation about an axis in the xy-plane into an
+    Exp11Gate.
+
+    A rotation about the axis :math:`\cos(\varphi)\sigma_x +
+    \sin(\varphi)\sigma_y` is a rotation about the z-axis in the basis
+    :math:`V = R_z(\varphi) H`. Uses the following decomposition
+
+    ::
+
+        ── C ──        ─────── C ──────
+           |     -->           |
+        ── R ──        ── V† ── Rz ── V ──
+
+    with the decomposition of the controlled Rz into an Exp11Gate, where the
+    basis changes are fused into single qubit xmon gates. Applies to
+    controlled Rx, Ry and ExpWGates.
+    The gates are correct up to a global phase. If :meth:`CORRECT_PHASES` is
+    True, the phase is countered by a projectq phase gate :class:`ops.Ph`.
+    """
+    if isinstance(cmd.gate, ops.Rx):
+        axis = 0.
+    elif isinstance(cmd.gate, ops.Ry):
+        axis = .5
+    else:
+        axis = cmd.gate.axis_half_turns
+    basis = xmon_gates.ExpZGate(half_turns=axis).matrix.dot(
+            np.array([[1, 1], [1, -1]]) / np.sqrt(2))
+    _decompose_controlled(cmd, basis)
+
+for op in [ops.Rx, ops.Ry, xmon_gates.ExpWGate]:
+    all_defined_decomposition_rules.append(DecompositionRule(op,
+                                 _decompose_controlled_rotation,
+                                 _recognize_controlled_rotation))
+
 
 def _recognize_SWAP(cmd):
     if isinstance(cmd.gate, ops.SwapGate):
@@ -280,24 +500,152 @@ def _recognize_SWAP(cmd):
         return False
 
 def _decompose_SWAP(cmd):
-    """
-    TODO
+    r"""Decompose a SWAP gate into three Exp11Gates and single qubit xmon gates.
+
+    A SWAP gate needs three entangling gates. Uses the following
+    decomposition
+
+    ::
+
+        ── x ──     ── W(1/2, 1/2) ── @ ── W(-1/2, 1/2) ── @ ── W(1/2, 1/2) ── @ ── Z(1/2) ──
+           |    -->                   |                    |                   |
+        ── x ──     ── W(1/2, 0) ──── @ ── W(-1/2, 0) ──── @ ── W(1/2, 0) ──── @ ── Z(-1/2) ──
+
+    where W(a, b) is an ExpWGate, Z(a) an ExpZGate and @-@ an Exp11Gate(1).
+    This corresponds to the following map:
+
+    .. math::
+
+        \mathrm{SWAP} \to e^{i\pi/2}\mathrm{SWAP}
+
+    If :meth:`CORRECT_PHASES` is True, the phase is countered by a projectq
+    phase gate :class:`ops.Ph`.
     """
     qb = cmd.qubits
-    xmon_gates.ExpW(.5, .5) | qb[0]
-    xmon_gates.ExpW(.5, 0) | qb[1]
-    # xmon_gates.Exp11Gate(half_turns=1.0) | (cmd.control_qubits[0], qb[0])
+    xmon_gates.ExpWGate(.5, .5) | qb[0]
+    xmon_gates.ExpWGate(.5, 0) | qb[1]
     xmon_gates.Exp11Gate(half_turns=1.0) | (qb[0], qb[1])
-    xmon_gates.ExpW(-.5, .5) | qb[0]
-    xmon_gates.ExpW(-.5, 0) | qb[1]
+    xmon_gates.ExpWGate(-.5, .5) | qb[0]
+    xmon_gates.ExpWGate(-.5, 0) | qb[1]
     xmon_gates.Exp11Gate(half_turns=1.0) | (qb[0], qb[1])
-    # xmon_gates.Exp11Gate(half_turns=1.0) | (cmd.control_qubits[0], qb[0])
-    xmon_gates.ExpW(.5, .5) | qb[0]
-    xmon_gates.ExpW(.5, 0) | qb[1]
+    xmon_gates.ExpWGate(.5, .5) | qb[0]
+    xmon_gates.ExpWGate(.5, 0) | qb[1]
     xmon_gates.Exp11Gate(half_turns=1.0) | (qb[0], qb[1])
-    # xmon_gates.Exp11Gate(half_turns=1.0) | (cmd.control_qubits[0], qb[0])
     xmon_gates.ExpZGate(.5) | qb[0]
     xmon_gates.ExpZGate(-.5) | qb[1]
+    if CORRECT_PHASES:
+        ops.Ph(-np.pi/2) | qb[0]
 
 all_defined_decomposition_rules.append(DecompositionRule(ops.SwapGate,
                              _decompose_SWAP, _recognize_SWAP))
+
+_PAULI_BASES = (np.array([[1, 1], [1, -1]]) / np.sqrt(2),
+                np.array([[1, 1], [1j, -1j]]) / np.sqrt(2),
+                np.eye(2))
+
+def _kak(matrix):
+    import cirq
+    kak = cirq.kak_decomposition(matrix)
+    if isinstance(kak, tuple):
+        # cirq < 0.4 returns a tuple
+        phase, before, coefficients, after = kak
+        return phase, before, coefficients, after
+    return (kak.global_phase, kak.single_qubit_operations_before,
+            kak.interaction_coefficients, kak.single_qubit_operations_after)
+
+def two_qubit_matrix_to_xmon(matrix, tolerance=1e-10):
+    r"""Decompose a two qubit unitary into Exp11Gates and single qubit xmon gates.
+
+    The KAK decomposition writes every two qubit unitary as
+
+    .. math::
+
+        U = e^{i\alpha} (A_1 \otimes A_0)
+            e^{i(x \sigma_x\sigma_x + y \sigma_y\sigma_y + z \sigma_z\sigma_z)}
+            (B_1 \otimes B_0)
+
+    with :math:`\pi/4 \geq x \geq y \geq |z|`. Each nonzero term
+    :math:`e^{ic\sigma\sigma}` is an Exp11Gate(:math:`4c/\pi`) in a rotated
+    basis. Two Exp11Gates with single qubit gates in between never give a
+    nonzero z, and one never gives a nonzero y, so the number of Exp11Gates is
+    minimal. The single qubit gates between two Exp11Gates are fused into an
+    ExpWGate per qubit, the ExpZGates commute with the Exp11Gates and are
+    moved to the end.
+
+    Args:
+        matrix (:class:`numpy.ndarray`): unitary 4x4 matrix in the convention
+            of ProjectQ, i.e., qubit 0 is the least significant bit.
+        tolerance (float): interactions and gates with less than tolerance
+            half turns are treated as identity.
+
+    Returns:
+        tuple: (list of (:class:`xmon_gates.XmonGate`, tuple of int), float)
+        The gates with the indices of their qubits in the order of
+        application and the global phase :math:`\alpha`.
+    """
+    u = np.asarray(matrix, dtype=complex)
+    phase, before, coefficients, after = _kak(u)
+    # The first factor of the kronecker product acts on qubit 1.
+    layers = [[before[1], before[0]]]
+    half_turns = []
+    for basis, c in zip(_PAULI_BASES, coefficients):
+        if abs(4 * c / np.pi) <= tolerance:
+            continue
+        # exp(i c ZZ) = exp(i c) (D x D) Exp11(4 c / pi)
+        d = np.diag([1, np.exp(-2j * c)])
+        for q in range(2):
+            layers[-1][q] = d.dot(np.conj(basis).T).dot(layers[-1][q])
+        layers.append([basis, basis])
+        half_turns.append(4 * c / np.pi)
+        phase *= np.exp(1j * c)
+    layers[-1] = [after[1].dot(layers[-1][0]), after[0].dot(layers[-1][1])]
+    gates = []
+    phase = np.angle(phase)
+    for k, layer in enumerate(layers):
+        for q in range(2):
+            w_gate, z_gate, alpha = single_qubit_matrix_to_xmon(layer[q],
+                                                                tolerance)
+            phase += alpha
+            if w_gate is not None:
+                gates.append((w_gate, (q,)))
+            if z_gate is None:
+                continue
+            if k + 1 < len(layers):
+                layers[k + 1][q] = layers[k + 1][q].dot(z_gate.matrix)
+            else:
+                gates.append((z_gate, (q,)))
+        if k < len(half_turns):
+            gates.append((xmon_gates.Exp11Gate(half_turns=half_turns[k]), (0, 1)))
+    return gates, phase
+
+def _recognize_two_qubit(cmd):
+    if get_control_count(cmd) != 0 or sum(len(qr) for qr in cmd.qubits) != 2:
+        return False
+    try:
+        return np.shape(cmd.gate.matrix) == (4, 4)
+    except (AttributeError, NotImplementedError, TypeError, ValueError):
+        return False
+
+def _decompose_two_qubit(cmd):
+    r"""Decompose a two qubit gate with a matrix into Exp11Gates and single
+    qubit xmon gates.
+
+    Uses :meth:`two_qubit_matrix_to_xmon`, i.e., the minimal number of
+    Exp11Gates: none for products of single qubit gates, one for controlled
+    phases and gates like CNOT, two for gates like iSWAP and three for SWAP,
+    SqrtSwap and in general.
+    Between the Exp11Gates, every qubit gets at most one ExpWGate.
+
+    The gates are correct up to a global phase. If :meth:`CORRECT_PHASES` is
+    True, the phase is countered by a projectq phase gate :class:`ops.Ph`.
+    """
+    qb = [q for qr in cmd.qubits for q in qr]
+    gates, phase = two_qubit_matrix_to_xmon(cmd.gate.matrix)
+    for gate, indices in gates:
+        gate | tuple(qb[i] for i in indices)
+    if CORRECT_PHASES:
+        ops.Ph(phase) | qb[0]
+
+for op in [ops.SqrtSwapGate, ops.BasicGate]:
+    all_defined_decomposition_rules.append(DecompositionRule(op,
+                                 _decompose_two_qubit, _recognize_two_qubit))
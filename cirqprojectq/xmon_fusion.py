@@ -0,0 +1,177 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""Provides a compiler engine that fuses diagonal xmon gates.
+
+:class:`cirqprojectq.xmon_gates.ExpZGate` and
+:class:`cirqprojectq.xmon_gates.Exp11Gate` are diagonal. The
+:class:`DiagonalFusion` engine collects every stretch of such gates into a
+single :class:`DiagonalGate` with the precomputed phases of all basis states of
+the touched qubits. Other gates on different qubits commute with the stretch
+and are passed on; a gate on a touched qubit ends the stretch.
+
+::
+
+    ── Z(a) ── @ ──────────            ── ┌──────┐ ── W(c) ──
+               |             -->          │ Diag │
+    ────────── @ ── Z(b) ──            ── └──────┘ ──────────
+    ── W(c) ───────────────
+
+The :class:`cirqprojectq.xmon_simulator.XmonSimulator` applies a diagonal gate
+as a single elementwise multiplication of the state vector. The engine is meant
+for simulation, the CIRQ backend doesn't translate diagonal gates.
+"""
+import numpy as np
+from projectq import ops
+from projectq.cengines import BasicEngine
+from projectq.meta import get_control_count
+from . import xmon_gates
+
+class DiagonalGate(ops.BasicGate):
+    r"""
+    A diagonal gate given by the phases of the basis states.
+
+    The k-th qubit of the gate is the k-th least significant bit of the index
+    of the phases.
+
+    Args:
+        phases (numpy.ndarray): diagonal of the gate matrix, of length
+            :math:`2^n` for n qubits.
+    """
+    def __init__(self, phases):
+        ops.BasicGate.__init__(self)
+        self._phases = np.array(phases, dtype=complex)
+        self._phases.flags.writeable = False
+
+    @property
+    def phases(self):
+        r"""numpy.ndarray: the diagonal of the gate matrix (read only)."""
+        return self._phases
+
+    @property
+    def num_qubits(self):
+        r"""int: number of qubits."""
+        return len(self._phases).bit_length() - 1
+
+    @property
+    def matrix(self):
+        r"""numpy.ndarray: the gate matrix."""
+        return np.diag(self._phases)
+
+    def get_inverse(self):
+        return DiagonalGate(self._phases.conj())
+
+    def __eq__(self, other):
+        return (isinstance(other, DiagonalGate) and
+                other._phases.shape == self._phases.shape and
+                np.allclose(self._phases, other._phases,
+                            rtol=xmon_gates.RTOL, atol=xmon_gates.ATOL))
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __str__(self):
+        return "Diag({})".format(self.num_qubits)
+
+    def __hash__(self):
+        return hash(str(self))
+
+def _is_diagonal(cmd):
+    return (isinstance(cmd.gate, (xmon_gates.ExpZGate, xmon_gates.Exp11Gate)) and
+            not cmd.gate.is_parameterized and get_control_count(cmd) == 0 and
+            len(cmd.tags) == 0)
+
+class DiagonalFusion(BasicEngine):
+    r"""
+    Fuses stretches of diagonal xmon gates into :class:`DiagonalGate` s.
+
+    Stretches with a single gate are passed on unchanged.
+
+    Args:
+        max_qubits (int): maximal number of qubits of a fused gate. A stretch
+            ends before a gate that would exceed it.
+    """
+    def __init__(self, max_qubits=10):
+        BasicEngine.__init__(self)
+        self.max_qubits = max_qubits
+        self._stretch = []
+        self._qubits = dict()
+        self._passed = set()
+        self._fused_gates = 0
+        self._diagonal_gates = 0
+
+    @property
+    def fusion_counts(self):
+        r"""
+        dict: number of xmon gates fused ('fused') into diagonal gates
+        ('diagonal').
+        """
+        return {'fused': self._fused_gates, 'diagonal': self._diagonal_gates}
+
+    def _phases(self):
+        r"""Phases of the basis states of the qubits of the stretch."""
+        positions = {qb_id: k for k, qb_id in enumerate(self._qubits)}
+        index = np.arange(1 << len(positions))
+        phases = np.ones(len(index), dtype=complex)
+        for cmd in self._stretch:
+            bits = [(index >> positions[qb.id]) & 1 for qr in cmd.qubits for qb in qr]
+            if isinstance(cmd.gate, xmon_gates.ExpZGate):
+                phases *= np.diag(cmd.gate.matrix)[bits[0]]
+            else:
+                phases[(bits[0] & bits[1]).astype(bool)] *= cmd.gate.matrix[3, 3]
+        return phases
+
+    def _emit(self):
+        r"""Send the pending stretch."""
+        if len(self._stretch) == 1:
+            self.send(self._stretch)
+        elif self._stretch:
+            self._fused_gates += len(self._stretch)
+            self._diagonal_gates += 1
+            qubits = list(self._qubits.values())
+            self.send([ops.Command(self, DiagonalGate(self._phases()), (qubits,))])
+        self._stretch = []
+        self._qubits = dict()
+        self._passed = set()
+
+    def _store(self, cmd):
+        qubits = [qb for qr in cmd.all_qubits for qb in qr]
+        if _is_diagonal(cmd):
+            new = [qb for qb in qubits if qb.id not in self._qubits]
+            if (any(qb.id in self._passed for qb in qubits) or
+                    len(self._qubits) + len(new) > self.max_qubits):
+                self._emit()
+                new = qubits
+            self._stretch.append(cmd)
+            for qb in new:
+                self._qubits[qb.id] = qb
+            return
+        if (isinstance(cmd.gate, ops.FlushGate) or
+                any(qb.id in self._qubits for qb in qubits)):
+            self._emit()
+        else:
+            # Passed on before the stretch, later gates on these qubits
+            # can't join the stretch.
+            self._passed.update(qb.id for qb in qubits)
+        self.send([cmd])
+
+    def receive(self, command_list):
+        r"""
+        Receive a list of commands, fuse diagonal gates and forward them.
+
+        Args:
+            command_list (list<Command>): List of commands to receive.
+        """
+        for cmd in command_list:
+            self._store(cmd)
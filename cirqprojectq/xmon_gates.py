@@ -20,25 +20,82 @@ In the cirq framework xmon specific gates are defined.
 This file ports these gates to projectq and allows imulation
 of algorithms with xmon qubits. 
 """
-from projectq.ops import BasicGate, BasicPhaseGate, H, Rx, Rz, NotMergeable
+from projectq.ops import BasicGate, BasicPhaseGate, H, Rx, Rz, NotMergeable, NotInvertible
 import numpy as np
 import cmath
 from cirq import value
 RTOL = 1e-10
 ATOL = 1e-12
-#TODO: implement merge and inverse for all gates
+DECIMALS = 10
+
+def _canonical(half_turns, period=2):
+    r"""
+    Round half turns to :data:`DECIMALS` digits in the range
+    (-period / 2, period / 2].
+
+    Symbols are returned unchanged.
+    """
+    if isinstance(half_turns, value.Symbol):
+        return half_turns
+    half_turns = round(half_turns, DECIMALS)
+    if half_turns == -period / 2:
+        return period / 2
+    return half_turns + 0.
+
+def _round(half_turns):
+    r"""Half turns rounded to two digits for printing, or the symbol name."""
+    if isinstance(half_turns, value.Symbol):
+        return half_turns
+    return np.round(half_turns, 2)
+
+def _canonical_array(half_turns, period=2):
+    r"""
+    Vectorized :func:`cirq.value.canonicalize_half_turns` into
+    (-period / 2, period / 2].
+    """
+    half_turns = np.asarray(half_turns, dtype=float) % period
+    return np.where(half_turns > period / 2, half_turns - period, half_turns)
+
+def _diagonal_matrices(diagonals):
+    r"""Stack of diagonal matrices from a stack of diagonals."""
+    n = diagonals.shape[-1]
+    matrices = np.zeros(diagonals.shape + (n,), dtype=diagonals.dtype)
+    matrices[..., range(n), range(n)] = diagonals
+    return matrices
+
+def _read_only(matrix):
+    matrix.flags.writeable = False
+    return matrix
 
 class XmonGate(BasicGate):
     def __init__(self):
         r"""
         Abstract XmonGate class to distinguish mon from regular proejctq gates.
+
+        Xmon gates are immutable. Two xmon gates are equal if they are of the
+        same class and their canonical parameters, rounded to :data:`DECIMALS`
+        digits, agree. Thus, xmon gates can be used as dictionary keys and set
+        members.
+
+        Parameters can be :class:`cirq.Symbol` instances in units of half
+        turns. Such parametrized gates have no matrix, inverse or merged gate,
+        but are translated to parametrized cirq gates, which can be resolved
+        with a :class:`cirq.ParamResolver`.
         """
         BasicGate.__init__(self)
+        self._matrix = None
+        self._key = ()
 
     def __eq__(self, other):
-        r""" 
-        Modification of ProjectQ (2017 ProjectQ-Framework (www.projectq.ch)) equality operator to deal with the transition to np.ndarray
+        r"""
+        Compare xmon gates by their canonical parameters.
+
+        Other gates are compared by their matrices as a modification of
+        ProjectQ (2017 ProjectQ-Framework (www.projectq.ch)) equality operator
+        to deal with the transition to np.ndarray
         """
+        if isinstance(other, XmonGate):
+            return self.__class__ is other.__class__ and self._key == other._key
         if hasattr(self, 'matrix'):
             if not hasattr(other, 'matrix'):
                 return False
@@ -61,6 +118,22 @@ class XmonGate(BasicGate):
         else:
             return isinstance(other, self.__class__)
 
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    @property
+    def is_parameterized(self):
+        r"""bool: True if a parameter of the gate is a :class:`cirq.Symbol`."""
+        return any(isinstance(p, value.Symbol) for p in self._key)
+
+    def _check_not_parameterized(self):
+        if self.is_parameterized:
+            raise AttributeError("{} has symbolic parameters and no matrix."
+                                 .format(self))
+
+    def __hash__(self):
+        return hash((self.__class__.__name__, self._key))
+
 class Exp11Gate(XmonGate):
     r"""A two-qubit interaction that phases the amplitude of the 11 state.
 
@@ -94,7 +167,9 @@ class Exp11Gate(XmonGate):
     """
     def __init__(self, half_turns):
         XmonGate.__init__(self)
-        self.half_turns = half_turns
+        self._half_turns = value.chosen_angle_to_canonical_half_turns(
+                half_turns=half_turns, rads=None, degs=None)
+        self._key = (_canonical(self._half_turns),)
         self.interchangeable_qubit_indices = [[0, 1]]
 
     @property
@@ -107,12 +182,6 @@ class Exp11Gate(XmonGate):
         r"""Rotation angle in half turns, :math:`\in(-1, 1]`"""
         return self._half_turns
 
-    @half_turns.setter
-    def half_turns(self, half_turns):
-        self._half_turns = value.chosen_angle_to_canonical_half_turns(half_turns=half_turns,
-                                                                      rads=None,
-                                                                      degs=None)
-
     @property
     def matrix(self):
         r"""Gate matrix.
@@ -128,11 +197,50 @@ class Exp11Gate(XmonGate):
             0 & 0 & 0 & \exp(i\varphi \pi)
             \end{pmatrix}
 
+        Raises:
+            AttributeError: if the gate is parametrized.
+        """
+        if self._matrix is None:
+            self._check_not_parameterized()
+            self._matrix = _read_only(np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0],
+                                                [0, 0, 0, cmath.exp(1.0j * self.angle)]]))
+        return self._matrix
+
+    @classmethod
+    def diagonals(cls, half_turns):
+        r"""Diagonals of the matrices of many gates.
+
+        Equivalent to ``[np.diag(Exp11Gate(h).matrix) for h in half_turns]``
+        computed in a single vectorized call.
+
+        Args:
+            half_turns (array_like): angles of rotation in units of
+                :math:`\pi`, shape (N,).
+
+        Returns:
+            numpy.ndarray: complex array of shape (N, 4).
+        """
+        angles = _canonical_array(half_turns) * cmath.pi
+        diagonals = np.ones(angles.shape + (4,), dtype=complex)
+        diagonals[..., 3] = np.exp(1.0j * angles)
+        return diagonals
+
+    @classmethod
+    def matrices(cls, half_turns):
+        r"""Matrices of many gates.
+
+        Args:
+            half_turns (array_like): angles of rotation in units of
+                :math:`\pi`, shape (N,).
+
+        Returns:
+            numpy.ndarray: complex array of shape (N, 4, 4).
         """
-        return np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0],
-                          [0, 0, 0, cmath.exp(1.0j * self.angle)]])
+        return _diagonal_matrices(cls.diagonals(half_turns))
 
     def __str__(self):
+        if self.is_parameterized:
+            return "@({})".format(self.half_turns)
         return "@({})".format(np.round(self.angle, 2))
 
     def tex_str(self):
@@ -143,7 +251,40 @@ class Exp11Gate(XmonGate):
 
             [CLASSNAME]$_[ANGLE]$
         """
-        return "@$_{{{}}}$".format(np.round(self.angle / np.pi, 2))
+        return "@$_{{{}}}$".format(_round(self.half_turns))
+
+    def get_inverse(self):
+        r"""
+        Return the inverse gate :math:`\mathrm{Exp11}(-\varphi)`.
+
+        As a full turn is the identity, the inverse is exact.
+
+        Raises:
+            NotInvertible: if the gate is parametrized.
+        """
+        if self.is_parameterized:
+            raise NotInvertible("Symbolic gates can't be inverted.")
+        return self.__class__(-self.half_turns)
+
+    def get_merged(self, other):
+        r"""
+        Return self merged with another Exp11Gate.
+
+        Half turns are added. As a full turn is the identity, the merged gate
+        is exact.
+
+        Args:
+            other: Exp11Gate.
+        Raises:
+            NotMergeable: For other gates or parametrized gates.
+        Returns:
+            New object representing the merged gates.
+        """
+        if isinstance(other, self.__class__):
+            if self.is_parameterized or other.is_parameterized:
+                raise NotMergeable("Can't merge symbolic gates.")
+            return self.__class__(self.half_turns + other.half_turns)
+        raise NotMergeable("Can't merge different types of gates.")
 
 class ExpWGate(XmonGate):
     r"""A rotation around an axis in the XY plane of the Bloch sphere.
@@ -214,16 +355,28 @@ class ExpWGate(XmonGate):
     """
     def __init__(self, half_turns, axis_half_turns=0):
         XmonGate.__init__(self)
-        self.half_turns = half_turns
-        self.axis_half_turns = axis_half_turns
-        if (not isinstance(self.axis_half_turns, value.Symbol) and
-                not 0 <= self.axis_half_turns < 1):
+        half_turns = value.chosen_angle_to_canonical_half_turns(
+                half_turns=half_turns, rads=None, degs=None)
+        axis_half_turns = value.chosen_angle_to_canonical_half_turns(
+                half_turns=axis_half_turns, rads=None, degs=None)
+        if isinstance(half_turns, value.Symbol):
+            # A symbol can't be negated, keep the axis in (-1, 1].
+            pass
+        elif (not isinstance(axis_half_turns, value.Symbol) and
+                not 0 <= axis_half_turns < 1):
             # The following code is taken from google to follow the same conventions.
             # I'm not sure if this is correct as it seems to give different matrices.
             # Canonicalize to negative rotation around positive axis.
-            self.half_turns = value.canonicalize_half_turns(-self.half_turns)
-            self.axis_half_turns = value.canonicalize_half_turns(
-                self.axis_half_turns + 1)
+            half_turns = value.canonicalize_half_turns(-half_turns)
+            axis_half_turns = value.canonicalize_half_turns(axis_half_turns + 1)
+        self._half_turns = half_turns
+        self._axis_half_turns = axis_half_turns
+        key_half_turns = _canonical(half_turns)
+        if key_half_turns == 0:
+            # The axis of the identity is irrelevant.
+            self._key = (key_half_turns, 0.)
+        else:
+            self._key = (key_half_turns, _canonical(axis_half_turns))
 
     @property
     def axis_angle(self):
@@ -235,13 +388,6 @@ class ExpWGate(XmonGate):
         r"""Axis angle in half turns, :math:`\in(-1, 1]`"""
         return self._axis_half_turns
 
-    @axis_half_turns.setter
-    def axis_half_turns(self, half_turns):
-        val = value.chosen_angle_to_canonical_half_turns(half_turns=half_turns,
-                                                         rads=None,
-                                                         degs=None)
-        self._axis_half_turns = val
-
     @property
     def angle(self):
         r"""Rotation angle in rad, :math:`\in(-\pi, \pi]`"""
@@ -252,13 +398,6 @@ class ExpWGate(XmonGate):
         r"""Rotation angle in half turns, :math:`\in(-1, 1]`"""
         return self._half_turns
 
-    @half_turns.setter
-    def half_turns(self, half_turns):
-        val = value.chosen_angle_to_canonical_half_turns(half_turns=half_turns,
-                                                         rads=None,
-                                                         degs=None)
-        self._half_turns = val
-
     @property
     def matrix(self):
         r"""Rotation matrix.
@@ -273,25 +412,109 @@ class ExpWGate(XmonGate):
             -i \sin(\varphi \pi / 2) \exp(i \theta \pi) & \cos(\varphi \pi / 2)
             \end{pmatrix}
 
+        Raises:
+            AttributeError: if the gate is parametrized.
         """
-        W = np.exp(-1.0j * self.axis_angle)
-        c = np.cos(self.angle / 2)
-        s = np.sin(self.angle / 2)
-        rot = np.array([[c, -1.0j * s * W],
-                         [-1.0j * s * np.conj(W), c]])
-        return np.exp(.5j * self.angle) * rot
+        if self._matrix is None:
+            self._check_not_parameterized()
+            W = np.exp(-1.0j * self.axis_angle)
+            c = np.cos(self.angle / 2)
+            s = np.sin(self.angle / 2)
+            rot = np.array([[c, -1.0j * s * W],
+                             [-1.0j * s * np.conj(W), c]])
+            self._matrix = _read_only(np.exp(.5j * self.angle) * rot)
+        return self._matrix
         # phase = np.array([[1., 0],
         #                    [0, cmath.exp(1.0j * self.axis_angle)]])
         # c = cmath.exp(1j * self.angle)
         # rot = np.array([[1 + c, 1 - c], [1 - c, 1 + c]]) / 2
         # return phase.dot(rot).dot(np.conj(phase))
 
+    @classmethod
+    def matrices(cls, half_turns, axis_half_turns=0):
+        r"""Matrices of many gates.
+
+        Equivalent to ``[ExpWGate(h, a).matrix for h, a in zip(half_turns,
+        axis_half_turns)]`` computed in a single vectorized call, including
+        the canonicalization of negative axes.
+
+        Args:
+            half_turns (array_like): angles of rotation in units of
+                :math:`\pi`, shape (N,).
+            axis_half_turns (array_like): axes in units of :math:`\pi`,
+                broadcast against half_turns.
+
+        Returns:
+            numpy.ndarray: complex array of shape (N, 2, 2).
+        """
+        half_turns, axis_half_turns = np.broadcast_arrays(
+                _canonical_array(half_turns), _canonical_array(axis_half_turns))
+        flip = (axis_half_turns < 0) | (axis_half_turns >= 1)
+        half_turns = np.where(flip, _canonical_array(-half_turns), half_turns)
+        axis_half_turns = np.where(flip, _canonical_array(axis_half_turns + 1),
+                                   axis_half_turns)
+        angles = half_turns * cmath.pi
+        W = np.exp(-1.0j * axis_half_turns * cmath.pi)
+        c = np.cos(angles / 2)
+        s = np.sin(angles / 2)
+        phase = np.exp(.5j * angles)
+        matrices = np.empty(angles.shape + (2, 2), dtype=complex)
+        matrices[..., 0, 0] = phase * c
+        matrices[..., 0, 1] = phase * (-1.0j * s * W)
+        matrices[..., 1, 0] = phase * (-1.0j * s * np.conj(W))
+        matrices[..., 1, 1] = phase * c
+        return matrices
+
     def __str__(self):
-        return "W({}, {})".format(np.round(self.angle/np.pi,2), np.round(self.axis_angle/np.pi, 2))
+        return "W({}, {})".format(_round(self.half_turns), _round(self.axis_half_turns))
 
     def tex_str(self):
-        return "W$_{{{}, {}}}$".format(np.round(self.angle/np.pi, 2),
-                   np.round(self.axis_angle/np.pi, 2))
+        return "W$_{{{}, {}}}$".format(_round(self.half_turns),
+                   _round(self.axis_half_turns))
+
+    def get_inverse(self):
+        r"""
+        Return the inverse gate :math:`\mathrm{ExpW}(-\varphi, \theta)`.
+
+        The gate is a phase gate in the basis of the W-axis, i.e., two full
+        turns are the identity including the global phase, and the inverse is
+        exact.
+
+        Raises:
+            NotInvertible: if the gate is parametrized.
+        """
+        if self.is_parameterized:
+            raise NotInvertible("Symbolic gates can't be inverted.")
+        return self.__class__(-self.half_turns, self.axis_half_turns)
+
+    def get_merged(self, other):
+        r"""
+        Return self merged with another ExpWGate around the same axis.
+
+        Half turns are added. The merged gate is exact including the global
+        phase. A gate with zero half turns is the identity and merges with any
+        ExpWGate.
+
+        Args:
+            other: ExpWGate.
+        Raises:
+            NotMergeable: For other gates, ExpWGates around a different axis
+                or parametrized gates.
+        Returns:
+            New object representing the merged gates.
+        """
+        if isinstance(other, self.__class__):
+            if self._key[0] == 0:
+                return other
+            if other._key[0] == 0:
+                return self
+            if self.is_parameterized or other.is_parameterized:
+                raise NotMergeable("Can't merge symbolic gates.")
+            if self._key[1] == other._key[1]:
+                return self.__class__(self.half_turns + other.half_turns,
+                                      self.axis_half_turns)
+            raise NotMergeable("Can't merge ExpW gates around different axes.")
+        raise NotMergeable("Can't merge different types of gates.")
 
 # class ExpZGate(Rz, XmonGate):
 class ExpZGate(XmonGate):
@@ -316,14 +539,12 @@ class ExpZGate(XmonGate):
     on the Bloch sphere. Two half_turns correspond to a rotation in the
     bloch sphere of 360 degrees.
 
-    Half_turns are mapped to the range (-1, 1], i.e. to rotation angles
-    in the range (-pi, pi].
-
-    Note:
-        Restricting half_turns to the rage (-1, 1] corresponds to the full range (0, 2pi]
-        for the phase difference between the Z eigenstates. However, we loose the global phase
-        that comes with a full rotation gate in the range (0, 4pi]. Thus, the ExpZ gate is more
-        like a phase then a rotation gate.
+    Half_turns are mapped to the range (-2, 2], i.e. to rotation angles
+    in the range (-2pi, 2pi]. The matrix has the period of four half turns,
+    so the mapping keeps the matrix, including its global phase. This is
+    the convention of the cirq translation, a
+    :class:`cirq.ZPowGate` with global shift -1/2, such that parametrized
+    gates resolve to the same gates as numeric ones.
 
     Args:
         half_turns (float): number of half turns on the Bloch sphere.
@@ -332,23 +553,21 @@ class ExpZGate(XmonGate):
     def __init__(self, half_turns):
         # Rz.__init__(self, half_turns * cmath.pi)
         XmonGate.__init__(self)
-        self.half_turns = half_turns
+        if not isinstance(half_turns, value.Symbol):
+            half_turns = float(_canonical_array(half_turns, 4))
+        self._half_turns = half_turns
+        self._key = (_canonical(self._half_turns, 4),)
 
     @property
     def angle(self):
-        r"""Rotation angle in rad, :math:`\in(-\pi, \pi]`"""
+        r"""Rotation angle in rad, :math:`\in(-2\pi, 2\pi]`"""
         return self.half_turns * cmath.pi
 
     @property
     def half_turns(self):
-        r"""Rotation angle in half turns, :math:`\in(-1, 1]`"""
+        r"""Rotation angle in half turns, :math:`\in(-2, 2]`"""
         return self._half_turns
 
-    @half_turns.setter
-    def half_turns(self, half_turns):
-        self._half_turns = value.chosen_angle_to_canonical_half_turns(half_turns=half_turns,
-                                                                      rads = None,
-                                                                      degs=None)
     @property
     def matrix(self):
         r"""Rotation matrix.
@@ -361,36 +580,97 @@ class ExpZGate(XmonGate):
             \cos(\varphi\pi / 2) - i \sin(\varphi \pi / 2) & 0\\
             0 & \cos(\varphi\pi / 2) + i \sin(\varphi \pi / 2)
             \end{pmatrix}
+
+        Raises:
+            AttributeError: if the gate is parametrized.
+        """
+        if self._matrix is None:
+            self._check_not_parameterized()
+            self._matrix = _read_only(np.array(
+                    [[np.cos(self.angle / 2) - 1.0j * np.sin(self.angle / 2), 0],
+                     [0, np.cos(self.angle / 2) + 1.0j * np.sin(self.angle / 2)]]))
+        return self._matrix
+
+    @classmethod
+    def diagonals(cls, half_turns):
+        r"""Diagonals of the matrices of many gates.
+
+        Equivalent to ``[np.diag(ExpZGate(h).matrix) for h in half_turns]``
+        computed in a single vectorized call.
+
+        Args:
+            half_turns (array_like): angles of rotation in units of
+                :math:`\pi`, shape (N,).
+
+        Returns:
+            numpy.ndarray: complex array of shape (N, 2).
+        """
+        angles = _canonical_array(half_turns, 4) * cmath.pi
+        c = np.cos(angles / 2)
+        s = np.sin(angles / 2)
+        return np.stack([c - 1.0j * s, c + 1.0j * s], axis=-1)
+
+    @classmethod
+    def matrices(cls, half_turns):
+        r"""Matrices of many gates.
+
+        Args:
+            half_turns (array_like): angles of rotation in units of
+                :math:`\pi`, shape (N,).
+
+        Returns:
+            numpy.ndarray: complex array of shape (N, 2, 2).
         """
-        return np.array([[np.cos(self.angle / 2) - 1.0j * np.sin(self.angle / 2), 0],
-                          [0, np.cos(self.angle / 2) + 1.0j * np.sin(self.angle / 2)]])
+        return _diagonal_matrices(cls.diagonals(half_turns))
 
     def __str__(self):
-        return "Z({})".format(np.round(self.angle / np.pi,2))
+        return "Z({})".format(_round(self.half_turns))
 
     def tex_str(self):
         r"""Latex representation of the gate."""
-        return "Z$_{{{}}}$".format(np.round(self.angle / np.pi,2))
+        return "Z$_{{{}}}$".format(_round(self.half_turns))
+
+    def get_inverse(self):
+        r"""
+        Return the inverse gate :math:`\mathrm{ExpZ}(-\varphi)`.
+
+        Raises:
+            NotInvertible: if the gate is parametrized.
+        """
+        if self.is_parameterized:
+            raise NotInvertible("Symbolic gates can't be inverted.")
+        return self.__class__(-self.half_turns)
 
     def get_merged(self, other):
         """
         Return self merged with another gate.
         Default implementation handles rotation gate of the same type, where
         angles are simply added.
+
         Args:
             other: Rotation gate of same type.
         Raises:
-            NotMergeable: For non-rotation gates or rotation gates of
-                different type.
+            NotMergeable: For non-rotation gates, rotation gates of
+                different type or parametrized gates.
         Returns:
             New object representing the merged gates.
         """
         if isinstance(other, self.__class__):
+            if self.is_parameterized or other.is_parameterized:
+                raise NotMergeable("Can't merge symbolic gates.")
             return self.__class__((self.angle + other.angle) / cmath.pi)
         raise NotMergeable("Can't merge different types of rotation gates.")
 
-from projectq.backends._circuits._to_latex import get_default_settings
 def drawer_settings():
+    r"""
+    Settings of the ProjectQ circuit drawer with the sizes of the xmon gates.
+
+    The drawer is only imported when the settings are requested.
+
+    Returns:
+        dict: settings for :class:`projectq.backends.CircuitDrawer`.
+    """
+    from projectq.backends._circuits._to_latex import get_default_settings
     xmon_settings = get_default_settings()
     xmon_settings['gate_shadow'] = False
     xmon_settings['gates']['ExpWGate'] = {'height': 0.8, 'offset': 0.3,
@@ -0,0 +1,130 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""Provides a peephole optimizer for xmon gates.
+
+The :class:`XmonOptimizer` fuses every run of single qubit xmon gates into at
+most one :class:`cirqprojectq.xmon_gates.ExpWGate` followed by one
+:class:`cirqprojectq.xmon_gates.ExpZGate`. Since ExpZ gates are diagonal they
+commute with :class:`cirqprojectq.xmon_gates.Exp11Gate`. The optimizer keeps
+them pending and merges them into the axis of the next ExpW gate (virtual Z),
+and drops them before measurements.
+
+::
+
+    ── W(a, b) ── Z(c) ── @ ── W(d, e) ──       ── W(a, b) ── @ ── W(d, e - c) ── Z(c) ──
+                          |                -->                |
+    ───────────────────── @ ─────────────       ───────────── @ ────────────────────────
+
+Note:
+    The optimized circuit is correct up to global phases. Parametrized gates
+    are not fused and passed on unchanged.
+
+The optimizer can be added to the engine list with
+:meth:`cirqprojectq.xmon_setup.xmon_engines(optimize=True)`.
+"""
+import numpy as np
+from projectq import ops
+from projectq.cengines import BasicEngine
+from projectq.meta import get_control_count
+from . import xmon_gates
+from .xmon_decompositions import single_qubit_matrix_to_xmon
+
+class XmonOptimizer(BasicEngine):
+    r"""
+    Peephole optimizer for xmon gates.
+
+    Args:
+        eject_z (bool): If True, ExpZ gates are moved through Exp11 gates into
+            later ExpW gates and dropped before measurements. Otherwise, the
+            fused single qubit gates are sent before every Exp11 gate.
+    """
+    def __init__(self, eject_z=True):
+        BasicEngine.__init__(self)
+        self.eject_z = eject_z
+        self._pending = dict()
+        self._received_gates = 0
+        self._sent_gates = 0
+
+    @property
+    def gate_counts(self):
+        r"""
+        dict: number of xmon gates received ('in') and sent ('out').
+        """
+        return {'in': self._received_gates, 'out': self._sent_gates}
+
+    def _send_gate(self, gate, qubit):
+        self._sent_gates += 1
+        self.send([ops.Command(self, gate, ([qubit],))])
+
+    def _emit(self, qb_id, keep_z=False, drop_z=False):
+        r"""
+        Send the fused single qubit gates pending on a qubit.
+
+        Args:
+            qb_id (int): id of the qubit.
+            keep_z (bool): keep the ExpZ part pending.
+            drop_z (bool): drop the ExpZ part.
+        """
+        if qb_id not in self._pending:
+            return
+        matrix, qubit = self._pending.pop(qb_id)
+        w_gate, z_gate, _ = single_qubit_matrix_to_xmon(matrix)
+        if w_gate is not None:
+            self._send_gate(w_gate, qubit)
+        if z_gate is not None:
+            if keep_z:
+                self._pending[qb_id] = (z_gate.matrix, qubit)
+            elif not drop_z:
+                self._send_gate(z_gate, qubit)
+
+    def _is_plain(self, cmd):
+        return get_control_count(cmd) == 0 and len(cmd.tags) == 0
+
+    def _store(self, cmd):
+        gate = cmd.gate
+        if (isinstance(gate, (xmon_gates.ExpWGate, xmon_gates.ExpZGate))
+                and self._is_plain(cmd) and not gate.is_parameterized):
+            self._received_gates += 1
+            qubit = cmd.qubits[0][0]
+            matrix, _ = self._pending.get(qubit.id, (np.eye(2), qubit))
+            self._pending[qubit.id] = (gate.matrix.dot(matrix), qubit)
+            return
+        qubit_ids = [qb.id for qr in cmd.all_qubits for qb in qr]
+        if isinstance(gate, xmon_gates.XmonGate):
+            self._received_gates += 1
+            self._sent_gates += 1
+        if isinstance(gate, xmon_gates.Exp11Gate) and self._is_plain(cmd):
+            for qb_id in qubit_ids:
+                self._emit(qb_id, keep_z=self.eject_z)
+        elif isinstance(gate, ops.MeasureGate):
+            for qb_id in qubit_ids:
+                self._emit(qb_id, drop_z=self.eject_z)
+        elif isinstance(gate, ops.FlushGate):
+            for qb_id in list(self._pending):
+                self._emit(qb_id)
+        else:
+            for qb_id in qubit_ids:
+                self._emit(qb_id)
+        self.send([cmd])
+
+    def receive(self, command_list):
+        r"""
+        Receive a list of commands, optimize and forward them.
+
+        Args:
+            command_list (list<Command>): List of commands to receive.
+        """
+        for cmd in command_list:
+            self._store(cmd)
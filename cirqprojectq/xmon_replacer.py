@@ -0,0 +1,122 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""Provides a replacer that maps common gates directly to xmon gate templates.
+
+Rotation gates (Rx, Ry, Rz), Pauli gates (X, Y, Z), the Hadamard gate, CNOT
+and SWAP gates always decompose into the same sequences of xmon gates, see
+:mod:`cirqprojectq.xmon_decompositions`. The :class:`XmonTemplateReplacer`
+sends these sequences directly instead of searching the decomposition rules
+and running the decomposition functions. All other commands are handled as by
+:class:`projectq.cengines.AutoReplacer`.
+
+Note:
+    The templates produce the same gates as the decomposition rules with
+    :data:`cirqprojectq.xmon_decompositions.CORRECT_PHASES` set to False.
+    If CORRECT_PHASES is True, the decomposition rules are used.
+"""
+import numpy as np
+from projectq import ops
+from projectq.cengines import AutoReplacer
+from projectq.meta import get_control_count
+from . import xmon_gates, xmon_decompositions
+
+_H = (xmon_gates.ExpWGate(half_turns=-.5, axis_half_turns=.5),
+      xmon_gates.ExpZGate(half_turns=1.))
+
+_SINGLE_QUBIT_TEMPLATES = {
+        ops.XGate: (xmon_gates.ExpWGate(half_turns=1.0, axis_half_turns=0),),
+        ops.YGate: (xmon_gates.ExpWGate(half_turns=1.0, axis_half_turns=0.5),),
+        ops.ZGate: (xmon_gates.ExpZGate(1.0),),
+        ops.HGate: _H}
+
+_ROTATION_TEMPLATES = {
+        ops.Rx: lambda angle: (xmon_gates.ExpWGate(half_turns=angle / np.pi,
+                                                   axis_half_turns=0),),
+        ops.Ry: lambda angle: (xmon_gates.ExpWGate(half_turns=angle / np.pi,
+                                                   axis_half_turns=0.5),),
+        ops.Rz: lambda angle: (xmon_gates.ExpZGate(angle / np.pi),)}
+
+_CNOT_TEMPLATE = tuple((gate, (1,)) for gate in _H)\
+                 + ((xmon_gates.Exp11Gate(half_turns=1.0), (0, 1)),)\
+                 + tuple((gate, (1,)) for gate in _H)
+
+_SWAP_TEMPLATE = ((xmon_gates.ExpWGate(.5, .5), (0,)),
+                  (xmon_gates.ExpWGate(.5, 0), (1,)),
+                  (xmon_gates.Exp11Gate(half_turns=1.0), (0, 1)),
+                  (xmon_gates.ExpWGate(-.5, .5), (0,)),
+                  (xmon_gates.ExpWGate(-.5, 0), (1,)),
+                  (xmon_gates.Exp11Gate(half_turns=1.0), (0, 1)),
+                  (xmon_gates.ExpWGate(.5, .5), (0,)),
+                  (xmon_gates.ExpWGate(.5, 0), (1,)),
+                  (xmon_gates.Exp11Gate(half_turns=1.0), (0, 1)),
+                  (xmon_gates.ExpZGate(.5), (0,)),
+                  (xmon_gates.ExpZGate(-.5), (1,)))
+
+def get_template(cmd):
+    r"""
+    Xmon gate template for a command.
+
+    Args:
+        cmd (:class:`projectq.ops.Command`): a projectq command instance
+
+    Returns:
+        list of (:class:`cirqprojectq.xmon_gates.XmonGate`, list of qubits) or
+        None if no template applies.
+    """
+    gate_class = type(cmd.gate)
+    controls = get_control_count(cmd)
+    if controls == 0:
+        if gate_class in _SINGLE_QUBIT_TEMPLATES:
+            gates = _SINGLE_QUBIT_TEMPLATES[gate_class]
+        elif gate_class in _ROTATION_TEMPLATES:
+            gates = _ROTATION_TEMPLATES[gate_class](cmd.gate.angle)
+        elif gate_class is ops.SwapGate:
+            qubits = (cmd.qubits[0][0], cmd.qubits[1][0])
+            return [(gate, [qubits[i] for i in pos]) for gate, pos in _SWAP_TEMPLATE]
+        else:
+            return None
+        return [(gate, cmd.qubits[0]) for gate in gates]
+    if controls == 1 and gate_class is ops.XGate:
+        qubits = (cmd.control_qubits[0], cmd.qubits[0][0])
+        return [(gate, [qubits[i] for i in pos]) for gate, pos in _CNOT_TEMPLATE]
+    return None
+
+class XmonTemplateReplacer(AutoReplacer):
+    r"""
+    AutoReplacer that replaces common gates by precomputed xmon gate templates.
+
+    Commands without template are decomposed with the decomposition rule set.
+
+    Args:
+        decompositionRuleSet (:class:`projectq.cengines.DecompositionRuleSet`):
+            decomposition rules for all other gates.
+        decomposition_chooser (function): see
+            :class:`projectq.cengines.AutoReplacer`.
+    """
+    def _process_command(self, cmd):
+        r"""
+        Send the xmon gate template of a command or decompose it.
+
+        Args:
+            cmd (Command): Command to process.
+        """
+        if not xmon_decompositions.CORRECT_PHASES and not self.is_available(cmd):
+            template = get_template(cmd)
+            if template is not None:
+                self.send([ops.Command(self.main_engine, gate,
+                                       tuple([qb] for qb in qubits), tags=cmd.tags)
+                           for gate, qubits in template])
+                return
+        AutoReplacer._process_command(self, cmd)
@@ -16,9 +16,10 @@
 This module provides translation rules from Xmon gates in Projectq to Xmon gates
 in Cirq.
 """
-import cirq
-version = [int(cirq.__version__[0]), int(cirq.__version__[2])]
-if (version[0] == 0 and version[1] <= 3):
+from ._compat import legacy_cirq
+if legacy_cirq():
     from . import xmon_rules_03x
+    from .xmon_rules_03x import ALL_RULES, xmon_gates_ruleset, XMON_TRANSLATIONS
 else:
-    from . import xmon_rules_040
\ No newline at end of file
+    from . import xmon_rules_040
+    from .xmon_rules_040 import ALL_RULES, xmon_gates_ruleset, XMON_TRANSLATIONS
@@ -17,8 +17,8 @@ This module provides translation rules from Xmon gates in Projectq to Xmon gates
 in Cirq.
 """
 import cirq
-version = [int(cirq.__version__[0]), int(cirq.__version__[2])]
-assert(version[0] == 0 and version[1] <= 3)
+from ._compat import legacy_cirq
+assert(legacy_cirq())
 import cmath
 from projectq.meta import get_control_count
 from . import xmon_gates
@@ -26,6 +26,17 @@ from ._rules_pq_to_cirq import Ruleset_pq_to_cirq as Ruleset
 from ._rules_pq_to_cirq import Rule_pq_to_cirq as Rule
 from cirq.google import xmon_gates as cxmon
 from cirq import ops as cop
+
+#: Translations of uncontrolled xmon gates given the gate and the cirq qubits.
+XMON_TRANSLATIONS = {
+        xmon_gates.ExpWGate: lambda gate, qubits: cxmon.ExpWGate(
+                half_turns=gate.half_turns,
+                axis_half_turns=gate.axis_half_turns)(*qubits),
+        xmon_gates.ExpZGate: lambda gate, qubits: cxmon.ExpZGate(
+                half_turns=gate.half_turns)(*qubits),
+        xmon_gates.Exp11Gate: lambda gate, qubits: cxmon.Exp11Gate(
+                half_turns=gate.half_turns)(*qubits)}
+
 def _expWGate(cmd, mapping, qubits):
     """
     Translate a ExpW gate into a Cirq gate.
@@ -40,7 +51,7 @@ def _expWGate(cmd, mapping, qubits):
     """
     qb_pos = [mapping[qb.id] for qr in cmd.qubits for qb in qr]
     assert len(qb_pos)==1
-    cirqGate = cxmon.ExpWGate(half_turns=cmd.gate.angle / cmath.pi, axis_half_turns=cmd.gate.axis_angle / cmath.pi)
+    cirqGate = cxmon.ExpWGate(half_turns=cmd.gate.half_turns, axis_half_turns=cmd.gate.axis_half_turns)
     if get_control_count(cmd) > 0:
         ctrl_pos = [mapping[qb.id] for qb in cmd.control_qubits]
         return cop.ControlledGate(cirqGate)(*[qubits[c] for c in ctrl_pos+qb_pos])
@@ -61,7 +72,7 @@ def _expZGate(cmd, mapping, qubits):
     """
     qb_pos = [mapping[qb.id] for qr in cmd.qubits for qb in qr]
     assert len(qb_pos)==1
-    cirqGate = cxmon.ExpZGate(half_turns=cmd.gate.angle / cmath.pi)
+    cirqGate = cxmon.ExpZGate(half_turns=cmd.gate.half_turns)
     if get_control_count(cmd) > 0:
         ctrl_pos = [mapping[qb.id] for qb in cmd.control_qubits]
         return cop.ControlledGate(cirqGate)(*[qubits[c] for c in ctrl_pos+qb_pos])
@@ -82,7 +93,7 @@ def _exp11Gate(cmd, mapping, qubits):
     """
     qb_pos = [mapping[qb.id] for qr in cmd.qubits for qb in qr]
     assert len(qb_pos)==2
-    cirqGate = cxmon.Exp11Gate(half_turns=cmd.gate.angle / cmath.pi)
+    cirqGate = cxmon.Exp11Gate(half_turns=cmd.gate.half_turns)
     return cirqGate(*[qubits[idx] for idx in qb_pos])
 
 EXP_W = Rule([xmon_gates.ExpWGate], _expWGate)
@@ -15,17 +15,77 @@
 """
 This module provides translation rules from Xmon gates in Projectq to Xmon gates
 in Cirq.
+
+Parameters of the xmon gates can be :class:`cirq.Symbol` instances, which are
+translated to parametrized cirq gates.
 """
 import cirq
-version = [int(cirq.__version__[0]), int(cirq.__version__[2])]
-assert(version[0] > 0 or version[1] >= 4)
+from ._compat import legacy_cirq
+assert(not legacy_cirq())
 import cmath
 from projectq.meta import get_control_count
 from . import xmon_gates
 from ._rules_pq_to_cirq import Ruleset_pq_to_cirq as Ruleset
 from ._rules_pq_to_cirq import Rule_pq_to_cirq as Rule
+from ._flyweight import GATE_CACHE
 #from cirq.google import xmon_gates as cxmon
 from cirq import ops as cop
+
+#: Global shift of the ZPowGate of an ExpZ gate, the matrix of
+#: :class:`cirqprojectq.xmon_gates.ExpZGate` is :math:`\exp(-i \pi Z \varphi / 2)`.
+#: The shift doesn't depend on the half turns, so numeric and resolved
+#: parametrized gates are the same gates.
+_EXPZ_GLOBAL_SHIFT = -0.5
+
+def _expW_operation(gate, qubits):
+    r"""
+    Cirq operation of an uncontrolled ExpW gate.
+
+    Args:
+        gate (:class:`cirqprojectq.xmon_gates.ExpWGate`): the xmon gate
+        qubits (list of :class:cirq.QubitID`): the cirq qubit the gate acts on
+
+    Returns:
+        :class:`cirq.Operation`
+    """
+    return GATE_CACHE.operation(cop.PhasedXPowGate, qubits,
+                                exponent=gate.half_turns,
+                                phase_exponent=gate.axis_half_turns)
+
+def _expZ_operation(gate, qubits):
+    r"""
+    Cirq operation of an uncontrolled ExpZ gate.
+
+    Args:
+        gate (:class:`cirqprojectq.xmon_gates.ExpZGate`): the xmon gate
+        qubits (list of :class:cirq.QubitID`): the cirq qubit the gate acts on
+
+    Returns:
+        :class:`cirq.Operation`
+    """
+    return GATE_CACHE.operation(cop.ZPowGate, qubits,
+                                exponent=gate.half_turns,
+                                global_shift=_EXPZ_GLOBAL_SHIFT)
+
+def _exp11_operation(gate, qubits):
+    r"""
+    Cirq operation of an Exp11 gate.
+
+    Args:
+        gate (:class:`cirqprojectq.xmon_gates.Exp11Gate`): the xmon gate
+        qubits (list of :class:cirq.QubitID`): the two cirq qubits the gate acts on
+
+    Returns:
+        :class:`cirq.Operation`
+    """
+    return GATE_CACHE.operation(cop.CZPowGate, qubits,
+                                exponent=gate.half_turns)
+
+#: Translations of uncontrolled xmon gates given the gate and the cirq qubits.
+XMON_TRANSLATIONS = {xmon_gates.ExpWGate: _expW_operation,
+                     xmon_gates.ExpZGate: _expZ_operation,
+                     xmon_gates.Exp11Gate: _exp11_operation}
+
 def _expWGate(cmd, mapping, qubits):
     """
     Translate a ExpW gate into a Cirq gate.
@@ -40,12 +100,14 @@ def _expWGate(cmd, mapping, qubits):
     """
     qb_pos = [mapping[qb.id] for qr in cmd.qubits for qb in qr]
     assert len(qb_pos)==1
-    cirqGate = cop.PhasedXPowGate(exponent=cmd.gate.angle / cmath.pi, phase_exponent=cmd.gate.axis_angle / cmath.pi)
     if get_control_count(cmd) > 0:
+        cirqGate = GATE_CACHE.gate(cop.PhasedXPowGate,
+                                   exponent=cmd.gate.half_turns,
+                                   phase_exponent=cmd.gate.axis_half_turns)
         ctrl_pos = [mapping[qb.id] for qb in cmd.control_qubits]
         return cop.ControlledGate(cirqGate)(*[qubits[c] for c in ctrl_pos+qb_pos])
     else:
-        return cirqGate(*[qubits[idx] for idx in qb_pos])
+        return _expW_operation(cmd.gate, [qubits[idx] for idx in qb_pos])
 
 def _expZGate(cmd, mapping, qubits):
     """
@@ -61,13 +123,14 @@ def _expZGate(cmd, mapping, qubits):
     """
     qb_pos = [mapping[qb.id] for qr in cmd.qubits for qb in qr]
     assert len(qb_pos)==1
-    cirqGate = cop.ZPowGate(exponent=cmd.gate.angle / cmath.pi,
-                            global_shift=cmd.gate.angle / cmath.pi)
     if get_control_count(cmd) > 0:
+        cirqGate = GATE_CACHE.gate(cop.ZPowGate,
+                                   exponent=cmd.gate.half_turns,
+                                   global_shift=_EXPZ_GLOBAL_SHIFT)
         ctrl_pos = [mapping[qb.id] for qb in cmd.control_qubits]
         return cop.ControlledGate(cirqGate)(*[qubits[c] for c in ctrl_pos+qb_pos])
     else:
-        return cirqGate(*[qubits[idx] for idx in qb_pos])
+        return _expZ_operation(cmd.gate, [qubits[idx] for idx in qb_pos])
 
 def _exp11Gate(cmd, mapping, qubits):
     """
@@ -83,8 +146,7 @@ def _exp11Gate(cmd, mapping, qubits):
     """
     qb_pos = [mapping[qb.id] for qr in cmd.qubits for qb in qr]
     assert len(qb_pos)==2
-    cirqGate = cop.CZPowGate(exponent=cmd.gate.angle / cmath.pi)
-    return cirqGate(*[qubits[idx] for idx in qb_pos])
+    return _exp11_operation(cmd.gate, [qubits[idx] for idx in qb_pos])
 
 EXP_W = Rule([xmon_gates.ExpWGate], _expWGate)
 EXP_Z = Rule([xmon_gates.ExpZGate], _expZGate)
@@ -18,7 +18,13 @@ r"""Provides proejctq engines for simulation of xmon devices.
 A full engine list can be generated with :meth:`cirqproejctq.xmon_setup.xmon_engines()`
 """
 from projectq import cengines, ops, setups
+import projectq.setups.decompositions
+from projectq.meta import get_control_count
 from . import xmon_gates, xmon_decompositions
+from .xmon_optimizer import XmonOptimizer
+from .xmon_replacer import XmonTemplateReplacer
+from .xmon_fusion import DiagonalFusion
+from .device_mapper import DeviceMapper
 
 def _filter_xmon(eng, cmd):
     '''
@@ -29,14 +35,15 @@ def _filter_xmon(eng, cmd):
         cmd(projectq.ops.Command): A projectq command object.
 
     Returns:
-        bool: True, if cmd.gate is a valid Xmon gate.
+        bool: True, if cmd.gate is a valid Xmon gate without control qubits.
 
     '''
     if isinstance(cmd.gate, ops.ClassicalInstructionGate):
         # This is required to allow Measure, Allocate, Deallocate, Flush
         return True
     elif isinstance(cmd.gate, xmon_gates.XmonGate):
-        return True
+        # Controlled xmon gates are decomposed into Exp11Gates.
+        return get_control_count(cmd) == 0
     else:
         return False
 
@@ -45,21 +52,85 @@ def xmon_rules():
     allrules = xmon_decompositions.all_defined_decomposition_rules
     return cengines.DecompositionRuleSet(allrules)
 
-def replacer_xmon():
-    r"""Autoreplacer for decomposition into xmon gates."""
+def replacer_xmon(templates=True):
+    r"""Autoreplacer for decomposition into xmon gates.
+
+    Args:
+        templates (bool): If True, common gates are replaced by precomputed
+            xmon gate templates, see :class:`cirqprojectq.xmon_replacer.XmonTemplateReplacer`.
+    """
     rule_set = cengines.DecompositionRuleSet(
             modules=[xmon_decompositions, setups.decompositions])
+    if templates:
+        return XmonTemplateReplacer(rule_set)
     return cengines.AutoReplacer(rule_set)
 
 def xmon_supported_filter():
     r"""InstructionFilter for xmon gates."""
     return cengines.InstructionFilter(_filter_xmon)
 
-def xmon_engines():
-    r"""Full engine list for simulation with xmon gates."""
+def xmon_engines(optimize=False, templates=True, fuse_diagonal=False):
+    r"""Full engine list for simulation with xmon gates.
+
+    Args:
+        optimize (bool): If True, an :class:`cirqprojectq.xmon_optimizer.XmonOptimizer`
+            fuses single qubit xmon gates and moves ExpZ gates through Exp11 gates.
+        templates (bool): If True, common gates are replaced by precomputed
+            xmon gate templates.
+        fuse_diagonal (bool): If True, a final
+            :class:`cirqprojectq.xmon_fusion.DiagonalFusion` fuses stretches of
+            diagonal xmon gates for the
+            :class:`cirqprojectq.xmon_simulator.XmonSimulator`.
+    """
+    engines = [cengines.TagRemover(),
+               cengines.LocalOptimizer(),
+               replacer_xmon(templates),
+               cengines.TagRemover(),
+               cengines.LocalOptimizer()]
+    if optimize:
+        engines.append(XmonOptimizer())
+    engines.append(xmon_supported_filter())
+    if fuse_diagonal:
+        engines.append(DiagonalFusion())
+    return engines
+
+def direct_engines():
+    r"""Engine list for the single pass translation to cirq.
+
+    Use with a :class:`cirqprojectq.circ_engine.CIRQ` engine created with
+    ``direct=True``. Common gates with an xmon gate template are passed on
+    unchanged and translated by the CIRQ engine directly to cirq operations,
+    all other gates are decomposed into xmon gates.
+
+    The resulting circuit is the same as with the two stage engine list
+    ``[TagRemover(), LocalOptimizer(), replacer_xmon(), xmon_supported_filter()]``.
+    In contrast to :meth:`xmon_engines`, xmon gates are not optimized by a
+    second :class:`projectq.cengines.LocalOptimizer`.
+    """
+    rule_set = cengines.DecompositionRuleSet(
+            modules=[xmon_decompositions, setups.decompositions])
     return [cengines.TagRemover(),
             cengines.LocalOptimizer(),
-            replacer_xmon(),
-            cengines.TagRemover(),
-            cengines.LocalOptimizer(),
-            xmon_supported_filter()]
\ No newline at end of file
+            cengines.AutoReplacer(rule_set)]
+
+def device_engines(device, optimize=False, templates=True, lookahead=20):
+    r"""Engine list for xmon gates on the qubits of a device.
+
+    The engines of :meth:`xmon_engines` are followed by a
+    :class:`cirqprojectq.device_mapper.DeviceMapper`, which places the qubits
+    on the device and inserts swaps, and by an
+    :class:`projectq.cengines.AutoReplacer` that decomposes the swaps into
+    xmon gates.
+
+    Args:
+        device (:class:`cirq.devices.Device`): device with the attribute
+            qubits, e.g., :class:`cirq.google.Bristlecone`.
+        optimize (bool): see :meth:`xmon_engines`.
+        templates (bool): see :meth:`xmon_engines`.
+        lookahead (int): number of following two-qubit gates that decide
+            between the possible swaps.
+    """
+    return (xmon_engines(optimize, templates) +
+            [DeviceMapper(device, lookahead=lookahead),
+             cengines.AutoReplacer(xmon_rules()),
+             xmon_supported_filter()])
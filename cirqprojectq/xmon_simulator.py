@@ -0,0 +1,427 @@
+# Copyright 2018 Heisenberg Quantum Simulations
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Provides a projectq backend that simulates xmon gates on a numpy state vector.
+
+The state vector is viewed as a tensor with one axis of length two per qubit.
+Fixing the bits of some qubits selects a strided view of the amplitudes, which
+the gates update in place:
+
+* :class:`cirqprojectq.xmon_gates.ExpZGate` multiplies the amplitudes with the
+  qubit in state 1 by a relative phase,
+* :class:`cirqprojectq.xmon_gates.Exp11Gate` multiplies only the amplitudes
+  with both qubits in state 1 by a phase,
+* :class:`cirqprojectq.xmon_gates.ExpWGate` combines the amplitudes with the
+  qubit in state 0 and 1 with its 2x2 matrix. The diagonal of the matrix is
+  real up to a global phase, it is applied to the real and imaginary parts.
+* :class:`cirqprojectq.xmon_fusion.DiagonalGate` multiplies the state vector
+  with its phases, broadcast over the other qubits, in a single operation.
+
+Global phases of uncontrolled gates are accumulated in a single number instead
+of multiplying the state vector. Controlled gates only act on the amplitudes
+with all control qubits in state 1.
+
+In batch mode the state vector has an additional axis for a number of parameter
+points. The parameters of symbolic xmon gates take different values for each
+point, see :meth:`cirqprojectq.xmon_gates.ExpWGate.matrices`, and a single
+pass over a parametrized program evolves all points at once.
+"""
+import numpy as np
+import cirq
+from projectq import ops
+from projectq.cengines import BasicEngine
+from projectq.meta import LogicalQubitIDTag, get_control_count
+from projectq.types import WeakQubitRef
+from . import xmon_gates
+from .xmon_fusion import DiagonalGate
+
+_CLASSICAL = (ops.AllocateQubitGate, ops.DeallocateQubitGate, ops.MeasureGate,
+              ops.BarrierGate, ops.FlushGate)
+
+def _batch_parameters(params):
+    r"""
+    Parameter values of all points.
+
+    Args:
+        params (dict or :class:`cirq.Sweep`): values by symbol name, or
+            a sweep.
+
+    Returns:
+        dict: a one dimensional array of values per symbol name, all arrays
+        have the same length.
+    """
+    if isinstance(params, cirq.Sweep):
+        resolvers = list(params)
+        params = {key: [resolver.param_dict[key] for resolver in resolvers]
+                  for key in params.keys}
+    names = list(params)
+    values = np.broadcast_arrays(*[np.atleast_1d(np.asarray(params[name], dtype=float))
+                                   for name in names])
+    if values and values[0].ndim != 1:
+        raise ValueError("Parameter values must be one dimensional.")
+    return dict(zip(names, values))
+
+class XmonSimulator(BasicEngine):
+    r"""
+    A projectq backend that simulates xmon gates on a numpy state vector.
+
+    The backend accepts xmon gates with numeric parameters, measurements,
+    allocations and deallocations, i.e., the output of
+    :meth:`cirqprojectq.xmon_setup.xmon_engines`. The qubit with bit location
+    k, see :meth:`cheat`, is the k-th least significant bit of the index of
+    the state vector, as in :class:`projectq.backends.Simulator`.
+
+    If params are given, the backend simulates a batch of parameter points.
+    Xmon gates with :class:`cirq.Symbol` parameters in params are accepted
+    and the amplitudes, probabilities and expectation values are arrays with
+    one entry per point. Measurements are not available in batch mode.
+
+    Args:
+        rnd_seed (int): seed of the random number generator for measurements.
+        params (dict or :class:`cirq.Sweep`): values of the symbols by name,
+            one dimensional arrays of the same length, or a sweep.
+
+    Example:
+
+        .. code-block:: python
+
+            backend = XmonSimulator(params={'u': np.linspace(0, 1, 50)})
+            eng = projectq.MainEngine(backend=backend, engine_list=[])
+            qureg = eng.allocate_qureg(2)
+            ExpWGate(1) | qureg[0]
+            ExpWGate(.5) | qureg[1]
+            Exp11Gate(cirq.Symbol('u')) | (qureg[0], qureg[1])
+            eng.flush()
+            mapping, states = backend.cheat()  # shape (50, 4)
+    """
+    def __init__(self, rnd_seed=None, params=None):
+        BasicEngine.__init__(self)
+        self._rng = np.random.RandomState(rnd_seed)
+        if params is None:
+            self._params = dict()
+            self._batch = None
+        else:
+            self._params = _batch_parameters(params)
+            self._batch = len(next(iter(self._params.values()), [1]))
+        self._state = np.ones((1, self._batch or 1), dtype=complex)
+        self._phase = 1.
+        self._mapping = dict()
+
+    @property
+    def batch_size(self):
+        r"""int: number of parameter points, None if not in batch mode."""
+        return self._batch
+
+    def is_available(self, cmd):
+        r"""
+        Check if a command can be simulated.
+
+        Args:
+            cmd (:class:`projectq.ops.Command`): a projectq command.
+
+        Returns:
+            bool: True for classical instructions, uncontrolled
+            :class:`cirqprojectq.xmon_fusion.DiagonalGate` s and xmon gates
+            without symbolic parameters or with symbols in params. False for
+            measurements in batch mode.
+        """
+        if isinstance(cmd.gate, ops.MeasureGate):
+            return self._batch is None
+        if isinstance(cmd.gate, _CLASSICAL):
+            return True
+        if isinstance(cmd.gate, DiagonalGate):
+            return get_control_count(cmd) == 0
+        if not isinstance(cmd.gate, xmon_gates.XmonGate):
+            return False
+        return all(p.name in self._params for p in cmd.gate._key
+                   if isinstance(p, cirq.Symbol))
+
+    def cheat(self):
+        r"""
+        Access the ordering of the qubits and the state vector directly.
+
+        Returns:
+            tuple: a dictionary mapping qubit ids to bit locations and a copy
+            of the state vector, or of the state vectors of all points in an
+            array of shape (batch_size, 2**n) in batch mode.
+        """
+        return dict(self._mapping), self._output((self._state * self._phase).T)
+
+    def get_amplitude(self, bit_string, qureg):
+        r"""
+        Return the amplitude of a computational basis state.
+
+        Args:
+            bit_string (list[bool|int]|string[0|1]): the basis state.
+            qureg (list(:class:`projectq.types.Qubit`)): qubits in the order
+                of bit_string. Must contain all allocated qubits.
+
+        Returns:
+            complex: the amplitude, an array of amplitudes in batch mode.
+
+        Raises:
+            ValueError: if qureg doesn't contain all allocated qubits.
+        """
+        if sorted(qb.id for qb in qureg) != sorted(self._mapping):
+            raise ValueError("The qureg must contain all allocated qubits.")
+        index = sum(int(b) << self._mapping[qb.id] for b, qb in zip(bit_string, qureg))
+        return self._output(self._state[index] * self._phase)
+
+    def get_probability(self, bit_string, qureg):
+        r"""
+        Return the probability to measure a bit string on some qubits.
+
+        Args:
+            bit_string (list[bool|int]|string[0|1]): the measurement outcome.
+            qureg (list(:class:`projectq.types.Qubit`)): measured qubits in
+                the order of bit_string.
+
+        Returns:
+            float: the probability, an array of probabilities in batch mode.
+        """
+        bits = {self._mapping[qb.id]: int(b) for b, qb in zip(bit_string, qureg)}
+        return self._output(_norm(self._view(bits)))
+
+    def get_expectation_value(self, qubit_operator, qureg):
+        r"""
+        Return the expectation value of a qubit operator.
+
+        Args:
+            qubit_operator (:class:`projectq.ops.QubitOperator`): the
+                operator, the indices of its terms refer to qureg.
+            qureg (list(:class:`projectq.types.Qubit`)): qubits.
+
+        Returns:
+            float: the real part of the expectation value, an array of
+            expectation values in batch mode.
+        """
+        expectation = np.zeros(self._state.shape[1])
+        for term, coefficient in qubit_operator.terms.items():
+            state = self._state.copy()
+            for index, pauli in term:
+                self._apply_pauli(state, pauli, self._mapping[qureg[index].id])
+            overlap = np.einsum('ij,ij->j', self._state.conj(), state)
+            expectation += (coefficient * overlap).real
+        return self._output(expectation)
+
+    def receive(self, command_list):
+        r"""
+        Simulate the commands and send them on if the backend is not the last
+        engine.
+
+        Args:
+            command_list (list(:class:`projectq.ops.Command`)): commands.
+        """
+        for cmd in command_list:
+            self._handle(cmd)
+            if not self.is_last_engine:
+                self.send([cmd])
+
+    def _output(self, values):
+        r"""Values of all points in batch mode, else the only value."""
+        if self._batch is None:
+            return values[0]
+        return values
+
+    def _resolve(self, value):
+        r"""Parameter values of all points for a symbol, else the value."""
+        if isinstance(value, cirq.Symbol):
+            return self._params[value.name]
+        return value
+
+    def _view(self, bits, state=None):
+        r"""
+        Strided view of the amplitudes with the given bits.
+
+        Args:
+            bits (dict): bit values by bit location.
+            state (numpy.ndarray): state vectors, defaults to the state of the
+                simulator.
+
+        Returns:
+            numpy.ndarray: view of the state vectors with two axes per fixed
+            bit, one more axis and the batch axis.
+        """
+        if state is None:
+            state = self._state
+        shape = []
+        index = []
+        upper = len(self._mapping)
+        for location in sorted(bits, reverse=True):
+            # Slices instead of integers, such that the result is always a view.
+            shape += [1 << (upper - location - 1), 2]
+            index += [slice(None), slice(bits[location], bits[location] + 1)]
+            upper = location
+        shape += [1 << upper, state.shape[1]]
+        index += [slice(None), slice(None)]
+        return state.reshape(shape)[tuple(index)]
+
+    def _handle(self, cmd):
+        gate = cmd.gate
+        if isinstance(gate, xmon_gates.XmonGate):
+            controls = {self._mapping[qb.id]: 1 for qb in cmd.control_qubits}
+            locations = [self._mapping[qb.id] for qr in cmd.qubits for qb in qr]
+            if isinstance(gate, xmon_gates.ExpWGate):
+                self._apply_expw(gate, locations[0], controls)
+            elif isinstance(gate, xmon_gates.ExpZGate):
+                self._apply_expz(gate, locations[0], controls)
+            elif isinstance(gate, xmon_gates.Exp11Gate):
+                if gate.is_parameterized:
+                    phase = xmon_gates.Exp11Gate.diagonals(
+                            self._resolve(gate.half_turns))[:, 3]
+                else:
+                    phase = gate.matrix[3, 3]
+                controls.update({location: 1 for location in locations})
+                self._view(controls)[...] *= phase
+            else:
+                raise TypeError("Gate {} is not supported.".format(gate))
+        elif isinstance(gate, DiagonalGate):
+            self._apply_phases(gate.phases, [self._mapping[qb.id] for qb in cmd.qubits[0]])
+        elif isinstance(gate, ops.MeasureGate):
+            self._measure(cmd)
+        elif isinstance(gate, ops.AllocateQubitGate):
+            self._allocate(cmd.qubits[0][0].id)
+        elif isinstance(gate, ops.DeallocateQubitGate):
+            self._deallocate(cmd.qubits[0][0].id)
+        elif not isinstance(gate, (ops.BarrierGate, ops.FlushGate)):
+            raise TypeError("Gate {} is not supported.".format(gate))
+
+    def _apply_expw(self, gate, location, controls):
+        bits = dict(controls)
+        bits[location] = 0
+        zero = self._view(bits)
+        bits[location] = 1
+        one = self._view(bits)
+        if gate.is_parameterized:
+            # One matrix per point, the last axis is the batch axis.
+            matrix = np.moveaxis(xmon_gates.ExpWGate.matrices(
+                    self._resolve(gate.half_turns),
+                    self._resolve(gate.axis_half_turns)), 0, -1)
+        else:
+            matrix = gate.matrix
+        if controls or gate.is_parameterized:
+            tmp = matrix[0, 0] * zero + matrix[0, 1] * one
+            one *= matrix[1, 1]
+            one += matrix[1, 0] * zero
+            zero[...] = tmp
+            return
+        # Without the global phase the diagonal is cos(angle / 2).
+        phase = np.exp(.5j * gate.angle)
+        self._phase *= phase
+        upper = matrix[0, 1] / phase
+        lower = matrix[1, 0] / phase
+        tmp_zero = lower * zero
+        tmp_one = upper * one
+        self._state.view(np.float64)[...] *= np.cos(gate.angle / 2)
+        zero += tmp_one
+        one += tmp_zero
+
+    def _apply_expz(self, gate, location, controls):
+        if gate.is_parameterized:
+            zero, one = xmon_gates.ExpZGate.diagonals(
+                    self._resolve(gate.half_turns)).T
+        else:
+            zero, one = np.diag(gate.matrix)
+        bits = dict(controls)
+        bits[location] = 1
+        if controls:
+            self._view(bits)[...] *= one
+            bits[location] = 0
+            self._view(bits)[...] *= zero
+        else:
+            self._phase *= zero
+            self._view(bits)[...] *= one / zero
+
+    def _apply_phases(self, phases, locations):
+        r"""
+        Multiply the state vector with the phases of a diagonal gate.
+
+        The phases are reshaped to a tensor with the axes of the qubits in the
+        order of the axes of the state vector and broadcast in a single
+        multiplication.
+        """
+        order = sorted(range(len(locations)), key=lambda k: locations[k], reverse=True)
+        phases = phases.reshape((2,) * len(locations)).transpose(
+                [len(locations) - 1 - k for k in order])
+        shape = []
+        phase_shape = []
+        upper = len(self._mapping)
+        for k in order:
+            shape += [1 << (upper - locations[k] - 1), 2]
+            phase_shape += [1, 2]
+            upper = locations[k]
+        shape += [1 << upper, self._state.shape[1]]
+        phase_shape += [1, 1]
+        self._state.reshape(shape)[...] *= phases.reshape(phase_shape)
+
+    def _apply_pauli(self, state, pauli, location):
+        zero = self._view({location: 0}, state)
+        one = self._view({location: 1}, state)
+        if pauli == 'Z':
+            one *= -1
+            return
+        tmp = zero.copy()
+        if pauli == 'X':
+            zero[...] = one
+            one[...] = tmp
+        else:
+            zero[...] = -1j * one
+            one[...] = 1j * tmp
+
+    def _measure(self, cmd):
+        if self._batch is not None:
+            raise RuntimeError("Measurements are not available in batch mode.")
+        logical_id_tag = None
+        for tag in cmd.tags:
+            if isinstance(tag, LogicalQubitIDTag):
+                logical_id_tag = tag
+        for qr in cmd.qubits:
+            for qb in qr:
+                location = self._mapping[qb.id]
+                probability = _norm(self._view({location: 1}))[0]
+                result = int(self._rng.random_sample() < probability)
+                if not result:
+                    probability = 1 - probability
+                self._view({location: 1 - result})[...] = 0
+                self._state /= np.sqrt(probability)
+                if logical_id_tag is not None:
+                    qb = WeakQubitRef(qb.engine, logical_id_tag.logical_qubit_id)
+                self.main_engine.set_measurement_result(qb, result)
+
+    def _allocate(self, qubit_id):
+        self._mapping[qubit_id] = len(self._mapping)
+        self._state = np.concatenate([self._state, np.zeros_like(self._state)])
+
+    def _deallocate(self, qubit_id):
+        location = self._mapping[qubit_id]
+        probability = _norm(self._view({location: 1}))
+        if np.max(np.minimum(probability, 1 - probability)) > 1e-12:
+            raise RuntimeError("Qubit {} is deallocated but not in a "
+                               "classical state. Measure or uncompute it "
+                               "first.".format(qubit_id))
+        batch = self._state.shape[1]
+        zero = self._view({location: 0}).reshape(-1, batch)
+        one = self._view({location: 1}).reshape(-1, batch)
+        # In batch mode the qubit can be in different states for each point.
+        self._state = np.where(probability > .5, one, zero)
+        del self._mapping[qubit_id]
+        for key, other in self._mapping.items():
+            if other > location:
+                self._mapping[key] = other - 1
+
+def _norm(amplitudes):
+    r"""Sums of the absolute squares of the amplitudes per point."""
+    amplitudes = amplitudes.reshape(-1, amplitudes.shape[-1])
+    return np.einsum('ij,ij->j', amplitudes.conj(), amplitudes).real
@@ -17,6 +17,7 @@ import numpy as np
 import cirq
 from cirq.google import xmon_gates, xmon_qubit
 from cirq.contrib.qcircuit_diagram import circuit_to_latex_using_qcircuit
+from cirqprojectq.trotter import repeat_step
 
 def nearest_neighbor_hopping(amplitude, qubits):
     """
@@ -119,9 +120,7 @@ with open('trotter.tex', 'w') as fl:
     print("$$\n\\end{document}", file=fl)
 
 from cirq.google import XmonSimulator
-from openfermion.ops import FermionOperator
-from openfermion.transforms import get_sparse_operator
-from scipy import sparse
+from cirqprojectq import siam
 from itertools import product
 from matplotlib import pyplot as plt
 
@@ -130,6 +129,8 @@ U = 0.6 * np.pi
 t, U = scale_H([t, U])
 Steps = list(range(1,16))
 res = {1: [], 2: []}
+# The qubits of the cirq simulator are ordered with XmonQubit(0, 0) first.
+exact = siam.exact_states(sites, t, U, [1.0], big_endian=True)[0]
 for order, steps in product((1, 2), Steps):
     circuit = cirq.Circuit()
     init = []
@@ -138,23 +139,11 @@ for order, steps in product((1, 2), Steps):
     for i in range(sites//2, sites):
         init.append(xmon_gates.ExpWGate(half_turns=1.0, axis_half_turns=0.0)(qubits[i + sites]))
     circuit.append(init, strategy=cirq.circuits.InsertStrategy.EARLIEST)
-    for j in range(steps):
-        circuit.append(trotter_step(t/steps, U/steps, qubits, order=order), strategy=cirq.circuits.InsertStrategy.EARLIEST)
+    circuit = repeat_step(trotter_step(t/steps, U/steps, qubits, order=order), steps, circuit)
     simulator = XmonSimulator()
     result = simulator.simulate(circuit)
 
-    h = np.sum([FermionOperator(((i, 1), (i+1, 0)), t) +
-                FermionOperator(((i+1, 1), (i, 0)), t) +
-                FermionOperator(((i+sites, 1), (i+1+sites, 0)), t) +
-                FermionOperator(((i+1+sites, 1), (i+sites, 0)), t) for i in range(sites-1)])
-    h += FermionOperator(((sites//2, 1), (sites//2, 0), (sites//2+sites, 1), (sites//2+sites, 0)), U)
-    init = FermionOperator(tuple([(i, 1) for i in range(sites//2+sites%2)] + [(i+sites, 1) for i in range(sites//2, sites)]),
-                           1.0)
-    init = get_sparse_operator(init, sites*2)
-    init = init.dot(np.array([1] + [0]*(2**(sites*2)-1)))
-    h = get_sparse_operator(h, 2*sites)
-    psi = sparse.linalg.expm_multiply(-1.0j * h, init)
-    res[order].append(np.abs(psi.conj().T.dot(result.final_state))**2)
+    res[order].append(siam.fidelities(exact, result.final_state))
 
 fig = plt.figure()
 for k, r in res.items():
@@ -169,6 +158,7 @@ t = - 1.0
 t, U = scale_H([t, U])
 Ulist = np.linspace(0, 2)
 resU = {1: [], 2: []}
+exact = {U: siam.exact_states(sites, t, U, [1.0], big_endian=True)[0] for U in Ulist}
 for order, U in product((1, 2), Ulist):
     steps = 10
     circuit = cirq.Circuit()
@@ -178,23 +168,11 @@ for order, U in product((1, 2), Ulist):
     for i in range(sites//2, sites):
         init.append(xmon_gates.ExpWGate(half_turns=1.0, axis_half_turns=0.0)(qubits[i + sites]))
     circuit.append(init, strategy=cirq.circuits.InsertStrategy.EARLIEST)
-    for j in range(steps):
-        circuit.append(trotter_step(t/steps, U/steps, qubits, order=order), strategy=cirq.circuits.InsertStrategy.EARLIEST)
+    circuit = repeat_step(trotter_step(t/steps, U/steps, qubits, order=order), steps, circuit)
     simulator = XmonSimulator()
     result = simulator.simulate(circuit)
 
-    h = np.sum([FermionOperator(((i, 1), (i+1, 0)), t) +
-                FermionOperator(((i+1, 1), (i, 0)), t) +
-                FermionOperator(((i+sites, 1), (i+1+sites, 0)), t) +
-                FermionOperator(((i+1+sites, 1), (i+sites, 0)), t) for i in range(sites-1)])
-    h += FermionOperator(((sites//2, 1), (sites//2, 0), (sites//2+sites, 1), (sites//2+sites, 0)), U)
-    init = FermionOperator(tuple([(i, 1) for i in range(sites//2+sites%2)] + [(i+sites, 1) for i in range(sites//2, sites)]),
-                           1.0)
-    init = get_sparse_operator(init, sites*2)
-    init = init.dot(np.array([1] + [0]*(2**(sites*2)-1)))
-    h = get_sparse_operator(h, 2*sites)
-    psi = sparse.linalg.expm_multiply(-1.0j * h, init)
-    resU[order].append(np.abs(psi.conj().T.dot(result.final_state))**2)
+    resU[order].append(siam.fidelities(exact[U], result.final_state))
 #    print("Overlap:", res[-1])
 #    print(psi.conj().T.dot(h.dot(psi)).real)
 #    print(result.final_state.conj().T.dot(h.dot(result.final_state)).real)